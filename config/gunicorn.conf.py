@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for production.
+
+    gunicorn -c config/gunicorn.conf.py config.wsgi:application
+
+The app is imported once in the master (preload_app) and, where it is
+fork-safe, the burnout model is loaded there too. Workers then share
+the model arrays copy-on-write instead of each loading their own copy.
+"""
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 3))
+
+# Threaded workers let concurrent requests share a micro-batch
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+preload_app = True
+
+
+def should_preload_models():
+    from django.conf import settings
+
+    mode = str(getattr(settings, "BURNOUT_PRELOAD", "auto")).lower()
+    if mode in ("1", "true", "yes", "on"):
+        return True
+    if mode in ("0", "false", "no", "off"):
+        return False
+    # auto: only the NumPy backend is safe to load before fork
+    return getattr(settings, "BURNOUT_BACKEND", "keras") == "numpy"
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before workers fork
+    if should_preload_models():
+        from core.burnout_model import get_engine
+        from core.services.model_registry import registry
+
+        get_engine()
+        server.log.info("Preloaded models: %s", registry.stats()["models"])
+
+    # Move everything allocated so far out of GC tracking so the collector
+    # in each worker does not touch (and un-share) those pages
+    gc.freeze()
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -148,9 +149,169 @@ ASTROLOGY_API_BASE_URL = "https://json.astrologyapi.com/v1/"
 # Load from environment variables if availableASTROLOGY_API_USER_ID = os.getenv("ASTROLOGY_API_USER_ID")
 ASTROLOGY_API_KEY = os.getenv("ASTROLOGY_API_KEY")
 ASTROLOGY_API_USER_ID = os.getenv("ASTROLOGY_API_USER_ID")
+ASTROLOGY_API_BASE_URL = os.getenv("ASTROLOGY_API_BASE_URL", ASTROLOGY_API_BASE_URL)
+
+# "local" computes charts and transits with the offline NumPy ephemeris
+# (core/services/ephemeris.py); "api" calls AstrologyAPI
+ASTROLOGY_BACKEND = os.getenv("ASTROLOGY_BACKEND", "local")
+
+# AstrologyAPI HTTP client (core/api/client.py)
+ASTROLOGY_API_CONNECT_TIMEOUT = float(os.getenv("ASTROLOGY_API_CONNECT_TIMEOUT", 3.05))
+ASTROLOGY_API_READ_TIMEOUT = float(os.getenv("ASTROLOGY_API_READ_TIMEOUT", 10))
+ASTROLOGY_API_MAX_RETRIES = int(os.getenv("ASTROLOGY_API_MAX_RETRIES", 2))
+ASTROLOGY_API_BACKOFF = float(os.getenv("ASTROLOGY_API_BACKOFF", 0.3))
+ASTROLOGY_API_POOL_SIZE = int(os.getenv("ASTROLOGY_API_POOL_SIZE", 10))
+# Consecutive failures before the circuit opens, and seconds it stays open
+ASTROLOGY_API_BREAKER_THRESHOLD = int(os.getenv("ASTROLOGY_API_BREAKER_THRESHOLD", 5))
+ASTROLOGY_API_BREAKER_RESET = float(os.getenv("ASTROLOGY_API_BREAKER_RESET", 30))
+
+# Pages wait at most this many seconds for their AstrologyAPI calls, which run
+# concurrently in a shared thread pool (core/services/fanout.py)
+ASTROLOGY_PAGE_DEADLINE = float(os.getenv("ASTROLOGY_PAGE_DEADLINE", 4))
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", 8))
+
+
+
+# Bulk biometric ingestion (/biometrics/ingest/): rows validated per chunk,
+# inserted with bulk_create in batches
+BIOMETRIC_INGEST_CHUNK_SIZE = int(os.getenv("BIOMETRIC_INGEST_CHUNK_SIZE", 5000))
+BIOMETRIC_INGEST_BATCH_SIZE = int(os.getenv("BIOMETRIC_INGEST_BATCH_SIZE", 1000))
+# A day of minute-level data is ~1,440 rows; allow large uploads
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", 50 * 1024 * 1024))
+
+# Biometric retention (manage.py compact_biometrics): raw rows and hourly
+# rollups older than these are deleted; daily/weekly rollups are kept
+BIOMETRIC_RAW_RETENTION_DAYS = int(os.getenv("BIOMETRIC_RAW_RETENTION_DAYS", 90))
+BIOMETRIC_HOURLY_RETENTION_DAYS = int(os.getenv("BIOMETRIC_HOURLY_RETENTION_DAYS", 365))
+
+# Rolling biometric features (core/services/feature_store.py)
+FEATURE_SLEEP_TARGET_HOURS = float(os.getenv("FEATURE_SLEEP_TARGET_HOURS", 8))
+FEATURE_STRESS_HALFLIFE_HOURS = float(os.getenv("FEATURE_STRESS_HALFLIFE_HOURS", 24))
+
+# Streaming anomaly detection on biometrics (core/services/anomalies.py).
+# Detections are raised as alerts; see the Alerts section below. Keys set
+# here override anomalies.DEFAULT_SETTINGS (alpha, warmup, z, cusum_k, cusum_h)
+ANOMALY_DETECTION = {}
+
+# Caches
+# AstrologyAPI responses go to a file cache so they survive restarts and are
+# shared by all gunicorn workers (core/services/astro_cache.py). Natal charts
+# are kept forever, transits until local midnight; NatalChart and
+# AstrologicalTransit rows act as the database fallback.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "astrology": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("ASTROLOGY_CACHE_DIR", str(BASE_DIR / ".cache" / "astrology")),
+        "TIMEOUT": None,
+    },
+    # Rendered pages, template fragments and their per-profile version
+    # tokens (core/services/page_cache.py). Must be shared by all workers,
+    # or an invalidation in one worker leaves the others serving old pages.
+    "pages": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("PAGE_CACHE_DIR", str(BASE_DIR / ".cache" / "pages")),
+        "TIMEOUT": None,
+    },
+}
+ASTROLOGY_CACHE_ALIAS = "astrology"
+PAGE_CACHE_ALIAS = "pages"
+# Cached pages and fragments are dropped after this long even if unchanged
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", 86400))
+
+
+# Alerts (core/services/alerts.py). Requests only queue AlertDelivery rows;
+# `manage.py run_alert_workers` sends them.
+ALERT_THRESHOLDS = {
+    "risk": float(os.getenv("ALERT_RISK_THRESHOLD", 0.7)),
+    "stress_level": 8,
+    "hrv_score": 20,
+    "sleep_hours": 5,
+}
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", 4))
+ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 50))
+ALERT_POLL_SECONDS = float(os.getenv("ALERT_POLL_SECONDS", 1))
+ALERT_MAX_ATTEMPTS = int(os.getenv("ALERT_MAX_ATTEMPTS", 5))
+ALERT_RETRY_BASE_SECONDS = float(os.getenv("ALERT_RETRY_BASE_SECONDS", 30))
+ALERT_CLAIM_TIMEOUT = int(os.getenv("ALERT_CLAIM_TIMEOUT", 300))
+# Sends per second, per process
+ALERT_RATE_LIMITS = {"Email": 10, "SMS": 5, "App": 50}
+# SMS and App push are local stand-ins until real providers are wired in
+ALERT_BACKENDS = {
+    "Email": {"BACKEND": "core.services.notifications.EmailBackend"},
+    "SMS": {"BACKEND": "core.services.notifications.LogBackend", "OPTIONS": {"latency": 0.2}},
+    "App": {"BACKEND": "core.services.notifications.LogBackend", "OPTIONS": {"latency": 0.05}},
+}
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "alerts@unruffled.local")
+
+
+# Request instrumentation (core/middleware.py): Server-Timing headers,
+# /metrics histograms and, with REQUEST_LOG_ENABLED, one JSON log line per
+# request on the core.requests logger
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "1") == "1"
+REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "0") == "1"
+# Profile this share of requests with cProfile into REQUEST_PROFILE_DIR
+REQUEST_PROFILE_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILE_SAMPLE_RATE", 0))
+REQUEST_PROFILE_DIR = os.getenv("REQUEST_PROFILE_DIR", "/tmp/unruffled-profiles")
+# ?profile=1 is allowed with DEBUG, or with this value in X-Profile-Token
+REQUEST_PROFILE_TOKEN = os.getenv("REQUEST_PROFILE_TOKEN")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+        # Request lines are INFO, so this is silent unless REQUEST_LOG_ENABLED
+        "requests": {
+            "class": "logging.StreamHandler",
+            "level": "INFO" if REQUEST_LOG_ENABLED else "WARNING",
+        },
+    },
+    "loggers": {
+        "core.requests": {
+            "handlers": ["requests"],
+            "level": "INFO" if REQUEST_LOG_ENABLED else "WARNING",
+            "propagate": False,
+        },
+        "core.notifications": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
 
 
+# Demo mode: every page acts for this UserProfile (core/views.py)
+ACTIVE_PROFILE_ID = int(os.getenv("ACTIVE_PROFILE_ID", 1))
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
+
+
+# Burnout inference backend: "keras" (TensorFlow) or "numpy" (exported .npz,
+# see core/ai_training/export_numpy_model.py)
+BURNOUT_BACKEND = os.getenv("BURNOUT_BACKEND", "keras")
+
+# Load models in the gunicorn master so forked workers share them
+# copy-on-write (config/gunicorn.conf.py). TensorFlow's runtime is not
+# fork-safe, so with the "keras" backend this only applies when forced.
+BURNOUT_PRELOAD = os.getenv("BURNOUT_PRELOAD", "auto")
+
+# Published model bundles (manage.py publish_model). Each worker checks the
+# CURRENT pointer every BURNOUT_MODEL_POLL_SECONDS and hot-swaps a new
+# version in the background; 0 disables polling.
+BURNOUT_BUNDLES_DIR = os.getenv("BURNOUT_BUNDLES_DIR", str(BASE_DIR / "core" / "model_files" / "bundles"))
+BURNOUT_MODEL_POLL_SECONDS = float(os.getenv("BURNOUT_MODEL_POLL_SECONDS", 30))
+
+# Burnout inference micro-batching
+# Concurrent predict_burnout calls in one worker share a forward pass.
+BURNOUT_BATCHING_ENABLED = True
+BURNOUT_BATCH_MAX_SIZE = int(os.getenv("BURNOUT_BATCH_MAX_SIZE", 64))
+BURNOUT_BATCH_MAX_WAIT_MS = float(os.getenv("BURNOUT_BATCH_MAX_WAIT_MS", 5))
+# Upper bound on rows accepted by /predict_burnout/batch/ in one request
+BURNOUT_BATCH_MAX_ROWS = int(os.getenv("BURNOUT_BATCH_MAX_ROWS", 10000))
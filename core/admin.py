@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import (
     UserProfile, BiometricData, AstrologicalTransit, NatalChart,
-    AIPrediction, Alert, TeamMember, UserPreference, UserFeedback
+    AIPrediction, Alert, TeamMember, UserPreference, UserFeedback,
+    DailyRiskSnapshot, BiometricRollup, AlertDelivery, BiometricFeatureState,
+    AnomalyDetectorState,
 )
 from .forms import UserProfileForm
 
@@ -26,3 +28,8 @@ admin.site.register(TeamMember)
 admin.site.register(UserPreference)
 admin.site.register(UserFeedback)
 
+admin.site.register(DailyRiskSnapshot)
+admin.site.register(BiometricRollup)
+admin.site.register(AlertDelivery)
+admin.site.register(BiometricFeatureState)
+admin.site.register(AnomalyDetectorState)
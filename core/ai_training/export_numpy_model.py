@@ -0,0 +1,122 @@
+"""
+Exports the trained Keras burnout model, its scaler and label encoders
+into one .npz artifact that core/burnout_numpy.py can run without TensorFlow,
+and packages all burnout artifacts into a versioned bundle.
+
+Run after train_burnout_model.py:
+    python core/ai_training/export_numpy_model.py
+    python core/ai_training/export_numpy_model.py --publish
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "model_files")
+BUNDLES_DIR = os.path.join(MODEL_DIR, "bundles")
+
+if os.path.dirname(BASE_DIR) not in sys.path:
+    sys.path.insert(0, os.path.dirname(BASE_DIR))
+
+from core.services import model_bundle  # noqa: E402
+
+DENSE_LAYERS = ("dense", "dense_1", "class_output", "score_output")
+
+# Everything one burnout model version consists of
+BUNDLE_FILES = (
+    "burnout_model.keras",
+    "burnout_model.npz",
+    "burnout_scaler.pkl",
+    "burnout_class_encoder.pkl",
+    "burnout_planet_encoder.pkl",
+    "burnout_house_encoder.pkl",
+    "burnout_sleep_encoder.pkl",
+)
+
+# Same order as core.burnout_model.FEATURE_FIELDS
+FEATURE_FIELDS = (
+    "heart_rate", "hrv_score", "sleep_hours", "activity_level", "stress_level",
+    "transit_planet", "natal_house", "sleep_quality",
+)
+
+
+def load_pickle(name, model_dir=MODEL_DIR):
+    with open(os.path.join(model_dir, name), "rb") as f:
+        return pickle.load(f)
+
+
+def export(model_dir=MODEL_DIR, out_path=None):
+    import tensorflow as tf
+
+    out_path = out_path or os.path.join(model_dir, "burnout_model.npz")
+
+    model = tf.keras.models.load_model(os.path.join(model_dir, "burnout_model.keras"))
+    scaler = load_pickle("burnout_scaler.pkl", model_dir)
+
+    arrays = {}
+    for name in DENSE_LAYERS:
+        kernel, bias = model.get_layer(name).get_weights()
+        arrays[f"{name}/kernel"] = kernel.astype(np.float32)
+        arrays[f"{name}/bias"] = bias.astype(np.float32)
+
+    # MinMaxScaler.transform(X) == X * scale_ + min_
+    arrays["scaler/scale"] = scaler.scale_.astype(np.float64)
+    arrays["scaler/min"] = scaler.min_.astype(np.float64)
+
+    # LabelEncoder classes_ are sorted, so index == encoded value
+    arrays["class_classes"] = load_pickle("burnout_class_encoder.pkl", model_dir).classes_.astype(str)
+    arrays["planet_classes"] = load_pickle("burnout_planet_encoder.pkl", model_dir).classes_.astype(str)
+    arrays["house_classes"] = load_pickle("burnout_house_encoder.pkl", model_dir).classes_.astype(str)
+    arrays["sleep_classes"] = load_pickle("burnout_sleep_encoder.pkl", model_dir).classes_.astype(str)
+
+    np.savez_compressed(out_path, **arrays)
+    return out_path
+
+
+def verify(npz_path, n=1000, atol=1e-4, seed=0, model_dir=MODEL_DIR):
+    """Checks the NumPy runtime against Keras on random inputs."""
+    import tensorflow as tf
+    from core.burnout_numpy import NumpyBurnoutModel
+
+    engine = NumpyBurnoutModel.load(npz_path)
+    model = tf.keras.models.load_model(os.path.join(model_dir, "burnout_model.keras"))
+
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 1, size=(n, 8))
+    class_np, score_np = engine.forward(X)
+    class_tf, score_tf = model.predict_on_batch(X)
+
+    class_err = float(np.abs(class_np - class_tf).max())
+    score_err = float(np.abs(score_np - score_tf[:, 0]).max())
+    print(f"max abs error: class={class_err:.2e} score={score_err:.2e}")
+
+    if class_err > atol or score_err > atol:
+        raise SystemExit("NumPy runtime does not match Keras model")
+
+
+def schema(model_dir=MODEL_DIR):
+    """Feature order and label vocabularies, recorded in the bundle manifest."""
+    return {
+        "features": list(FEATURE_FIELDS),
+        "transit_planet": load_pickle("burnout_planet_encoder.pkl", model_dir).classes_.tolist(),
+        "natal_house": load_pickle("burnout_house_encoder.pkl", model_dir).classes_.tolist(),
+        "sleep_quality": load_pickle("burnout_sleep_encoder.pkl", model_dir).classes_.tolist(),
+        "classes": load_pickle("burnout_class_encoder.pkl", model_dir).classes_.tolist(),
+    }
+
+
+def publish(model_dir=MODEL_DIR, bundles_dir=BUNDLES_DIR):
+    """Bundles the artifacts in model_dir and makes them the live version."""
+    return model_bundle.publish(model_dir, bundles_dir, schema(model_dir), BUNDLE_FILES)
+
+
+if __name__ == "__main__":
+    print("Exporting burnout model to .npz...")
+    path = export()
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    verify(path)
+    if "--publish" in sys.argv:
+        print(f"Published bundle {publish()}")
+    print("Export complete!")
@@ -1,166 +1,373 @@
-import pandas as pd
-import numpy as np
-import tensorflow as tf
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-import pickle
-import os
+"""
+Trains the burnout model from a chunked data stream.
 
+Rows come either from a seeded synthetic generator or from stored
+BiometricData joined to that day's AstrologicalTransit, and are produced
+chunk by chunk, so memory stays flat however many rows are used.
 
-print("Generating synthetic burnout dataset...")
-
-# simulate 5000 samples
-N = 5000
-
-heart_rate = np.random.randint(55, 120, N)
-hrv_score = np.random.uniform(10, 80, N)
-sleep_hours = np.random.uniform(2, 10, N)
-activity_level = np.random.randint(0, 10, N)
-stress_level = np.random.randint(1, 10, N)
-sleep_quality = np.random.choice(["Poor", "Fair", "Good", "Excellent"], N)
-
-# astrology features
-transit_planet = np.random.choice(["Mars", "Saturn", "Moon", "Mercury", "Venus"], N)
-natal_house = np.random.choice(["1st","4th","6th","8th","12th"], N)
-
-# burnout target score (0 to 1)
-burnout_score = (
-    (stress_level/10) * 0.5 +
-    (heart_rate-55)/65 * 0.15 +
-    (10 - sleep_hours)/10 * 0.2 +
-    (1 - hrv_score/80) * 0.1 +
-    np.random.uniform(0, 0.1, N)
-)
-
-burnout_score = np.clip(burnout_score, 0, 1)
-
-# burnout category
-def classify(score):
-    if score < 0.33:
-        return "low"
-    elif score < 0.66:
-        return "medium"
-    return "high"
-
-burnout_label = [classify(s) for s in burnout_score]
-
-df = pd.DataFrame({
-    "heart_rate": heart_rate,
-    "hrv_score": hrv_score,
-    "sleep_hours": sleep_hours,
-    "activity_level": activity_level,
-    "stress_level": stress_level,
-    "sleep_quality": sleep_quality,
-    "transit_planet": transit_planet,
-    "natal_house": natal_house,
-    "burnout_score": burnout_score,
-    "burnout_label": burnout_label
-})
-
-print("Encoding features...")
-
-# Encode categoricals
-planet_enc = LabelEncoder()
-house_enc = LabelEncoder()
-sleep_enc = LabelEncoder()
-
-df["planet_enc"] = planet_enc.fit_transform(df["transit_planet"])
-df["house_enc"] = house_enc.fit_transform(df["natal_house"])
-df["sleep_enc"] = sleep_enc.fit_transform(df["sleep_quality"])
-
-# input features
-X = df[[
-    "heart_rate","hrv_score","sleep_hours",
-    "activity_level","stress_level",
-    "planet_enc","house_enc","sleep_enc"
-]].values
-
-y_score = df["burnout_score"].values  # numeric output
-y_class = df["burnout_label"].values  # categorical output
-
-# scale X
-scaler = MinMaxScaler()
-X_scaled = scaler.fit_transform(X)
-
-# encode burnout category
-class_enc = LabelEncoder()
-y_class_enc = class_enc.fit_transform(y_class)
-
-X_train, X_test, class_train, class_test, score_train, score_test = train_test_split(
-    X_scaled, y_class_enc, burnout_score, 
-    test_size=0.2, random_state=42
-)
-
-
-print("Building burnout model neural network...")
-
-# Multi-output model (classification + score)
-input_layer = tf.keras.layers.Input(shape=(8,))
-dense1 = tf.keras.layers.Dense(64, activation="relu")(input_layer)
-dense2 = tf.keras.layers.Dense(32, activation="relu")(dense1)
-
-# classification output
-class_output = tf.keras.layers.Dense(
-    len(class_enc.classes_), activation="softmax", name="class_output"
-)(dense2)
-
-# numeric burnout score output
-score_output = tf.keras.layers.Dense(
-    1, activation="sigmoid", name="score_output"
-)(dense2)
-
-model = tf.keras.Model(inputs=input_layer, outputs=[class_output, score_output])
-
-model.compile(
-    optimizer="adam",
-    loss={
-        "class_output": "sparse_categorical_crossentropy",
-        "score_output": "mse"
-    },
-    metrics={
-        "class_output": "accuracy",
-        "score_output": "mse"
-    }
-)
-
-print("Training model...")
-model.fit(
-    X_train,
-    {
-        "class_output": class_train,
-        "score_output": score_train
-    },
-    validation_data=(
-        X_test,
-        {
-            "class_output": class_test,
-            "score_output": score_test
-        }
-    ),
-    epochs=12,
-    batch_size=32
-)
+    python core/ai_training/train_burnout_model.py --rows 5000
+    python core/ai_training/train_burnout_model.py --source db --epochs 3   # every stored row
+
+All artifacts (including the NumPy export) are then published together as
+one versioned bundle; see core/services/model_bundle.py.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
 
-print("Saving model...")
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_DIR = os.path.join(BASE_DIR, "model_files")
-os.makedirs(MODEL_DIR, exist_ok=True)
 
-model.save(os.path.join(MODEL_DIR, "burnout_model.keras"))
+PLANETS = ["Mars", "Saturn", "Moon", "Mercury", "Venus"]
+HOUSES = ["1st", "4th", "6th", "8th", "12th"]
+SLEEP_QUALITIES = ["Poor", "Fair", "Good", "Excellent"]
+LEVELS = np.array(["low", "medium", "high"])
+LEVEL_EDGES = [0.33, 0.66]
+
+NUMERIC_FEATURES = ["heart_rate", "hrv_score", "sleep_hours", "activity_level", "stress_level"]
+
+# One row in VAL_EVERY goes to validation, chosen by row id so the
+# split is the same every epoch and every run
+VAL_EVERY = 5
 
-with open(os.path.join(MODEL_DIR, "burnout_scaler.pkl"), "wb") as f:
-    pickle.dump(scaler, f)
+# Default --rows for --source synthetic; database training reads every row
+SYNTHETIC_ROWS = 5000
 
-with open(os.path.join(MODEL_DIR, "burnout_class_encoder.pkl"), "wb") as f:
-    pickle.dump(class_enc, f)
 
-with open(os.path.join(MODEL_DIR, "burnout_planet_encoder.pkl"), "wb") as f:
-    pickle.dump(planet_enc, f)
+def fitted_encoder(values):
+    # sklearn is imported where it is used: the serving code imports
+    # helpers from this module and may run without it (BURNOUT_BACKEND=numpy)
+    from sklearn.preprocessing import LabelEncoder
 
-with open(os.path.join(MODEL_DIR, "burnout_house_encoder.pkl"), "wb") as f:
-    pickle.dump(house_enc, f)
+    encoder = LabelEncoder()
+    encoder.fit(values)
+    return encoder
 
-with open(os.path.join(MODEL_DIR, "burnout_sleep_encoder.pkl"), "wb") as f:
-    pickle.dump(sleep_enc, f)
 
-print("Burnout model training complete!")
+class Encoders:
+    def __init__(self):
+        self.planet = fitted_encoder(PLANETS)
+        self.house = fitted_encoder(HOUSES)
+        self.sleep = fitted_encoder(SLEEP_QUALITIES)
+        self.label = fitted_encoder(LEVELS)
+
+
+# ---- Labeling ----
+
+def burnout_score(chunk, noise):
+    score = (
+        (chunk["stress_level"] / 10) * 0.5 +
+        (chunk["heart_rate"] - 55) / 65 * 0.15 +
+        (10 - chunk["sleep_hours"]) / 10 * 0.2 +
+        (1 - chunk["hrv_score"] / 80) * 0.1 +
+        noise
+    )
+    return np.clip(score, 0, 1)
+
+
+def burnout_label(score):
+    """low < 0.33 <= medium < 0.66 <= high, for a whole array at once."""
+    return LEVELS[np.digitize(score, LEVEL_EDGES)]
+
+
+def sleep_quality_from_hours(hours):
+    return np.select(
+        [hours < 5, hours < 6.5, hours < 8],
+        ["Poor", "Fair", "Good"],
+        default="Excellent",
+    )
+
+
+# ---- Sources ----
+# Each yields (ids, chunk) where chunk maps feature name -> column array.
+
+def synthetic_chunks(rows, chunk_size, seed):
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        n = min(chunk_size, rows - start)
+        # Seeded per chunk: every epoch (and every run) sees the same rows
+        rng = np.random.default_rng([seed, index])
+        chunk = {
+            "heart_rate": rng.integers(55, 120, n).astype(float),
+            "hrv_score": rng.uniform(10, 80, n),
+            "sleep_hours": rng.uniform(2, 10, n),
+            "activity_level": rng.integers(0, 10, n).astype(float),
+            "stress_level": rng.integers(1, 10, n).astype(float),
+            "sleep_quality": rng.choice(SLEEP_QUALITIES, n),
+            "transit_planet": rng.choice(PLANETS, n),
+            "natal_house": rng.choice(HOUSES, n),
+        }
+        chunk["score"] = burnout_score(chunk, rng.uniform(0, 0.1, n))
+        yield np.arange(start, start + n), chunk
+
+
+def setup_django():
+    sys.path.insert(0, os.path.dirname(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
+
+
+def transit_lookup(keys):
+    """{(profile_id, day): (planet, house)} for the first transit stored per day."""
+    from core.models import AstrologicalTransit
+
+    lookup = {}
+    rows = (
+        AstrologicalTransit.objects
+        .filter(user_profile_id__in={p for p, _ in keys}, transit_date__in={d for _, d in keys})
+        .order_by("-id")
+        .values_list("user_profile_id", "transit_date", "transit_planet", "natal_house")
+    )
+    for profile_id, day, planet, house in rows:
+        lookup[(profile_id, day)] = (planet, house)
+    return lookup
+
+
+def in_vocab(values, vocab):
+    return np.where(np.isin(values, vocab), values, vocab[0])
+
+
+def database_chunks(chunk_size, limit=None, seed=0):
+    """
+    Streams stored biometrics by id. Labels are the same weak score the
+    synthetic data uses, computed from each row's own measurements.
+    """
+    from django.utils import timezone
+    from core.models import BiometricData
+
+    qs = BiometricData.objects.order_by("id").values_list(
+        "id", "user_profile_id", "timestamp", *NUMERIC_FEATURES, "sleep_quality",
+    )
+    if limit:
+        qs = qs[:limit]
+
+    def build(batch, index):
+        ids = np.array([r[0] for r in batch])
+        keys = [(r[1], timezone.localdate(r[2])) for r in batch]
+        transits = transit_lookup(set(keys))
+        # Missing measurements become the middle of the synthetic ranges
+        numeric = np.array([r[3:8] for r in batch], dtype=float)
+        defaults = np.array([80, 45, 7, 5, 5], dtype=float)
+        numeric = np.where(np.isnan(numeric), defaults, numeric)
+
+        chunk = {name: numeric[:, i] for i, name in enumerate(NUMERIC_FEATURES)}
+        quality = np.array([r[8] or "" for r in batch])
+        chunk["sleep_quality"] = np.where(
+            np.isin(quality, SLEEP_QUALITIES), quality, sleep_quality_from_hours(chunk["sleep_hours"]),
+        )
+        pairs = [transits.get(key, (PLANETS[0], HOUSES[0])) for key in keys]
+        chunk["transit_planet"] = in_vocab(np.array([p for p, _ in pairs]), PLANETS)
+        chunk["natal_house"] = in_vocab(np.array([h for _, h in pairs]), HOUSES)
+        rng = np.random.default_rng([seed, index])
+        chunk["score"] = burnout_score(chunk, rng.uniform(0, 0.1, len(batch)))
+        return ids, chunk
+
+    batch = []
+    index = 0
+    for row in qs.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield build(batch, index)
+            batch = []
+            index += 1
+    if batch:
+        yield build(batch, index)
+
+
+# ---- Pipeline ----
+
+def split_mask(ids, split):
+    return (ids % VAL_EVERY == 0) if split == "val" else (ids % VAL_EVERY != 0)
+
+
+def encode_chunk(chunk, encoders):
+    X = np.column_stack([
+        *(chunk[name] for name in NUMERIC_FEATURES),
+        encoders.planet.transform(chunk["transit_planet"]),
+        encoders.house.transform(chunk["natal_house"]),
+        encoders.sleep.transform(chunk["sleep_quality"]),
+    ]).astype(np.float32)
+    y_class = encoders.label.transform(burnout_label(chunk["score"]))
+    return X, y_class, chunk["score"].astype(np.float32)
+
+
+class Pipeline:
+    """
+    Re-iterable stream of encoded (X, y_class, y_score) chunks. `chunks`
+    is a zero-argument callable returning a fresh chunk iterator.
+    """
+
+    def __init__(self, chunks, batch_size=32, seed=42):
+        from sklearn.preprocessing import MinMaxScaler
+
+        self.chunks = chunks
+        self.batch_size = batch_size
+        self.seed = seed
+        self.encoders = Encoders()
+        self.scaler = MinMaxScaler()
+        self.rows = 0
+        self.steps = {"train": 0, "val": 0}
+
+    def fit_scaler(self):
+        """First pass: feature ranges via partial_fit, one chunk at a time."""
+        started = time.perf_counter()
+        rows = 0
+        for ids, chunk in self.chunks():
+            X, _, _ = encode_chunk(chunk, self.encoders)
+            self.scaler.partial_fit(X)
+            rows += len(X)
+            # Batch counts per split, so Keras knows where an epoch ends
+            val = int(split_mask(ids, "val").sum())
+            self.steps["val"] += -(-val // self.batch_size)
+            self.steps["train"] += -(-(len(ids) - val) // self.batch_size)
+        if not rows:
+            raise SystemExit("No training rows.")
+        self.rows = rows
+        report("scaler pass", rows, time.perf_counter() - started)
+
+    def batches(self, split):
+        """Yields shuffled mini-batches; shuffling stays within a chunk."""
+        for index, (ids, chunk) in enumerate(self.chunks()):
+            mask = split_mask(ids, split)
+            if not mask.any():
+                continue
+            X, y_class, y_score = encode_chunk({k: v[mask] for k, v in chunk.items()}, self.encoders)
+            X = self.scaler.transform(X).astype(np.float32)
+            order = np.random.default_rng([self.seed, index]).permutation(len(X))
+            for start in range(0, len(order), self.batch_size):
+                take = order[start:start + self.batch_size]
+                yield X[take], {"class_output": y_class[take], "score_output": y_score[take]}
+
+    def dataset(self, split):
+        import tensorflow as tf
+
+        signature = (
+            tf.TensorSpec(shape=(None, 8), dtype=tf.float32),
+            {
+                "class_output": tf.TensorSpec(shape=(None,), dtype=tf.int64),
+                "score_output": tf.TensorSpec(shape=(None,), dtype=tf.float32),
+            },
+        )
+        return (
+            tf.data.Dataset.from_generator(lambda: self.batches(split), output_signature=signature)
+            .repeat()
+            .prefetch(tf.data.AUTOTUNE)
+        )
+
+
+def report(stage, rows, elapsed):
+    rate = rows / elapsed if elapsed else 0
+    print(f"{stage}: {rows} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+
+def build_model(n_classes):
+    import tensorflow as tf
+
+    # Multi-output model (classification + score)
+    input_layer = tf.keras.layers.Input(shape=(8,))
+    dense1 = tf.keras.layers.Dense(64, activation="relu")(input_layer)
+    dense2 = tf.keras.layers.Dense(32, activation="relu")(dense1)
+
+    class_output = tf.keras.layers.Dense(n_classes, activation="softmax", name="class_output")(dense2)
+    score_output = tf.keras.layers.Dense(1, activation="sigmoid", name="score_output")(dense2)
+
+    model = tf.keras.Model(inputs=input_layer, outputs=[class_output, score_output])
+    model.compile(
+        optimizer="adam",
+        loss={"class_output": "sparse_categorical_crossentropy", "score_output": "mse"},
+        metrics={"class_output": "accuracy", "score_output": "mse"},
+    )
+    return model
+
+
+def save(model, pipeline, model_dir):
+    os.makedirs(model_dir, exist_ok=True)
+    model.save(os.path.join(model_dir, "burnout_model.keras"))
+
+    artifacts = {
+        "burnout_scaler.pkl": pipeline.scaler,
+        "burnout_class_encoder.pkl": pipeline.encoders.label,
+        "burnout_planet_encoder.pkl": pipeline.encoders.planet,
+        "burnout_house_encoder.pkl": pipeline.encoders.house,
+        "burnout_sleep_encoder.pkl": pipeline.encoders.sleep,
+    }
+    for name, obj in artifacts.items():
+        with open(os.path.join(model_dir, name), "wb") as f:
+            pickle.dump(obj, f)
+
+
+def train(pipeline, epochs=12, model_dir=MODEL_DIR):
+    import tensorflow as tf
+
+    pipeline.fit_scaler()
+    model = build_model(len(pipeline.encoders.label.classes_))
+
+    started = time.perf_counter()
+    model.fit(
+        pipeline.dataset("train"),
+        validation_data=pipeline.dataset("val"),
+        epochs=epochs,
+        steps_per_epoch=pipeline.steps["train"],
+        validation_steps=pipeline.steps["val"] or None,
+        verbose=2,
+    )
+    report("training", pipeline.rows * epochs, time.perf_counter() - started)
+
+    save(model, pipeline, model_dir)
+    return model
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--rows", type=int, default=None,
+                        help=f"Synthetic rows (default {SYNTHETIC_ROWS}), or a cap on database "
+                             "rows (default: all of them).")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model-dir", default=MODEL_DIR,
+                        help="Where the raw artifacts are written before bundling.")
+    parser.add_argument("--bundles-dir", default=None,
+                        help="Versioned bundle directory (default <model-dir>/bundles).")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="Write the artifacts but do not publish a new bundle version.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(args.seed)
+
+    if args.source == "db":
+        setup_django()
+        chunks = lambda: database_chunks(args.chunk_size, limit=args.rows or None, seed=args.seed)  # noqa: E731
+    else:
+        rows = SYNTHETIC_ROWS if args.rows is None else args.rows
+        chunks = lambda: synthetic_chunks(rows, args.chunk_size, args.seed)  # noqa: E731
+
+    pipeline = Pipeline(chunks, batch_size=args.batch_size, seed=args.seed)
+    print(f"Training burnout model from {args.source} data...")
+    train(pipeline, epochs=args.epochs, model_dir=args.model_dir)
+
+    # Same directory as this script
+    from export_numpy_model import export, publish, verify
+    verify(export(model_dir=args.model_dir), model_dir=args.model_dir)
+
+    if not args.no_publish:
+        bundles_dir = args.bundles_dir or os.path.join(args.model_dir, "bundles")
+        # Workers pick the new version up on their next poll
+        print(f"Published bundle {publish(args.model_dir, bundles_dir)}")
+
+    print("Burnout model training complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
-import requests
 from django.conf import settings
 
-BASE_URL = "https://json.astrologyapi.com/v1"
+from core.api.client import AstrologyAPIError, get_client
+from core.services import ephemeris
+from core.services.astro_cache import cached_natal_chart
+from core.services.fanout import submit
+from core.services.instrumentation import timed
+
+
+def local_engine_enabled():
+    """True when charts come from core.services.ephemeris rather than AstrologyAPI."""
+    return getattr(settings, "ASTROLOGY_BACKEND", "local") == "local"
+
+
+def engine_payload(payload):
+    # Cache entries of the two backends (and of engine versions) must not mix
+    return {**payload, "engine": ephemeris.ENGINE_VERSION}
 
 
 def astrology_api_request(endpoint: str, payload: dict):
@@ -14,17 +27,18 @@ def astrology_api_request(endpoint: str, payload: dict):
     if not user or not key:
         return {"error": "Missing AstrologyAPI credentials"}
 
-    url = f"{BASE_URL}/{endpoint}"
-
     try:
-        resp = requests.post(url, json=payload, auth=(user, key))
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
+        return get_client().post(endpoint, payload)
+    except AstrologyAPIError as e:
         return {"error": str(e)}
 
 
-def get_natal_interpretation(birth_date, birth_time, latitude, longitude, timezone):
+@timed("natal")
+def get_natal_interpretation(birth_date, birth_time, latitude, longitude, timezone, profile=None):
+    """
+    Natal chart for the given birth data. Cached forever (and written through
+    to NatalChart.raw_chart_data when a profile is given).
+    """
     payload = {
         "day": birth_date.day,
         "month": birth_date.month,
@@ -35,5 +49,17 @@ def get_natal_interpretation(birth_date, birth_time, latitude, longitude, timezo
         "lon": longitude,
         "tzone": timezone,
     }
-    return astrology_api_request("natal_chart_interpretation", payload)
+    if local_engine_enabled():
+        return cached_natal_chart(
+            engine_payload(payload), lambda: ephemeris.natal_chart(payload), profile=profile,
+        )
+    return cached_natal_chart(
+        payload,
+        lambda: astrology_api_request("natal_chart_interpretation", payload),
+        profile=profile,
+    )
+
 
+def submit_natal_interpretation(*args, **kwargs):
+    """Thread-pooled get_natal_interpretation; returns a Future."""
+    return submit(get_natal_interpretation, *args, **kwargs)
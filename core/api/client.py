@@ -0,0 +1,174 @@
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from core.services.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://json.astrologyapi.com/v1"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AstrologyAPIError(Exception):
+    pass
+
+
+class CircuitOpenError(AstrologyAPIError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `reset_after` seconds. The first call after that is let through as a
+    trial (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                # Let one trial call through; others keep failing fast
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class AstrologyClient:
+    """
+    Shared AstrologyAPI client: one pooled keep-alive session per process,
+    connect/read timeouts, bounded retries with jittered exponential
+    backoff, and a circuit breaker so a failing upstream is not hammered.
+    """
+
+    def __init__(self, base_url=None, auth=None, connect_timeout=3.05, read_timeout=10.0,
+                 max_retries=2, backoff=0.3, pool_size=10, breaker=None):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.auth = auth
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Pooled sockets must not be shared with a forked child
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def sleep_before_retry(self, attempt):
+        # Full jitter: uniform in [0, backoff * 2^attempt]
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    @timed("astrology_api")
+    def post(self, endpoint: str, payload: dict):
+        """
+        POSTs `payload` to `endpoint` and returns the decoded JSON.
+        Raises CircuitOpenError without touching the network while the
+        circuit is open, and AstrologyAPIError once retries are exhausted.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("AstrologyAPI circuit is open")
+
+        url = f"{self.base_url}/{endpoint}"
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.sleep_before_retry(attempt - 1)
+            try:
+                resp = self.session.post(url, json=payload, auth=self.auth, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+                continue
+
+            if resp.status_code in RETRY_STATUSES:
+                last_error = AstrologyAPIError(f"{resp.status_code} from {endpoint}")
+                continue
+
+            try:
+                resp.raise_for_status()
+                data = resp.json()
+            except (requests.HTTPError, ValueError) as e:
+                # Client errors and bad bodies are not retried, and do not
+                # mean the upstream is down
+                self.breaker.record_success()
+                raise AstrologyAPIError(str(e)) from e
+
+            self.breaker.record_success()
+            return data
+
+        self.breaker.record_failure()
+        logger.warning("AstrologyAPI %s failed after %d attempts: %s",
+                       endpoint, self.max_retries + 1, last_error)
+        raise AstrologyAPIError(str(last_error)) from last_error
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client built from settings."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AstrologyClient(
+                base_url=getattr(settings, "ASTROLOGY_API_BASE_URL", None),
+                auth=(settings.ASTROLOGY_API_USER_ID, settings.ASTROLOGY_API_KEY),
+                connect_timeout=settings.ASTROLOGY_API_CONNECT_TIMEOUT,
+                read_timeout=settings.ASTROLOGY_API_READ_TIMEOUT,
+                max_retries=settings.ASTROLOGY_API_MAX_RETRIES,
+                backoff=settings.ASTROLOGY_API_BACKOFF,
+                pool_size=settings.ASTROLOGY_API_POOL_SIZE,
+                breaker=CircuitBreaker(
+                    threshold=settings.ASTROLOGY_API_BREAKER_THRESHOLD,
+                    reset_after=settings.ASTROLOGY_API_BREAKER_RESET,
+                ),
+            )
+        return _client
@@ -0,0 +1,150 @@
+"""
+Local stand-in for AstrologyAPI, for load tests and offline development.
+
+    stub = StubAstrologyAPI(latency=0.2, jitter=0.05).start()
+    settings.ASTROLOGY_API_BASE_URL = stub.url
+    ...
+    stub.stop()
+
+Answers the endpoints this app calls with canned, deterministic bodies
+after a configurable delay, and fails a configurable share of calls
+with a 503 so retries and the circuit breaker are exercised too.
+fail_next(n) fails exactly the next n calls, for tests.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+PLANETS = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn"]
+NATURES = ["Stressful", "Challenging", "Mixed", "Growth", "Harmonious"]
+
+
+def natal_chart_body(payload):
+    rng = random.Random(json.dumps(payload, sort_keys=True))
+    return {
+        "planets": [
+            {"name": name, "sign": rng.choice(SIGNS), "degree": round(rng.uniform(0, 30), 2)}
+            for name in PLANETS
+        ],
+        "houses": [{"house": i + 1, "sign": SIGNS[(i + rng.randrange(12)) % 12]} for i in range(12)],
+        "aspects": [
+            {"planet_1": a, "planet_2": b, "aspect": rng.choice(["Trine", "Square", "Conjunction"]),
+             "orb": round(rng.uniform(0, 8), 2)}
+            for a, b in zip(PLANETS, PLANETS[1:])
+        ],
+        "moon_phase": {"phase": "Waxing Gibbous", "meaning": "Refine and adjust."},
+    }
+
+
+def transits_body(payload):
+    rng = random.Random(json.dumps(payload, sort_keys=True))
+    return {
+        "transits": [
+            {
+                "transit_planet": rng.choice(PLANETS),
+                "natal_planet": rng.choice(PLANETS),
+                "aspect_type": rng.choice(["Square", "Opposition", "Trine"]),
+                "natal_house": rng.randrange(1, 13),
+                "nature": rng.choice(NATURES),
+                "description": "Stub transit.",
+                "start_date": "",
+                "end_date": "",
+            }
+            for _ in range(rng.randrange(2, 6))
+        ],
+    }
+
+
+RESPONSES = {
+    "natal_chart_interpretation": natal_chart_body,
+    "transits_natal": transits_body,
+}
+
+
+class StubAstrologyAPI:
+    def __init__(self, latency=0.2, jitter=0.0, error_rate=0.0, host="127.0.0.1", port=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = {}
+        self._failures_due = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="astrology-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fail_next(self, n=1):
+        with self._lock:
+            self._failures_due = n
+
+    def _record(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            fail = self.rng.random() < self.error_rate
+            if self._failures_due:
+                self._failures_due -= 1
+                fail = True
+        return delay, fail
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+
+                delay, fail = stub._record(endpoint)
+                time.sleep(delay)
+
+                if fail:
+                    self.respond(503, {"error": "stub failure"})
+                elif endpoint in RESPONSES:
+                    self.respond(200, RESPONSES[endpoint](payload))
+                else:
+                    self.respond(404, {"error": f"unknown endpoint {endpoint}"})
+
+            def respond(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up first (read timeout)
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -1,29 +1,17 @@
-import requests
 from django.conf import settings
+from django.utils import timezone as tz
 
-BASE_URL = "https://json.astrologyapi.com/v1"
+from core.api.astrology import engine_payload, local_engine_enabled
+from core.api.client import AstrologyAPIError, get_client
+from core.services import ephemeris
+from core.services.astro_cache import cached_transits
+from core.services.fanout import submit
+from core.services.instrumentation import timed
+from core.services.transit_risk import risk_level
 
 
-def convert_nature_to_risk(nature: str) -> str:
-    if not nature:
-        return "Low"
-    n = nature.lower()
-    if any(word in n for word in ["stress", "challenge", "restriction", "crisis"]):
-        return "High"
-    if any(word in n for word in ["mixed", "lesson", "growth"]):
-        return "Moderate"
-    return "Low"
-
-
-def get_transit_alerts(birth_date, birth_time, lat, lon, timezone):
-    user = settings.ASTROLOGY_API_USER_ID
-    key = settings.ASTROLOGY_API_KEY
-
-    if not user or not key:
-        return []
-
-    url = f"{BASE_URL}/transits_natal"
-    payload = {
+def build_transit_payload(birth_date, birth_time, lat, lon, timezone):
+    return {
         "day": birth_date.day,
         "month": birth_date.month,
         "year": birth_date.year,
@@ -34,22 +22,76 @@ def get_transit_alerts(birth_date, birth_time, lat, lon, timezone):
         "tzone": timezone,
     }
 
+
+def convert_nature_to_risk(nature):
+    """Kept for existing callers; see transit_risk.risk_level."""
+    return risk_level(nature)
+
+
+def fetch_transit_alerts(payload):
+    if local_engine_enabled():
+        return parse_transits(ephemeris.transits(payload, tz.localdate()))
+
+    user = settings.ASTROLOGY_API_USER_ID
+    key = settings.ASTROLOGY_API_KEY
+
+    if not user or not key:
+        return []
+
     try:
-        resp = requests.post(url, json=payload, auth=(user, key))
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception as e:
+        data = get_client().post("transits_natal", payload)
+    except AstrologyAPIError as e:
         return [{"transit_name": "API error", "description": str(e), "risk_level": "Low"}]
+    return parse_transits(data)
 
+
+def parse_transits(data):
+    """Alerts from a transits_natal response body (remote or local engine)."""
     alerts = []
     for item in data.get("transits", []):
         name = f"{item.get('transit_planet')} {item.get('aspect_type')} {item.get('natal_planet')}"
         alerts.append({
             "transit_name": name,
+            "transit_planet": item.get("transit_planet") or "",
+            "natal_house": str(item.get("natal_house") or ""),
             "description": item.get("description", "No description provided."),
             "impact_area": item.get("nature", "General"),
-            "risk_level": convert_nature_to_risk(item.get("nature")),
+            "risk_level": risk_level(item.get("nature")),
             "start_date": item.get("start_date", ""),
             "end_date": item.get("end_date", ""),
         })
     return alerts
+
+
+def cache_payload(payload):
+    """The payload transits are cached (and stored) under for the active backend."""
+    return engine_payload(payload) if local_engine_enabled() else payload
+
+
+def is_cacheable(alerts):
+    if local_engine_enabled():
+        return True
+    # Neither missing credentials nor upstream failures should stick for a day
+    if not settings.ASTROLOGY_API_USER_ID or not settings.ASTROLOGY_API_KEY:
+        return False
+    return not any(a.get("transit_name") == "API error" for a in alerts)
+
+
+@timed("transits")
+def get_transit_alerts(birth_date, birth_time, lat, lon, timezone, profile=None):
+    """
+    Today's transit alerts for the given birth data. Cached until local
+    midnight (and written through to AstrologicalTransit when a profile is given).
+    """
+    payload = build_transit_payload(birth_date, birth_time, lat, lon, timezone)
+    return cached_transits(
+        cache_payload(payload),
+        lambda: fetch_transit_alerts(payload),
+        profile=profile,
+        cacheable=is_cacheable,
+    )
+
+
+def submit_transit_alerts(*args, **kwargs):
+    """Thread-pooled get_transit_alerts; returns a Future."""
+    return submit(get_transit_alerts, *args, **kwargs)
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .services.instrumentation import install_db_wrapper
+
+        if getattr(settings, "INSTRUMENTATION_ENABLED", True):
+            # Times ORM queries into the current request's trace
+            connection_created.connect(install_db_wrapper, dispatch_uid="core.instrumentation.db")
@@ -1,33 +1,219 @@
 import os
 import pickle
 import numpy as np
-import tensorflow as tf
 from django.conf import settings
 
+from core.services import model_bundle
+from core.services.batching import MicroBatcher
+from core.services.instrumentation import timed
+from core.services.model_registry import registry
+
 # Path to the model_files directory
 MODEL_DIR = os.path.join(settings.BASE_DIR, "core", "model_files")
 
 # Path to burnout model file
 MODEL_PATH = os.path.join(MODEL_DIR, "burnout_model.keras")
 
-# Load TensorFlow model
-burnout_model = tf.keras.models.load_model(MODEL_PATH)
+# Framework-free export of the same model (ai_training/export_numpy_model.py)
+NUMPY_MODEL_PATH = os.path.join(MODEL_DIR, "burnout_model.npz")
+
+# Versioned bundles (core/services/model_bundle.py); the flat files above
+# are only used when nothing has been published
+BUNDLES_DIR = getattr(settings, "BURNOUT_BUNDLES_DIR", os.path.join(MODEL_DIR, "bundles"))
+
+UNVERSIONED = "unversioned"
+
+
+FEATURE_FIELDS = (
+    "heart_rate",
+    "hrv_score",
+    "sleep_hours",
+    "activity_level",
+    "stress_level",
+    "transit_planet",
+    "natal_house",
+    "sleep_quality",
+)
+
+
+class KerasBurnoutModel:
+    """
+    The TensorFlow model plus its sklearn scaler and label encoders.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR):
+        import tensorflow as tf
+
+        # Load TensorFlow model
+        self.model = tf.keras.models.load_model(os.path.join(model_dir, "burnout_model.keras"))
+
+        # Load scalers/encoders
+        with open(os.path.join(model_dir, "burnout_scaler.pkl"), "rb") as f:
+            self.scaler = pickle.load(f)
+
+        with open(os.path.join(model_dir, "burnout_class_encoder.pkl"), "rb") as f:
+            self.class_encoder = pickle.load(f)
+
+        with open(os.path.join(model_dir, "burnout_planet_encoder.pkl"), "rb") as f:
+            self.planet_encoder = pickle.load(f)
+
+        with open(os.path.join(model_dir, "burnout_house_encoder.pkl"), "rb") as f:
+            self.house_encoder = pickle.load(f)
+
+        with open(os.path.join(model_dir, "burnout_sleep_encoder.pkl"), "rb") as f:
+            self.sleep_encoder = pickle.load(f)
+
+    def encode_features(self, rows):
+        """
+        Turns a list of feature dicts into the raw (unscaled) model input matrix.
+        Raises KeyError for missing fields and ValueError for unknown labels.
+        """
+        columns = {name: [row[name] for row in rows] for name in FEATURE_FIELDS}
+
+        return np.column_stack([
+            np.asarray(columns["heart_rate"], dtype=float),
+            np.asarray(columns["hrv_score"], dtype=float),
+            np.asarray(columns["sleep_hours"], dtype=float),
+            np.asarray(columns["activity_level"], dtype=float),
+            np.asarray(columns["stress_level"], dtype=float),
+            self.planet_encoder.transform(columns["transit_planet"]),
+            self.house_encoder.transform(columns["natal_house"]),
+            self.sleep_encoder.transform(columns["sleep_quality"]),
+        ])
+
+    def predict_burnout_batch(self, rows):
+        if not rows:
+            return []
+        return self.run_model(self.encode_features(rows))
+
+    def run_model(self, features):
+        """
+        One vectorized forward pass over an (n, 8) feature matrix.
+        Returns a list of (burnout_category, burnout_score) tuples.
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        if len(features) == 0:
+            return []
+
+        features_scaled = self.scaler.transform(features)
+
+        # predict_on_batch skips the per-call data pipeline that predict() builds
+        class_pred, score_pred = self.model.predict_on_batch(features_scaled)
+
+        categories = self.class_encoder.inverse_transform(np.argmax(class_pred, axis=1))
+        scores = np.asarray(score_pred, dtype=float).reshape(-1)
+
+        return [(str(c), float(s)) for c, s in zip(categories, scores)]
+
+
+def check_schema(engine, schema):
+    """Refuses a bundle whose feature layout differs from what callers send."""
+    if list(schema.get("features", [])) != list(FEATURE_FIELDS):
+        raise model_bundle.BundleError(f"Bundle features {schema.get('features')} != {list(FEATURE_FIELDS)}")
+    vocabularies = {
+        "transit_planet": engine.planet_encoder,
+        "natal_house": engine.house_encoder,
+        "sleep_quality": engine.sleep_encoder,
+        "classes": engine.class_encoder,
+    }
+    for name, encoder in vocabularies.items():
+        if name in schema and list(schema[name]) != [str(c) for c in encoder.classes_]:
+            raise model_bundle.BundleError(f"Bundle {name} vocabulary does not match its encoder")
 
-# Load scalers/encoders
-with open(os.path.join(MODEL_DIR, "burnout_scaler.pkl"), "rb") as f:
-    scaler = pickle.load(f)
 
-with open(os.path.join(MODEL_DIR, "burnout_class_encoder.pkl"), "rb") as f:
-    class_encoder = pickle.load(f)
+def current_version():
+    return model_bundle.current_version(BUNDLES_DIR)
+
+
+def load_engine(backend=None):
+    """
+    "keras" loads TensorFlow; "numpy" runs the exported .npz without it.
+    Loads the published bundle named by CURRENT after checking its hashes
+    and schema, or the flat model_files/ artifacts if none is published.
+    """
+    backend = backend or getattr(settings, "BURNOUT_BACKEND", "keras")
+    if backend not in ("keras", "numpy"):
+        raise ValueError(f"Unknown BURNOUT_BACKEND: {backend!r}")
+
+    version = current_version()
+    if version:
+        model_dir = os.path.join(BUNDLES_DIR, version)
+        manifest = model_bundle.load_manifest(model_dir)
+    else:
+        model_dir, manifest = MODEL_DIR, None
+
+    if backend == "numpy":
+        from core.burnout_numpy import NumpyBurnoutModel
+        engine = NumpyBurnoutModel.load(os.path.join(model_dir, "burnout_model.npz"))
+    else:
+        engine = KerasBurnoutModel(model_dir)
+
+    if manifest:
+        check_schema(engine, manifest["schema"])
+    engine.version = version or UNVERSIONED
+    return engine
+
+
+# Loaded on first prediction, not at import (see services/model_registry.py).
+# Each worker polls CURRENT and swaps in newly published bundles.
+registry.register(
+    "burnout",
+    load_engine,
+    current_version=current_version,
+    poll_interval=getattr(settings, "BURNOUT_MODEL_POLL_SECONDS", 30),
+)
+
+
+def get_engine():
+    return registry.get("burnout")
+
+
+def encode_features(rows):
+    return get_engine().encode_features(rows)
+
+
+def run_model(features):
+    return get_engine().run_model(features)
+
+
+@timed("inference")
+def predict_burnout_batch_versioned(rows):
+    """
+    Scores many feature dicts (keys in FEATURE_FIELDS) in a single forward
+    pass. Returns (results, model_version).
+    """
+    # One engine for the whole call, even if a reload swaps it meanwhile
+    engine = get_engine()
+    return engine.predict_burnout_batch(rows), engine.version
+
+
+def predict_burnout_batch(rows):
+    return predict_burnout_batch_versioned(rows)[0]
+
+
+def run_batch(items):
+    """
+    MicroBatcher callback over (engine, features) items. Items encoded
+    before a model swap are still run on the engine that encoded them.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for i, (engine, _) in enumerate(items):
+        groups.setdefault(id(engine), (engine, []))[1].append(i)
 
-with open(os.path.join(MODEL_DIR, "burnout_planet_encoder.pkl"), "rb") as f:
-    planet_encoder = pickle.load(f)
+    for engine, indexes in groups.values():
+        outputs = engine.run_model(np.vstack([items[i][1] for i in indexes]))
+        for i, (category, score) in zip(indexes, outputs):
+            results[i] = (category, score, engine.version)
+    return results
 
-with open(os.path.join(MODEL_DIR, "burnout_house_encoder.pkl"), "rb") as f:
-    house_encoder = pickle.load(f)
 
-with open(os.path.join(MODEL_DIR, "burnout_sleep_encoder.pkl"), "rb") as f:
-    sleep_encoder = pickle.load(f)
+# Concurrent single-row calls are coalesced into one forward pass
+batcher = MicroBatcher(
+    run_batch,
+    max_batch_size=getattr(settings, "BURNOUT_BATCH_MAX_SIZE", 64),
+    max_wait=getattr(settings, "BURNOUT_BATCH_MAX_WAIT_MS", 5) / 1000.0,
+)
 
 
 def predict_burnout(heart_rate, hrv_score, sleep_hours,
@@ -36,34 +222,32 @@ def predict_burnout(heart_rate, hrv_score, sleep_hours,
     """
     Returns burnout category (low/medium/high) AND numeric risk (0-1).
     """
-    # Encode categorical values
-    planet_val = planet_encoder.transform([transit_planet])[0]
-    house_val = house_encoder.transform([natal_house])[0]
-    sleep_val = sleep_encoder.transform([sleep_quality])[0]
-
-    # Build feature array
-    features = np.array([[
-        heart_rate,
-        hrv_score,
-        sleep_hours,
-        activity_level,
-        stress_level,
-        planet_val,
-        house_val,
-        sleep_val
-    ]])
-
-    # Scale numerical inputs
-    features_scaled = scaler.transform(features)
-
-    # Run the model
-    class_pred, score_pred = burnout_model.predict(features_scaled)
-
-    # Convert class prediction to label
-    class_idx = np.argmax(class_pred, axis=1)[0]
-    burnout_category = class_encoder.inverse_transform([class_idx])[0]
-
-    # Extract numeric burnout score (0–1)
-    burnout_score = float(score_pred[0][0])
-
-    return burnout_category, burnout_score
+    category, score, _ = predict_burnout_versioned(
+        heart_rate, hrv_score, sleep_hours, activity_level, stress_level,
+        transit_planet, natal_house, sleep_quality,
+    )
+    return category, score
+
+
+@timed("inference")
+def predict_burnout_versioned(heart_rate, hrv_score, sleep_hours,
+                              activity_level, stress_level,
+                              transit_planet, natal_house, sleep_quality):
+    """Like predict_burnout, plus the version of the model that scored it."""
+    engine = get_engine()
+    # Encode in the caller so a bad label only fails this request
+    features = engine.encode_features([{
+        "heart_rate": heart_rate,
+        "hrv_score": hrv_score,
+        "sleep_hours": sleep_hours,
+        "activity_level": activity_level,
+        "stress_level": stress_level,
+        "transit_planet": transit_planet,
+        "natal_house": natal_house,
+        "sleep_quality": sleep_quality,
+    }])
+
+    if not getattr(settings, "BURNOUT_BATCHING_ENABLED", True):
+        return run_batch([(engine, features)])[0]
+
+    return batcher.submit((engine, features)).result()
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Keys stored in the exported .npz artifact (see ai_training/export_numpy_model.py)
+DENSE_LAYERS = ("dense", "dense_1")
+OUTPUT_LAYERS = ("class_output", "score_output")
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class LabelVocab:
+    """NumPy stand-in for a fitted sklearn LabelEncoder (sorted classes_)."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def transform(self, values):
+        # dtype=str sizes to the longest label; the classes' fixed width would truncate
+        values = np.asarray(values, dtype=str)
+        idx = np.searchsorted(self.classes_, values)
+        idx = np.clip(idx, 0, len(self.classes_) - 1)
+        unknown = self.classes_[idx] != values
+        if unknown.any():
+            raise ValueError(f"y contains previously unseen labels: {values[unknown].tolist()}")
+        return idx
+
+    def inverse_transform(self, idx):
+        return self.classes_[np.asarray(idx)]
+
+
+class NumpyBurnoutModel:
+    """
+    Framework-free runtime for the 8 -> 64 -> 32 -> (softmax, sigmoid) burnout MLP.
+    Reproduces the Keras model plus its MinMaxScaler and LabelEncoders.
+    """
+
+    def __init__(self, weights, scale, offset, planet_classes, house_classes,
+                 sleep_classes, class_classes):
+        self.weights = weights
+        self.scale = scale
+        self.offset = offset
+        self.planet_encoder = LabelVocab(planet_classes)
+        self.house_encoder = LabelVocab(house_classes)
+        self.sleep_encoder = LabelVocab(sleep_classes)
+        self.class_encoder = LabelVocab(class_classes)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            weights = {
+                name: (data[f"{name}/kernel"], data[f"{name}/bias"])
+                for name in DENSE_LAYERS + OUTPUT_LAYERS
+            }
+            return cls(
+                weights=weights,
+                scale=data["scaler/scale"],
+                offset=data["scaler/min"],
+                planet_classes=data["planet_classes"],
+                house_classes=data["house_classes"],
+                sleep_classes=data["sleep_classes"],
+                class_classes=data["class_classes"],
+            )
+
+    def forward(self, features_scaled):
+        """Returns (class probabilities, burnout scores) for a scaled batch."""
+        h = features_scaled
+        for name in DENSE_LAYERS:
+            kernel, bias = self.weights[name]
+            h = _relu(h @ kernel + bias)
+
+        kernel, bias = self.weights["class_output"]
+        class_pred = _softmax(h @ kernel + bias)
+
+        kernel, bias = self.weights["score_output"]
+        score_pred = _sigmoid(h @ kernel + bias)
+
+        return class_pred, score_pred[:, 0]
+
+    def encode_features(self, rows):
+        """Same contract as core.burnout_model.encode_features."""
+        return np.column_stack([
+            np.asarray([row["heart_rate"] for row in rows], dtype=float),
+            np.asarray([row["hrv_score"] for row in rows], dtype=float),
+            np.asarray([row["sleep_hours"] for row in rows], dtype=float),
+            np.asarray([row["activity_level"] for row in rows], dtype=float),
+            np.asarray([row["stress_level"] for row in rows], dtype=float),
+            self.planet_encoder.transform([row["transit_planet"] for row in rows]),
+            self.house_encoder.transform([row["natal_house"] for row in rows]),
+            self.sleep_encoder.transform([row["sleep_quality"] for row in rows]),
+        ])
+
+    def run_model(self, features):
+        """
+        One vectorized forward pass over an (n, 8) unscaled feature matrix.
+        Returns a list of (burnout_category, burnout_score) tuples.
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        if len(features) == 0:
+            return []
+
+        class_pred, scores = self.forward(features * self.scale + self.offset)
+        categories = self.class_encoder.inverse_transform(np.argmax(class_pred, axis=1))
+
+        return [(str(c), float(s)) for c, s in zip(categories, scores)]
+
+    def predict_burnout_batch(self, rows):
+        if not rows:
+            return []
+        return self.run_model(self.encode_features(rows))
@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BACKENDS = ("keras", "numpy")
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+# Reference results committed with the model (`--baseline` without a
+# path); refresh with --out after an intended performance change
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "core", "ai_training", "benchmarks", "baseline.json")
+
+# Fields compared against a baseline: (metric, higher_is_better). Only the
+# median is stable enough to gate on; p99 over a few hundred calls is
+# reported but not compared
+COMPARED = (("p50_ms", False),)
+
+# A baseline only means something on the same kind of host
+ENVIRONMENT = ("machine", "cpu_count", "python")
+
+
+def sample_rows(engine, n, seed=0):
+    """Deterministic, valid feature dicts drawn from the model's own vocabularies."""
+    rng = np.random.default_rng(seed)
+    planets = engine.planet_encoder.classes_
+    houses = engine.house_encoder.classes_
+    qualities = engine.sleep_encoder.classes_
+    return [
+        {
+            "heart_rate": int(rng.integers(55, 120)),
+            "hrv_score": float(rng.uniform(10, 80)),
+            "sleep_hours": float(rng.uniform(2, 10)),
+            "activity_level": int(rng.integers(0, 10)),
+            "stress_level": int(rng.integers(1, 10)),
+            "transit_planet": str(rng.choice(planets)),
+            "natal_house": str(rng.choice(houses)),
+            "sleep_quality": str(rng.choice(qualities)),
+        }
+        for _ in range(n)
+    ]
+
+
+def timed(fn, arg, iterations, warmup):
+    for _ in range(warmup):
+        fn(arg)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - started)
+    return np.asarray(samples)
+
+
+def summarize(samples, rows_per_call):
+    return {
+        "calls": len(samples),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 4),
+        "mean_ms": round(float(samples.mean()) * 1000, 4),
+        "rows_per_sec": round(rows_per_call * len(samples) / float(samples.sum()), 1),
+    }
+
+
+def iterations_for(batch_size, budget_rows):
+    # Enough calls for a stable p99 on small batches without
+    # spending minutes on the 10k-row case
+    return max(5, min(200, budget_rows // batch_size))
+
+
+def run_backend(batch_sizes, budget_rows, warmup, seed):
+    """Measures the backend selected by BURNOUT_BACKEND in this process."""
+    from core import burnout_model
+
+    started = time.perf_counter()
+    engine = burnout_model.get_engine()
+    load_seconds = time.perf_counter() - started
+
+    rows = sample_rows(engine, max(batch_sizes), seed=seed)
+    cases = []
+
+    # The public single-row path, including micro-batching
+    single = rows[0]
+    samples = timed(lambda row: burnout_model.predict_burnout(**row), single,
+                    iterations_for(1, budget_rows), warmup)
+    cases.append(dict(case="predict_burnout", batch_size=1, **summarize(samples, 1)))
+
+    for size in batch_sizes:
+        samples = timed(burnout_model.predict_burnout_batch, rows[:size],
+                        iterations_for(size, budget_rows), warmup)
+        cases.append(dict(case="predict_burnout_batch", batch_size=size, **summarize(samples, size)))
+
+    return {
+        "backend": settings.BURNOUT_BACKEND,
+        "model_version": engine.version,
+        "load_seconds": round(load_seconds, 4),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "cases": cases,
+    }
+
+
+def best_of(reports):
+    """Merges repeated runs of one backend, keeping each case's best figures."""
+    best = dict(reports[0], cases=[dict(c) for c in reports[0]["cases"]])
+    best["runs"] = len(reports)
+    best["load_seconds"] = min(r["load_seconds"] for r in reports)
+    best["peak_rss_bytes"] = min(r["peak_rss_bytes"] for r in reports)
+    for report in reports[1:]:
+        for case, other in zip(best["cases"], report["cases"]):
+            for metric in ("p50_ms", "p99_ms", "mean_ms"):
+                case[metric] = min(case[metric], other[metric])
+            case["rows_per_sec"] = max(case["rows_per_sec"], other["rows_per_sec"])
+    return best
+
+
+def environment_mismatch(results, baseline):
+    """Names of ENVIRONMENT fields that differ from the baseline's host."""
+    return [
+        f"{field} {baseline.get(field)!r} -> {results.get(field)!r}"
+        for field in ENVIRONMENT if baseline.get(field) != results.get(field)
+    ]
+
+
+def compare(results, baseline, tolerance, min_delta_ms=0.0):
+    """
+    Returns a list of human-readable regressions against the baseline. A
+    case regresses when it is worse by more than `tolerance` (relative)
+    and, for latencies, by more than `min_delta_ms`.
+    """
+    def index(report):
+        return {
+            (b["backend"], c["case"], c["batch_size"]): c
+            for b in report["backends"] for c in b["cases"]
+        }
+
+    current, previous = index(results), index(baseline)
+    regressions = []
+    for key, old in previous.items():
+        new = current.get(key)
+        if new is None:
+            continue
+        for metric, higher_is_better in COMPARED:
+            if higher_is_better:
+                worse = new[metric] < old[metric] * (1 - tolerance)
+            else:
+                worse = (new[metric] > old[metric] * (1 + tolerance)
+                         and new[metric] - old[metric] > min_delta_ms)
+            if worse:
+                backend, case, size = key
+                regressions.append(
+                    f"{backend} {case}[{size}] {metric}: {old[metric]} -> {new[metric]}"
+                )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks burnout inference per backend and batch size (p50/p99 latency, "
+        "rows/s, load time, peak RSS). Runs offline against the bundled model. Each "
+        "run of a backend is measured in its own subprocess so RSS is not shared."
+    )
+    # System checks import the URLconf and with it the model module; the
+    # parent only spawns workers and has no use for it
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", choices=BACKENDS, action="append",
+                            help="Backend to measure (repeatable; default all).")
+        parser.add_argument("--batch-sizes", default=",".join(map(str, BATCH_SIZES)),
+                            help="Comma-separated batch sizes (default %(default)s).")
+        parser.add_argument("--budget-rows", type=int, default=20000,
+                            help="Approximate rows scored per case; sets the number of calls.")
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--out", help="Write results JSON here.")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per backend; each case keeps its best result (default %(default)s).")
+        parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                            help="Fail if median latency regresses against this results JSON "
+                                 "(without a path: the committed reference). Skipped when the "
+                                 "machine, CPU count or Python version differ.")
+        parser.add_argument("--tolerance", type=float, default=0.5,
+                            help="Allowed relative slowdown of a median before a case counts as a "
+                                 "regression. Medians of separate processes vary by tens of percent "
+                                 "on shared hosts, so the gate is for gross regressions.")
+        parser.add_argument("--min-delta-ms", type=float, default=0.25,
+                            help="Slowdowns smaller than this are scheduler noise and never count.")
+        parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        batch_sizes = sorted({int(s) for s in options["batch_sizes"].split(",") if s.strip()})
+
+        if options["worker"]:
+            report = run_backend(batch_sizes, options["budget_rows"], options["warmup"], options["seed"])
+            self.stdout.write(json.dumps(report))
+            return
+
+        results = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "backends": [],
+        }
+        for backend in options["backend"] or BACKENDS:
+            self.stdout.write(f"Benchmarking {backend}...")
+            runs = [self.spawn(backend, options) for _ in range(max(1, options["repeat"]))]
+            results["backends"].append(best_of(runs))
+
+        for report in results["backends"]:
+            self.stdout.write(
+                f"{report['backend']} ({report['model_version']}, best of {report['runs']}): "
+                f"load {report['load_seconds']}s, peak RSS {report['peak_rss_bytes'] / 2**20:.0f} MiB"
+            )
+            for case in report["cases"]:
+                self.stdout.write(
+                    f"  {case['case']:<22} {case['batch_size']:>6}  p50 {case['p50_ms']:>9.3f} ms  "
+                    f"p99 {case['p99_ms']:>9.3f} ms  {case['rows_per_sec']:>12,.0f} rows/s"
+                )
+
+        if options["out"]:
+            with open(options["out"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Wrote {options['out']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            mismatch = environment_mismatch(results, baseline)
+            if mismatch:
+                self.stdout.write(self.style.WARNING(
+                    f"Skipping comparison with {options['baseline']}: recorded on another host "
+                    f"({', '.join(mismatch)})."
+                ))
+                return
+            self.stdout.write(f"Comparing median latency against {options['baseline']} "
+                              f"({baseline.get('created_at')})")
+            regressions = compare(results, baseline, options["tolerance"], options["min_delta_ms"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def spawn(self, backend, options):
+        env = dict(os.environ, BURNOUT_BACKEND=backend, TF_CPP_MIN_LOG_LEVEL="2")
+        cmd = [
+            sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), "benchmark_inference", "--worker",
+            "--batch-sizes", options["batch_sizes"],
+            "--budget-rows", str(options["budget_rows"]),
+            "--warmup", str(options["warmup"]),
+            "--seed", str(options["seed"]),
+        ]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise CommandError(f"{backend} benchmark failed:\n{proc.stderr[-2000:]}")
+        # The report is the last line; TensorFlow may print before it
+        return json.loads(proc.stdout.strip().splitlines()[-1])
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import UserProfile
+from core.services.rollups import compact, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Applies the biometric retention policy: deletes raw readings older than "
+        "BIOMETRIC_RAW_RETENTION_DAYS and hourly rollups older than "
+        "BIOMETRIC_HOURLY_RETENTION_DAYS. Daily and weekly rollups are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Rebuild rollups from raw rows first (backfill data ingested before rollups existed).")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            for profile in UserProfile.objects.order_by("id").iterator():
+                count = rebuild_rollups(profile)
+                self.stdout.write(f"{profile.full_name}: {count} rollup buckets")
+
+        raw_deleted, hourly_deleted = compact()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {raw_deleted} raw readings (> {settings.BIOMETRIC_RAW_RETENTION_DAYS} days) "
+            f"and {hourly_deleted} hourly rollups (> {settings.BIOMETRIC_HOURLY_RETENTION_DAYS} days)."
+        ))
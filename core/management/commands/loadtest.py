@@ -0,0 +1,449 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dt_time, timedelta
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.utils import timezone
+
+from core.api.stub import StubAstrologyAPI
+from core.models import AIPrediction, BiometricData, UserProfile
+
+PROFILE_PREFIX = "loadtest-"
+
+# While stubbing, astrology responses and rendered pages go to caches of
+# their own so stub data never lands under the real cache keys
+LOADTEST_CACHES = {
+    "ASTROLOGY_CACHE_ALIAS": "loadtest-astrology",
+    "PAGE_CACHE_ALIAS": "loadtest-pages",
+}
+DEFAULT_MIX = "dashboard=4,reports=2,natal=1,predict=3"
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+HISTOGRAM_EDGES_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+PREDICT_CHOICES = {
+    "transit_planet": ["Mars", "Saturn", "Moon", "Mercury", "Venus"],
+    "natal_house": ["1st", "4th", "6th", "8th", "12th"],
+    "sleep_quality": ["Poor", "Fair", "Good", "Excellent"],
+}
+
+
+# ---------------------------------------------------
+# SEEDING
+# ---------------------------------------------------
+def seed_data(profiles, biometrics, predictions, seed):
+    """Creates `profiles` loadtest profiles with history; returns their names."""
+    from core.services import anomalies
+    from core.services.feature_store import rebuild_features
+    from core.services.risk_snapshots import rebuild_snapshots
+    from core.services.rollups import rebuild_rollups
+
+    rng = np.random.default_rng(seed)
+    now = timezone.now()
+    today = timezone.localdate()
+    names = []
+
+    for i in range(profiles):
+        profile = UserProfile.objects.create(
+            full_name=f"{PROFILE_PREFIX}{i:04d}",
+            birth_date=date(1970 + i % 40, 1 + i % 12, 1 + i % 28),
+            birth_time=dt_time(i % 24, (7 * i) % 60),
+            birth_latitude=float(rng.uniform(-60, 60)),
+            birth_longitude=float(rng.uniform(-180, 180)),
+            birth_timezone=float(rng.integers(-8, 9)),
+        )
+        names.append(profile.full_name)
+
+        BiometricData.objects.bulk_create([
+            BiometricData(
+                user_profile=profile,
+                timestamp=now - timedelta(minutes=15 * n),
+                heart_rate=int(rng.integers(55, 120)),
+                hrv_score=float(rng.uniform(10, 80)),
+                sleep_hours=float(rng.uniform(4, 9)),
+                activity_level=int(rng.integers(0, 10)),
+                stress_level=int(rng.integers(1, 10)),
+                sleep_quality=str(rng.choice(PREDICT_CHOICES["sleep_quality"])),
+            )
+            for n in range(biometrics)
+        ], batch_size=1000)
+
+        AIPrediction.objects.bulk_create([
+            AIPrediction(
+                user_profile=profile,
+                prediction_date=today - timedelta(days=n // 3),
+                prediction_burnout_risk=float(rng.uniform(0, 1)),
+                predicted_burnout_level=str(rng.choice(["low", "medium", "high"])),
+                contributing_factors="Load test.",
+                recommendations="Load test.",
+            )
+            for n in range(predictions)
+        ], batch_size=1000)
+
+        # bulk_create sends no signals
+        rebuild_snapshots(profile)
+        rebuild_rollups(profile)
+        rebuild_features(profile)
+        anomalies.replay(profile, emit=False)
+
+    return names
+
+
+def cleanup_data():
+    deleted, _ = UserProfile.objects.filter(full_name__startswith=PROFILE_PREFIX).delete()
+    return deleted
+
+
+# ---------------------------------------------------
+# IN-PROCESS SERVER
+# ---------------------------------------------------
+class QueryCountingApp:
+    """WSGI wrapper reporting each request's DB query count in X-Query-Count."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        count = 0
+        response = {}
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        def capture(status, headers, exc_info=None):
+            response.update(status=status, headers=headers, exc_info=exc_info)
+            return lambda data: None
+
+        with connection.execute_wrapper(counter):
+            # Buffer the body so queries made while it renders are counted too
+            result = self.app(environ, capture)
+            try:
+                body = b"".join(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+
+        headers = response["headers"] + [("X-Query-Count", str(count))]
+        start_response(response["status"], headers, response["exc_info"])
+        return [body]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_app_server(port=0):
+    from django.core.wsgi import get_wsgi_application
+
+    app = QueryCountingApp(get_wsgi_application())
+    server = ThreadedWSGIServer(("127.0.0.1", port), QuietHandler)
+    server.daemon_threads = True
+    server.set_app(app)
+    threading.Thread(target=server.serve_forever, name="loadtest-app", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+# ---------------------------------------------------
+# DRIVER
+# ---------------------------------------------------
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise CommandError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def predict_path(rng, names):
+    params = {
+        "heart_rate": rng.randint(55, 120),
+        "hrv_score": round(rng.uniform(10, 80), 1),
+        "sleep_hours": round(rng.uniform(2, 10), 1),
+        "activity_level": rng.randint(0, 9),
+        "stress_level": rng.randint(1, 9),
+    }
+    params.update({k: rng.choice(v) for k, v in PREDICT_CHOICES.items()})
+    return "/predict_burnout/?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+
+ENDPOINTS = {
+    "dashboard": lambda rng, names: "/dashboard/",
+    "reports": lambda rng, names: "/reports/",
+    "natal": lambda rng, names: f"/natal/{rng.choice(names)}/",
+    "predict": predict_path,
+}
+
+
+class Driver:
+    """
+    Open-loop load: requests start on a fixed schedule whatever the
+    server's response times, so a slow server builds a queue instead of
+    quietly lowering the offered rate. Latency is measured from each
+    request's scheduled start.
+    """
+
+    def __init__(self, base_url, mix, rps, duration, concurrency, names, seed=0, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.rps = rps
+        self.duration = duration
+        self.concurrency = concurrency
+        self.names = names
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def fire(self, endpoint, path, scheduled):
+        sent = time.monotonic()
+        result = {"endpoint": endpoint, "status": None, "queries": None, "error": None}
+        try:
+            resp = self.session().get(self.base_url + path, timeout=self.timeout)
+            result["status"] = resp.status_code
+            if "X-Query-Count" in resp.headers:
+                result["queries"] = int(resp.headers["X-Query-Count"])
+        except requests.RequestException as e:
+            result["error"] = type(e).__name__
+        done = time.monotonic()
+        result["latency"] = done - scheduled
+        result["service"] = done - sent
+        return result
+
+    def run(self):
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        total = int(self.rps * self.duration)
+        futures = []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="loadtest") as pool:
+            started = time.monotonic()
+            for i in range(total):
+                scheduled = started + i / self.rps
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                endpoint = self.rng.choices(names, weights)[0]
+                path = ENDPOINTS[endpoint](self.rng, self.names)
+                futures.append(pool.submit(self.fire, endpoint, path, scheduled))
+            results = [f.result() for f in futures]
+            elapsed = time.monotonic() - started
+
+        return results, elapsed
+
+
+# ---------------------------------------------------
+# REPORT
+# ---------------------------------------------------
+def histogram(latencies_ms):
+    counts = np.histogram(latencies_ms, bins=[0, *HISTOGRAM_EDGES_MS, np.inf])[0]
+    labels = [f"<={edge}ms" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]}ms"]
+    return dict(zip(labels, counts.tolist()))
+
+
+def summarize(results, elapsed):
+    by_endpoint = defaultdict(list)
+    for r in results:
+        by_endpoint[r["endpoint"]].append(r)
+
+    endpoints = {}
+    for name, rows in sorted(by_endpoint.items()):
+        latency = np.array([r["latency"] for r in rows]) * 1000
+        service = np.array([r["service"] for r in rows]) * 1000
+        errors = sum(1 for r in rows if r["error"] or r["status"] >= 400)
+        queries = [r["queries"] for r in rows if r["queries"] is not None]
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "status_codes": dict(sorted(
+                (str(code), sum(1 for r in rows if (r["status"] or r["error"]) == code))
+                for code in {r["status"] or r["error"] for r in rows}
+            )),
+            "latency_ms": {
+                "p50": round(float(np.percentile(latency, 50)), 2),
+                "p90": round(float(np.percentile(latency, 90)), 2),
+                "p99": round(float(np.percentile(latency, 99)), 2),
+                "max": round(float(latency.max()), 2),
+            },
+            "service_ms_p50": round(float(np.percentile(service, 50)), 2),
+            "queries": {
+                "mean": round(float(np.mean(queries)), 2) if queries else None,
+                "max": max(queries) if queries else None,
+            },
+            "histogram": histogram(latency),
+        }
+
+    return {
+        "requests": len(results),
+        "elapsed_seconds": round(elapsed, 2),
+        "achieved_rps": round(len(results) / elapsed, 2) if elapsed else 0,
+        "endpoints": endpoints,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "HTTP load test of the dashboard, reports, natal chart and predict_burnout "
+        "views. Seeds loadtest profiles, serves the app in-process (threaded WSGI) "
+        "against a local AstrologyAPI stub, drives an open-loop request mix and "
+        "reports latency histograms, error rates and DB queries per endpoint. "
+        "Writes to the configured database: use a disposable SQLite or local Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", type=int, default=10)
+        parser.add_argument("--biometrics", type=int, default=1000, help="Biometric rows per profile.")
+        parser.add_argument("--predictions", type=int, default=100, help="Prediction rows per profile.")
+        parser.add_argument("--no-seed", action="store_true", help="Reuse loadtest profiles from an earlier --keep-data run.")
+        parser.add_argument("--keep-data", action="store_true", help="Do not delete loadtest profiles afterwards.")
+
+        parser.add_argument("--rps", type=float, default=20, help="Offered requests per second.")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds of load.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Client threads.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights (default %(default)s).")
+        parser.add_argument("--seed", type=int, default=0)
+
+        parser.add_argument("--stub-latency", type=float, default=200, help="AstrologyAPI stub latency in ms.")
+        parser.add_argument("--stub-jitter", type=float, default=50, help="+/- ms of uniform jitter.")
+        parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Share of stub calls answered with 503.")
+        parser.add_argument("--cold-cache", action="store_true",
+                            help="Clear the load test's AstrologyAPI response cache first so every profile "
+                                 "hits the stub. The real cache is never touched.")
+
+        parser.add_argument("--target", help="Load an already running server at this URL instead of "
+                                             "serving in-process. It must use the stub URL printed at start "
+                                             "and ACTIVE_PROFILE_ID of a loadtest profile (seed one with "
+                                             "--keep-data, then run with --no-seed).")
+        parser.add_argument("--out", help="Write the JSON report here.")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+
+        stub = StubAstrologyAPI(
+            latency=options["stub_latency"] / 1000,
+            jitter=options["stub_jitter"] / 1000,
+            error_rate=options["stub_error_rate"],
+            seed=options["seed"],
+        ).start()
+        self.stdout.write(f"AstrologyAPI stub at {stub.url}")
+        self.use_stub(stub.url, options["cold_cache"])
+
+        try:
+            if options["no_seed"]:
+                names = list(
+                    UserProfile.objects.filter(full_name__startswith=PROFILE_PREFIX)
+                    .order_by("id").values_list("full_name", flat=True)
+                )
+            else:
+                cleanup_data()
+                started = time.monotonic()
+                names = seed_data(options["profiles"], options["biometrics"], options["predictions"], options["seed"])
+                self.stdout.write(f"Seeded {len(names)} profiles in {time.monotonic() - started:.1f}s")
+            if not names:
+                raise CommandError("No loadtest profiles to use.")
+
+            # Dashboard, reports and predict act for the active profile and
+            # write to it; point them at a loadtest profile, never a real one
+            active_id = UserProfile.objects.filter(full_name=names[0]).values_list("id", flat=True).get()
+            server = None
+            base_url = options["target"]
+            if base_url:
+                self.stdout.write(self.style.WARNING(
+                    f"The target must run with ACTIVE_PROFILE_ID={active_id}, or its writes land on a real profile."
+                ))
+            else:
+                settings.ACTIVE_PROFILE_ID = active_id
+                server, base_url = start_app_server()
+            self.stdout.write(
+                f"Driving {options['rps']} rps for {options['duration']}s against {base_url} ({options['mix']})"
+            )
+
+            driver = Driver(
+                base_url, mix, options["rps"], options["duration"], options["concurrency"],
+                names, seed=options["seed"],
+            )
+            results, elapsed = driver.run()
+            if server:
+                server.shutdown()
+
+            report = summarize(results, elapsed)
+            report["config"] = {k: options[k] for k in (
+                "profiles", "biometrics", "predictions", "rps", "duration", "concurrency",
+                "mix", "stub_latency", "stub_jitter", "stub_error_rate", "seed",
+            )}
+            report["config"]["database"] = settings.DATABASES["default"]["ENGINE"]
+            report["stub_calls"] = dict(stub.calls)
+            self.print_report(report)
+
+            if options["out"]:
+                with open(options["out"], "w") as f:
+                    json.dump(report, f, indent=2)
+                self.stdout.write(f"Wrote {options['out']}")
+        finally:
+            stub.stop()
+            if not options["keep_data"] and not options["no_seed"]:
+                cleanup_data()
+
+    def use_stub(self, url, cold_cache):
+        from django.core.cache import caches
+        from core.api import client
+
+        # The point is exercising the remote path, not the local engine
+        settings.ASTROLOGY_BACKEND = "api"
+        settings.ASTROLOGY_API_BASE_URL = url
+        settings.ASTROLOGY_API_USER_ID = settings.ASTROLOGY_API_USER_ID or "loadtest"
+        settings.ASTROLOGY_API_KEY = settings.ASTROLOGY_API_KEY or "loadtest"
+        # The shared client captured the real base URL; rebuild it
+        client._client = None
+
+        # caches reads this same dict, so aliases added here resolve in every thread
+        for setting, alias in LOADTEST_CACHES.items():
+            settings.CACHES[alias] = {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(settings.BASE_DIR, ".cache", alias),
+                "TIMEOUT": None,
+            }
+            setattr(settings, setting, alias)
+        if cold_cache:
+            caches[settings.ASTROLOGY_CACHE_ALIAS].clear()
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"\n{report['requests']} requests in {report['elapsed_seconds']}s "
+            f"({report['achieved_rps']} rps achieved)"
+        )
+        for name, stats in report["endpoints"].items():
+            lat = stats["latency_ms"]
+            self.stdout.write(
+                f"\n{name}: {stats['requests']} requests, {stats['error_rate']:.1%} errors "
+                f"{stats['status_codes']}, queries/request mean {stats['queries']['mean']} max {stats['queries']['max']}"
+            )
+            self.stdout.write(
+                f"  latency ms  p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  max {lat['max']}"
+            )
+            peak = max(stats["histogram"].values()) or 1
+            for label, count in stats["histogram"].items():
+                bar = "#" * round(40 * count / peak)
+                self.stdout.write(f"  {label:>9} {count:>6} {bar}")
+        self.stdout.write(f"\nStub calls: {report['stub_calls']}")
@@ -0,0 +1,139 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core.api.astrology import local_engine_enabled
+from core.api.transits import (
+    build_transit_payload,
+    cache_payload,
+    fetch_transit_alerts,
+    is_cacheable,
+    parse_transits,
+)
+from core.models import AstrologicalTransit, UserProfile
+from core.services import ephemeris
+from core.services.astro_cache import store_transits, transits_known
+
+
+def profiles_with_birth_data():
+    return UserProfile.objects.filter(
+        birth_date__isnull=False,
+        birth_time__isnull=False,
+        birth_latitude__isnull=False,
+        birth_longitude__isnull=False,
+    ).order_by("id")
+
+
+def transit_payload(profile):
+    return build_transit_payload(
+        profile.birth_date,
+        profile.birth_time,
+        profile.birth_latitude,
+        profile.birth_longitude,
+        profile.birth_timezone,
+    )
+
+
+def precompute_profile(profile, day):
+    """Fetches and stores one profile's transits. Returns the row count or None on failure."""
+    try:
+        payload = transit_payload(profile)
+        alerts = fetch_transit_alerts(payload)
+        if not is_cacheable(alerts):
+            return None
+        store_transits(cache_payload(payload), alerts, profile=profile, day=day)
+        return len(alerts)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetches today's transits for every profile with birth data and stores "
+        "them in AstrologicalTransit, so views read local rows instead of the API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Concurrent AstrologyAPI requests (default 4; unused by the local engine).")
+        parser.add_argument("--force", action="store_true",
+                            help="Refetch profiles that already have rows for today.")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running and repeat shortly after each local midnight.")
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_once(options["workers"], options["force"])
+            if not options["loop"]:
+                return
+            self.sleep_until_tomorrow()
+
+    def run_once(self, workers, force):
+        day = timezone.localdate()
+        profiles = profiles_with_birth_data()
+
+        if not force:
+            # Resume: profiles already stored for today are skipped
+            done = AstrologicalTransit.objects.filter(transit_date=day).values("user_profile_id")
+            profiles = profiles.exclude(id__in=done)
+
+        profiles = list(profiles)
+        if not force and profiles:
+            # Profiles with no transits today have no rows; their cached result marks them done
+            known = transits_known([cache_payload(transit_payload(p)) for p in profiles], day)
+            profiles = [p for p, done in zip(profiles, known) if not done]
+
+        self.stdout.write(f"Precomputing transits for {len(profiles)} profiles ({day})...")
+
+        started = time.perf_counter()
+        stored = failed = 0
+
+        if local_engine_enabled():
+            stored = self.compute_locally(profiles, day)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {stored} transits for {len(profiles)} profiles in {elapsed:.1f}s (local engine)"
+            ))
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(precompute_profile, p, day): p for p in profiles}
+            for future in as_completed(futures):
+                profile = futures[future]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    count = None
+                    self.stderr.write(f"  {profile.full_name}: {e}")
+                if count is None:
+                    failed += 1
+                else:
+                    stored += count
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} transits for {len(profiles) - failed} profiles "
+            f"({failed} failed) in {elapsed:.1f}s"
+        ))
+
+    def compute_locally(self, profiles, day, chunk_size=500):
+        """One vectorized ephemeris pass per chunk of profiles; no threads needed."""
+        stored = 0
+        for i in range(0, len(profiles), chunk_size):
+            chunk = profiles[i:i + chunk_size]
+            payloads = [transit_payload(p) for p in chunk]
+            for profile, payload, data in zip(chunk, payloads, ephemeris.transits_for(payloads, day)):
+                alerts = parse_transits(data)
+                store_transits(cache_payload(payload), alerts, profile=profile, day=day)
+                stored += len(alerts)
+        return stored
+
+    def sleep_until_tomorrow(self):
+        now = timezone.localtime()
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        wake = timezone.make_aware(tomorrow, now.tzinfo) + timedelta(minutes=5)
+        time.sleep(max((wake - now).total_seconds(), 60))
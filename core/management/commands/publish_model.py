@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ai_training.export_numpy_model import publish
+from core.burnout_model import BUNDLES_DIR, MODEL_DIR
+from core.services import model_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        "Publishes the burnout artifacts in model_files/ as a new versioned bundle, "
+        "or re-activates an existing version. Running workers pick the change up "
+        "within BURNOUT_MODEL_POLL_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--src", default=MODEL_DIR,
+                            help="Directory with the trained artifacts (default core/model_files).")
+        parser.add_argument("--activate", metavar="VERSION",
+                            help="Point CURRENT at an already published version (rollback).")
+        parser.add_argument("--list", action="store_true", help="List published versions.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            current = model_bundle.current_version(BUNDLES_DIR)
+            names = sorted(os.listdir(BUNDLES_DIR)) if os.path.isdir(BUNDLES_DIR) else []
+            for name in names:
+                if os.path.isdir(os.path.join(BUNDLES_DIR, name)) and not name.startswith("."):
+                    self.stdout.write(("* " if name == current else "  ") + name)
+            return
+
+        if options["activate"]:
+            version = options["activate"]
+            try:
+                model_bundle.load_manifest(os.path.join(BUNDLES_DIR, version))
+            except model_bundle.BundleError as e:
+                raise CommandError(str(e))
+            model_bundle.write_atomic(os.path.join(BUNDLES_DIR, model_bundle.CURRENT), version + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Activated {version}"))
+            return
+
+        try:
+            version = publish(options["src"], BUNDLES_DIR)
+        except model_bundle.BundleError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Published {version}"))
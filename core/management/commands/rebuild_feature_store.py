@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.models import UserProfile
+from core.services.feature_store import rebuild_features
+
+
+class Command(BaseCommand):
+    help = "Recomputes rolling biometric feature state from raw rows (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", type=int, action="append",
+                            help="Only rebuild this profile id (repeatable).")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.order_by("id")
+        if options["profile"]:
+            profiles = profiles.filter(id__in=options["profile"])
+
+        for profile in profiles.iterator():
+            state = rebuild_features(profile)
+            self.stdout.write(f"{profile.full_name}: {int(state.stats[:, :, 0].max(axis=1).sum())} readings in window")
+
+        self.stdout.write(self.style.SUCCESS("Feature store rebuilt."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.models import UserProfile
+from core.services.risk_snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = "Recomputes DailyRiskSnapshot rows from full history (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", type=int, action="append",
+                            help="Only rebuild this profile id (repeatable).")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.order_by("id")
+        if options["profile"]:
+            profiles = profiles.filter(id__in=options["profile"])
+
+        for profile in profiles.iterator():
+            count = rebuild_snapshots(profile)
+            self.stdout.write(f"{profile.full_name}: {count} daily snapshots")
+
+        self.stdout.write(self.style.SUCCESS("Risk snapshots rebuilt."))
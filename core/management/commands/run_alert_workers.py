@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services.alerts import AlertWorkerPool
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends queued alert notifications (AlertDelivery rows) with a pool of "
+        "worker threads: batched per channel, rate limited, retried with backoff. "
+        "Runs until interrupted; several instances can share the queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.ALERT_WORKERS)
+        parser.add_argument("--batch-size", type=int, default=settings.ALERT_BATCH_SIZE)
+        parser.add_argument("--poll-interval", type=float, default=settings.ALERT_POLL_SECONDS,
+                            help="Seconds an idle worker waits before checking the queue again.")
+        parser.add_argument("--drain", action="store_true",
+                            help="Exit once nothing is due instead of polling forever.")
+
+    def handle(self, *args, **options):
+        pool = AlertWorkerPool(
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+        )
+        self.stdout.write(f"Alert workers: {pool.workers} x batches of {pool.batch_size}")
+        totals = pool.run(drain=options["drain"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, failed attempts {totals['failed']}."
+        ))
@@ -0,0 +1,127 @@
+import io
+import json
+import logging
+import os
+import random
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from core.services.instrumentation import end_trace, observe_request, start_trace
+
+logger = logging.getLogger("core.requests")
+
+
+class InstrumentationMiddleware:
+    """
+    Times every request and the spans recorded inside it (ORM queries,
+    AstrologyAPI calls, burnout inference, template rendering). Adds a
+    Server-Timing header, logs one JSON line per request to core.requests
+    and feeds the /metrics histograms.
+
+    Profiling is opt-in:
+      * ?profile=1 returns a cProfile report instead of the page (allowed
+        with DEBUG, or when the X-Profile-Token header matches
+        REQUEST_PROFILE_TOKEN); ?profile=pyinstrument uses pyinstrument if
+        it is installed.
+      * REQUEST_PROFILE_SAMPLE_RATE > 0 profiles that share of requests and
+        writes .prof files to REQUEST_PROFILE_DIR.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "INSTRUMENTATION_ENABLED", True)
+        self.sample_rate = getattr(settings, "REQUEST_PROFILE_SAMPLE_RATE", 0.0)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        mode = self.profile_mode(request)
+        trace, token = start_trace()
+        started = time.perf_counter()
+        try:
+            if mode:
+                response, profile = self.run_profiled(request, mode)
+            else:
+                response, profile = self.get_response(request), None
+        finally:
+            end_trace(token)
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        observe_request(view, request.method, response.status_code, total, trace)
+        response["Server-Timing"] = trace.server_timing(total)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": view,
+                "status": response.status_code,
+                "duration_ms": round(total * 1000, 2),
+                "spans": trace.as_dict(),
+            }))
+
+        if profile is not None:
+            return self.profile_response(request, mode, profile, view, response)
+        return response
+
+    # ---- profiling ----
+
+    def profile_mode(self, request):
+        requested = request.GET.get("profile")
+        if requested and self.profile_allowed(request):
+            return "pyinstrument" if requested == "pyinstrument" else "cprofile"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def profile_allowed(self, request):
+        token = getattr(settings, "REQUEST_PROFILE_TOKEN", None)
+        if token:
+            return request.headers.get("X-Profile-Token") == token
+        return settings.DEBUG
+
+    def run_profiled(self, request, mode):
+        if mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                return HttpResponse("pyinstrument is not installed.", status=501), None
+            profiler = Profiler()
+            profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+            return response, profiler
+
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        return response, profiler
+
+    def profile_response(self, request, mode, profiler, view, response):
+        if mode == "pyinstrument":
+            return HttpResponse(profiler.output_html())
+
+        if mode == "sample":
+            directory = getattr(settings, "REQUEST_PROFILE_DIR", "/tmp/unruffled-profiles")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{int(time.time() * 1000)}-{view.replace(':', '_')}.prof")
+            profiler.dump_stats(path)
+            logger.info(json.dumps({"profile": path, "path": request.path}))
+            return response
+
+        import pstats
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out).sort_stats("cumulative")
+        stats.print_stats(60)
+        return HttpResponse(out.getvalue(), content_type="text/plain")
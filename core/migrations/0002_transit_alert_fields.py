@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astrologicaltransit',
+            name='end_date',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='astrologicaltransit',
+            name='impact_area',
+            field=models.CharField(blank=True, default='General', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='astrologicaltransit',
+            name='risk_level',
+            field=models.CharField(default='Low', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='astrologicaltransit',
+            name='start_date',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='astrologicaltransit',
+            name='transit_name',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_transit_alert_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='astrologicaltransit',
+            index=models.Index(fields=['user_profile', 'transit_date'], name='transit_profile_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astrologicaltransit',
+            index=models.Index(fields=['transit_date'], name='transit_date_idx'),
+        ),
+    ]
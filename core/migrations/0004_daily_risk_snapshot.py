@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_transit_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRiskSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('combined_score', models.FloatField(default=0)),
+                ('ai_score', models.FloatField(default=0)),
+                ('hrv_component', models.FloatField(default=0)),
+                ('sleep_component', models.FloatField(default=0)),
+                ('stress_component', models.FloatField(default=0)),
+                ('transit_pressure', models.FloatField(default=0)),
+                ('day_prediction_count', models.IntegerField(default=0)),
+                ('day_prediction_sum', models.FloatField(default=0)),
+                ('total_prediction_count', models.IntegerField(default=0)),
+                ('total_prediction_sum', models.FloatField(default=0)),
+                ('rolling_7d_avg', models.FloatField(blank=True, null=True)),
+                ('rolling_30d_avg', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('latest_biometric', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.biometricdata')),
+                ('latest_prediction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.aiprediction')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'day'), name='risk_snapshot_profile_day_uniq')],
+            },
+        ),
+    ]
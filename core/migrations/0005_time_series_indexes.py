@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_daily_risk_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiprediction',
+            index=models.Index(fields=['user_profile', 'prediction_date', 'timestamp'], name='prediction_profile_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['user_profile', 'timestamp'], name='alert_profile_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['user_profile', 'is_read'], name='alert_profile_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biometricdata',
+            index=models.Index(fields=['user_profile', 'timestamp'], name='bio_profile_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_time_series_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='biometricdata',
+            name='sample_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='biometricdata',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='biometricdata',
+            constraint=models.UniqueConstraint(condition=models.Q(('sample_id__isnull', False)), fields=('user_profile', 'sample_id'), name='bio_profile_sample_uniq'),
+        ),
+    ]
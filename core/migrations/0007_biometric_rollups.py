@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_biometric_sample_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BiometricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily'), ('week', 'Weekly')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('heart_rate_count', models.IntegerField(default=0)),
+                ('heart_rate_sum', models.FloatField(default=0)),
+                ('heart_rate_min', models.IntegerField(blank=True, null=True)),
+                ('heart_rate_max', models.IntegerField(blank=True, null=True)),
+                ('heart_rate_last', models.IntegerField(blank=True, null=True)),
+                ('hrv_score_count', models.IntegerField(default=0)),
+                ('hrv_score_sum', models.FloatField(default=0)),
+                ('hrv_score_min', models.FloatField(blank=True, null=True)),
+                ('hrv_score_max', models.FloatField(blank=True, null=True)),
+                ('hrv_score_last', models.FloatField(blank=True, null=True)),
+                ('sleep_hours_count', models.IntegerField(default=0)),
+                ('sleep_hours_sum', models.FloatField(default=0)),
+                ('sleep_hours_min', models.FloatField(blank=True, null=True)),
+                ('sleep_hours_max', models.FloatField(blank=True, null=True)),
+                ('sleep_hours_last', models.FloatField(blank=True, null=True)),
+                ('stress_level_count', models.IntegerField(default=0)),
+                ('stress_level_sum', models.FloatField(default=0)),
+                ('stress_level_min', models.IntegerField(blank=True, null=True)),
+                ('stress_level_max', models.IntegerField(blank=True, null=True)),
+                ('stress_level_last', models.IntegerField(blank=True, null=True)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'granularity', 'bucket_start'), name='rollup_profile_bucket_uniq')],
+            },
+        ),
+    ]
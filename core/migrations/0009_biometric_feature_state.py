@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alert_delivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BiometricFeatureState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.BinaryField(default=bytes)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feature_state', to='core.userprofile')),
+            ],
+        ),
+    ]
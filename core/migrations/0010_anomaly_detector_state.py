@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_biometric_feature_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyDetectorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_state', to='core.userprofile')),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 # -------------------------------------------------------
@@ -36,7 +37,11 @@ class UserProfile(models.Model):
 # -------------------------------------------------------
 class BiometricData(models.Model):
     user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Defaults to now; bulk ingestion supplies the device's sample time
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    # Client-supplied id that makes ingestion replays idempotent
+    sample_id = models.CharField(max_length=100, null=True, blank=True)
 
     heart_rate = models.IntegerField(null=True, blank=True)
     hrv_score = models.FloatField(null=True, blank=True)
@@ -49,6 +54,18 @@ class BiometricData(models.Model):
     # Used in dashboard + AI formula
     stress_level = models.IntegerField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_profile", "timestamp"], name="bio_profile_ts_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_profile", "sample_id"],
+                condition=models.Q(sample_id__isnull=False),
+                name="bio_profile_sample_uniq",
+            ),
+        ]
+
     def __str__(self):
         return f"Biometric Data for {self.user_profile.full_name} at {self.timestamp}"
 
@@ -66,9 +83,50 @@ class AstrologicalTransit(models.Model):
 
     interpretation = models.TextField()
 
+    # Alert fields as returned by core.api.transits.get_transit_alerts
+    transit_name = models.CharField(max_length=150, blank=True, default="")
+    impact_area = models.CharField(max_length=100, blank=True, default="General")
+    risk_level = models.CharField(max_length=20, default="Low")
+    start_date = models.CharField(max_length=50, blank=True, default="")
+    end_date = models.CharField(max_length=50, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Views and precompute_transits look up one profile's rows for one day
+            models.Index(fields=["user_profile", "transit_date"], name="transit_profile_date_idx"),
+            models.Index(fields=["transit_date"], name="transit_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.transit_planet} in {self.natal_house} for {self.user_profile.full_name}"
 
+    @classmethod
+    def from_alert(cls, user_profile, transit_date, alert):
+        return cls(
+            user_profile=user_profile,
+            transit_date=transit_date,
+            transit_planet=alert.get("transit_planet") or "",
+            natal_house=alert.get("natal_house") or "1st",
+            interpretation=alert.get("description", ""),
+            transit_name=alert.get("transit_name", ""),
+            impact_area=alert.get("impact_area") or "General",
+            risk_level=alert.get("risk_level") or "Low",
+            start_date=alert.get("start_date") or "",
+            end_date=alert.get("end_date") or "",
+        )
+
+    def as_alert(self):
+        return {
+            "transit_name": self.transit_name,
+            "transit_planet": self.transit_planet,
+            "natal_house": self.natal_house,
+            "description": self.interpretation,
+            "impact_area": self.impact_area,
+            "risk_level": self.risk_level,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+        }
+
 
 # -------------------------------------------------------
 # 4. NATAL CHART
@@ -105,6 +163,11 @@ class AIPrediction(models.Model):
     meditation_link = models.URLField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_profile", "prediction_date", "timestamp"], name="prediction_profile_date_idx"),
+        ]
+
     def __str__(self):
         return f"Prediction for {self.user_profile.full_name} on {self.prediction_date}"
 
@@ -127,6 +190,12 @@ class Alert(models.Model):
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_profile", "timestamp"], name="alert_profile_ts_idx"),
+            models.Index(fields=["user_profile", "is_read"], name="alert_profile_unread_idx"),
+        ]
+
     def __str__(self):
         return f"Alert for {self.user_profile.full_name}"
 
@@ -189,3 +258,171 @@ class UserFeedback(models.Model):
 
     def __str__(self):
         return f"Feedback from {self.user_profile.full_name}"
+
+
+# -------------------------------------------------------
+# 10. DAILY RISK SNAPSHOT (materialized, see services/risk_snapshots.py)
+# -------------------------------------------------------
+class DailyRiskSnapshot(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    day = models.DateField()
+
+    latest_biometric = models.ForeignKey(BiometricData, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    latest_prediction = models.ForeignKey(AIPrediction, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+    # Dashboard gauge and its components
+    combined_score = models.FloatField(default=0)
+    ai_score = models.FloatField(default=0)
+    hrv_component = models.FloatField(default=0)
+    sleep_component = models.FloatField(default=0)
+    stress_component = models.FloatField(default=0)
+    transit_pressure = models.FloatField(default=0)
+
+    # Prediction aggregates (raw 0-1 risk values)
+    day_prediction_count = models.IntegerField(default=0)
+    day_prediction_sum = models.FloatField(default=0)
+    total_prediction_count = models.IntegerField(default=0)
+    total_prediction_sum = models.FloatField(default=0)
+    rolling_7d_avg = models.FloatField(null=True, blank=True)
+    rolling_30d_avg = models.FloatField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user_profile", "day"], name="risk_snapshot_profile_day_uniq"),
+        ]
+
+    @property
+    def average_risk(self):
+        if not self.total_prediction_count:
+            return 0
+        return self.total_prediction_sum / self.total_prediction_count
+
+    def __str__(self):
+        return f"Risk snapshot for {self.user_profile.full_name} on {self.day}"
+
+
+# -------------------------------------------------------
+# 11. BIOMETRIC ROLLUPS (hour/day/week, see services/rollups.py)
+# -------------------------------------------------------
+class BiometricRollup(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+
+    granularity = models.CharField(
+        max_length=10,
+        choices=[("hour", "Hourly"), ("day", "Daily"), ("week", "Weekly")],
+    )
+    bucket_start = models.DateTimeField()
+
+    count = models.IntegerField(default=0)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+
+    # Per metric: non-null sample count, sum (mean = sum / count), min, max, last
+
+    heart_rate_count = models.IntegerField(default=0)
+    heart_rate_sum = models.FloatField(default=0)
+    heart_rate_min = models.IntegerField(null=True, blank=True)
+    heart_rate_max = models.IntegerField(null=True, blank=True)
+    heart_rate_last = models.IntegerField(null=True, blank=True)
+
+    hrv_score_count = models.IntegerField(default=0)
+    hrv_score_sum = models.FloatField(default=0)
+    hrv_score_min = models.FloatField(null=True, blank=True)
+    hrv_score_max = models.FloatField(null=True, blank=True)
+    hrv_score_last = models.FloatField(null=True, blank=True)
+
+    sleep_hours_count = models.IntegerField(default=0)
+    sleep_hours_sum = models.FloatField(default=0)
+    sleep_hours_min = models.FloatField(null=True, blank=True)
+    sleep_hours_max = models.FloatField(null=True, blank=True)
+    sleep_hours_last = models.FloatField(null=True, blank=True)
+
+    stress_level_count = models.IntegerField(default=0)
+    stress_level_sum = models.FloatField(default=0)
+    stress_level_min = models.IntegerField(null=True, blank=True)
+    stress_level_max = models.IntegerField(null=True, blank=True)
+    stress_level_last = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_profile", "granularity", "bucket_start"],
+                name="rollup_profile_bucket_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} rollup for {self.user_profile.full_name} at {self.bucket_start}"
+
+
+# -------------------------------------------------------
+# 12. ALERT DELIVERIES (outbox queue, see services/alerts.py)
+# -------------------------------------------------------
+class AlertDelivery(models.Model):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name="deliveries")
+
+    channel = models.CharField(
+        max_length=20,
+        choices=[("Email", "Email"), ("SMS", "SMS"), ("App", "App Notification")],
+    )
+    recipient = models.CharField(max_length=255)
+
+    status = models.CharField(
+        max_length=10,
+        choices=[(PENDING, "Pending"), (SENDING, "Sending"), (SENT, "Sent"), (FAILED, "Failed")],
+        default=PENDING,
+    )
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    # Set when a worker claims the row; stale claims are retried
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="delivery_status_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} delivery to {self.recipient} ({self.status})"
+
+
+# -------------------------------------------------------
+# 13. BIOMETRIC FEATURE STATE (rolling features, see services/feature_store.py)
+# -------------------------------------------------------
+class BiometricFeatureState(models.Model):
+    user_profile = models.OneToOneField(UserProfile, on_delete=models.CASCADE, related_name="feature_state")
+
+    # Packed float64 ring buffer and running statistics
+    state = models.BinaryField(default=bytes)
+    # Newest reading folded in
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Feature state for {self.user_profile.full_name}"
+
+
+# -------------------------------------------------------
+# 14. ANOMALY DETECTOR STATE (see services/anomalies.py)
+# -------------------------------------------------------
+class AnomalyDetectorState(models.Model):
+    user_profile = models.OneToOneField(UserProfile, on_delete=models.CASCADE, related_name="anomaly_state")
+
+    # {metric: {"n", "mean", "var", "cusum", "at"}}; constant size per profile
+    state = models.JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Anomaly detector state for {self.user_profile.full_name}"
@@ -0,0 +1,309 @@
+"""
+Alert evaluation and queued delivery.
+
+Evaluation runs where predictions and biometrics are written (post_save
+for single rows, explicit calls after bulk_create) and costs a few
+queries: it checks the thresholds in settings.ALERT_THRESHOLDS, locks
+the profile row, skips alert types the profile already got today, and
+bulk-creates the Alert rows plus one AlertDelivery row per recipient.
+
+AlertDelivery is the queue. Delivery happens only in the worker pool
+(`manage.py run_alert_workers`): each worker claims a batch of due rows
+with SELECT ... FOR UPDATE SKIP LOCKED, sends them per channel through
+core.services.notifications under a per-channel rate limit, and marks
+them sent or schedules a retry with exponential backoff. Claims that
+are never finished (a crashed worker) are picked up again after
+ALERT_CLAIM_TIMEOUT seconds.
+"""
+import logging
+import random
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.services.notifications import get_backend, get_limiter
+
+logger = logging.getLogger(__name__)
+
+HIGH_RISK = "High Burnout Risk"
+BIOMETRIC_WARNING = "Biometric Warning"
+
+DEFAULT_THRESHOLDS = {
+    "risk": 0.7,          # prediction_burnout_risk, 0-1
+    "stress_level": 8,    # at or above
+    "hrv_score": 20,      # below
+    "sleep_hours": 5,     # below
+}
+
+
+def thresholds():
+    return {**DEFAULT_THRESHOLDS, **getattr(settings, "ALERT_THRESHOLDS", {})}
+
+
+# ---------------------------------------------------
+# EVALUATION
+# ---------------------------------------------------
+def evaluate_predictions(profile, predictions):
+    """Raises a high-risk alert for the riskiest of the new predictions."""
+    from core.models import Alert
+
+    limit = thresholds()["risk"]
+    worst = max(predictions, key=lambda p: p.prediction_burnout_risk, default=None)
+    if worst is None or worst.prediction_burnout_risk < limit:
+        return []
+
+    percentage = round(worst.prediction_burnout_risk * 100, 1)
+    return raise_alerts(profile, [Alert(
+        user_profile=profile,
+        alert_type=HIGH_RISK,
+        alert_message=f"Your predicted burnout risk is {percentage}% ({worst.predicted_burnout_level}).",
+        related_prediction=worst,
+        burnout_percentage=percentage,
+        recommended_action=worst.recommendations,
+    )])
+
+
+def biometric_warnings(reading, limits):
+    warnings = []
+    if reading.stress_level is not None and reading.stress_level >= limits["stress_level"]:
+        warnings.append(f"stress level {reading.stress_level}")
+    if reading.hrv_score is not None and reading.hrv_score < limits["hrv_score"]:
+        warnings.append(f"HRV {reading.hrv_score:g}")
+    if reading.sleep_hours is not None and reading.sleep_hours < limits["sleep_hours"]:
+        warnings.append(f"{reading.sleep_hours:g}h of sleep")
+    return warnings
+
+
+def evaluate_biometrics(profile, biometrics):
+    """
+    Raises a warning for the newest reading that crosses a threshold.
+    Readings older than ALERT_MAX_AGE_HOURS (device backfills) are ignored.
+    """
+    from core.models import Alert
+
+    limits = thresholds()
+    cutoff = timezone.now() - timedelta(hours=getattr(settings, "ALERT_MAX_AGE_HOURS", 24))
+    for reading in sorted(biometrics, key=lambda b: b.timestamp, reverse=True):
+        if reading.timestamp < cutoff:
+            break
+        warnings = biometric_warnings(reading, limits)
+        if warnings:
+            return raise_alerts(profile, [Alert(
+                user_profile=profile,
+                alert_type=BIOMETRIC_WARNING,
+                alert_message=f"Your latest readings show {', '.join(warnings)}.",
+                recommended_action="Take a break, breathe, and prioritise sleep tonight.",
+            )])
+    return []
+
+
+def recipients(profile):
+    """(channel, recipient) pairs for a profile's alerts, honouring preferences."""
+    from core.models import TeamMember, UserPreference
+
+    preference = UserPreference.objects.filter(user_profile=profile).first()
+    if preference is not None and not preference.notify_burnout_risk:
+        return []
+
+    method = preference.preferred_notification_method if preference else "Email"
+    contact = {"Email": profile.email, "SMS": profile.phone}.get(method)
+    # Without the contact detail for their method, users still get the in-app notice
+    targets = [(method, contact) if contact else ("App", str(profile.id))]
+
+    team = (
+        TeamMember.objects.filter(user_profile=profile, can_receive_alerts=True)
+        .values_list("member_email", flat=True)
+    )
+    targets.extend(("Email", email) for email in team if email)
+    return list(dict.fromkeys(targets))
+
+
+def raise_alerts(profile, candidates):
+    """
+    Stores alerts whose type the profile has not had today and queues
+    their deliveries. Returns the created Alert rows.
+
+    The profile row is locked while today's alerts are read and the new
+    ones inserted, so concurrent writers for one profile (post_save from
+    several requests, a bulk import) cannot both raise the same alert.
+    """
+    from core.models import Alert, AlertDelivery, UserProfile
+
+    if not candidates:
+        return []
+    targets = recipients(profile)
+    today = timezone.localdate()
+    now = timezone.now()
+    with transaction.atomic():
+        UserProfile.objects.select_for_update().get(pk=profile.pk)
+        seen = set(
+            Alert.objects.filter(user_profile=profile, alert_date=today)
+            .values_list("alert_type", flat=True)
+        )
+        fresh = []
+        for alert in candidates:
+            if alert.alert_type not in seen:
+                seen.add(alert.alert_type)
+                fresh.append(alert)
+        if not fresh:
+            return []
+
+        created = Alert.objects.bulk_create(fresh)
+        AlertDelivery.objects.bulk_create([
+            AlertDelivery(alert=alert, channel=channel, recipient=recipient, next_attempt_at=now)
+            for alert in created
+            for channel, recipient in targets
+        ])
+    return created
+
+
+# ---------------------------------------------------
+# DELIVERY
+# ---------------------------------------------------
+def claim_batch(limit, now=None):
+    """Marks up to `limit` due deliveries as being sent and returns them."""
+    from core.models import AlertDelivery
+
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "ALERT_CLAIM_TIMEOUT", 300))
+    due = (
+        Q(status=AlertDelivery.PENDING, next_attempt_at__lte=now)
+        | Q(status=AlertDelivery.SENDING, claimed_at__lt=stale)
+    )
+    with transaction.atomic():
+        ids = list(
+            AlertDelivery.objects
+            .select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("next_attempt_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # Re-checking `due` keeps backends without row locks (SQLite) from
+        # handing the same row to two workers
+        AlertDelivery.objects.filter(due, id__in=ids).update(
+            status=AlertDelivery.SENDING, claimed_at=now, attempts=F("attempts") + 1,
+        )
+    return list(AlertDelivery.objects.filter(id__in=ids, claimed_at=now).select_related("alert"))
+
+
+def retry_delay(attempts):
+    base = getattr(settings, "ALERT_RETRY_BASE_SECONDS", 30)
+    # Jittered so a provider outage does not end in a synchronized retry storm
+    return min(base * 2 ** (attempts - 1), 3600) * random.uniform(0.5, 1.5)
+
+
+def send_claimed(deliveries):
+    """Sends claimed deliveries per channel and records the outcome."""
+    from core.models import AlertDelivery
+
+    by_channel = defaultdict(list)
+    for delivery in deliveries:
+        by_channel[delivery.channel].append(delivery)
+
+    max_attempts = getattr(settings, "ALERT_MAX_ATTEMPTS", 5)
+    sent, failed = [], []
+    for channel, batch in by_channel.items():
+        try:
+            backend = get_backend(channel)
+            limiter = get_limiter(channel)
+            if limiter is not None:
+                limiter.acquire(len(batch))
+            results = backend.send_batch(batch)
+        except Exception as e:
+            logger.exception("%s delivery batch failed", channel)
+            results = [e] * len(batch)
+
+        for delivery, error in zip(batch, results):
+            (failed if error else sent).append((delivery, error))
+
+    now = timezone.now()
+    if sent:
+        AlertDelivery.objects.filter(id__in=[d.id for d, _ in sent]).update(
+            status=AlertDelivery.SENT, sent_at=now, claimed_at=None, last_error="",
+        )
+    for delivery, error in failed:
+        delivery.last_error = f"{type(error).__name__}: {error}"[:2000]
+        delivery.claimed_at = None
+        if delivery.attempts >= max_attempts:
+            delivery.status = AlertDelivery.FAILED
+            logger.warning("Giving up on delivery %s after %s attempts: %s",
+                           delivery.id, delivery.attempts, delivery.last_error)
+        else:
+            delivery.status = AlertDelivery.PENDING
+            delivery.next_attempt_at = now + timedelta(seconds=retry_delay(delivery.attempts))
+    if failed:
+        AlertDelivery.objects.bulk_update(
+            [d for d, _ in failed], ["status", "last_error", "claimed_at", "next_attempt_at"],
+        )
+    return len(sent), len(failed)
+
+
+class AlertWorkerPool:
+    """
+    `workers` threads, each claiming and sending batches until stopped.
+    Several pools (processes or hosts) can share one queue.
+    """
+
+    def __init__(self, workers=None, batch_size=None, poll_interval=None):
+        self.workers = workers or getattr(settings, "ALERT_WORKERS", 4)
+        self.batch_size = batch_size or getattr(settings, "ALERT_BATCH_SIZE", 50)
+        self.poll_interval = poll_interval if poll_interval is not None else getattr(
+            settings, "ALERT_POLL_SECONDS", 1.0)
+        self.stop_event = threading.Event()
+        self.totals = {"sent": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def run_once(self):
+        """Claims and sends one batch; returns the number of deliveries handled."""
+        deliveries = claim_batch(self.batch_size)
+        if not deliveries:
+            return 0
+        sent, failed = send_claimed(deliveries)
+        with self._lock:
+            self.totals["sent"] += sent
+            self.totals["failed"] += failed
+        return len(deliveries)
+
+    def worker(self, drain):
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                try:
+                    handled = self.run_once()
+                except Exception:
+                    logger.exception("Alert worker iteration failed")
+                    handled = 0
+                if not handled:
+                    if drain:
+                        return
+                    self.stop_event.wait(self.poll_interval)
+        finally:
+            connections.close_all()
+
+    def run(self, drain=False):
+        """Blocks until stop() (or, with drain=True, until nothing is due)."""
+        threads = [
+            threading.Thread(target=self.worker, args=(drain,), name=f"alert-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+        return self.totals
+
+    def stop(self):
+        self.stop_event.set()
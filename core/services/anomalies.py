@@ -0,0 +1,272 @@
+"""
+Streaming anomaly detection on incoming biometrics.
+
+Per profile and metric (HRV, heart rate) the detector keeps five numbers:
+sample count, EWMA mean and variance, a one-sided CUSUM and the time of
+the last reading. A new reading is standardized against the baseline
+before it, z = (x - mean) / std, signed so that positive means "worse"
+(HRV down, heart rate up), and then folded into the baseline:
+
+    spike   z >= ANOMALY_DETECTION["z"]                 one bad reading
+    shift   CUSUM S = max(0, S + z - k) crosses h       a sustained drift
+
+Nothing is detected until `warmup` readings have built a baseline.
+Detections become Alert rows through alerts.raise_alerts (at most one
+per type per day, deliveries queued for the workers).
+
+Every recursion here is linear or a running max, so a batch of readings
+is scanned with array operations (scan() below) rather than row by row.
+The same scan serves a bulk ingest chunk and replay(), which backfills
+detections over a profile's whole history in one pass and leaves the
+detector state where streaming picks it up.
+"""
+import math
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Metric -> direction that counts as bad
+METRICS = {
+    "hrv_score": -1,
+    "heart_rate": 1,
+}
+
+ALERT_TYPES = {
+    "hrv_score": "HRV Drop",
+    "heart_rate": "Heart Rate Spike",
+}
+
+DEFAULT_SETTINGS = {
+    "alpha": 0.05,    # EWMA weight of each new reading
+    "warmup": 20,     # readings before anything is flagged
+    "z": 3.5,         # spike threshold, in baseline standard deviations
+    "cusum_k": 0.5,   # drift allowance per reading
+    "cusum_h": 8.0,   # shift threshold
+}
+
+
+def detector_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "ANOMALY_DETECTION", {})}
+
+
+def new_metric_state():
+    return {"n": 0, "mean": 0.0, "var": 0.0, "cusum": 0.0, "at": None}
+
+
+# ---------------------------------------------------
+# SCAN
+# ---------------------------------------------------
+def linear_recurrence(u, decay, initial):
+    """
+    y[t] = decay * y[t-1] + u[t] with y[-1] = initial, for all t at once.
+    Worked in blocks short enough that decay ** -block stays well inside
+    float range.
+    """
+    u = np.asarray(u, dtype=float)
+    out = np.empty_like(u)
+    block = int(min(4096, max(1, 27.6 / -math.log(decay)))) if 0 < decay < 1 else 4096
+    powers = decay ** np.arange(1, block + 1)
+    y = initial
+    for start in range(0, len(u), block):
+        chunk = u[start:start + block]
+        p = powers[:len(chunk)]
+        out[start:start + len(chunk)] = p * (y + np.cumsum(chunk / p)) if decay else chunk
+        y = out[start + len(chunk) - 1]
+    return out
+
+
+def scan(state, values, direction, config):
+    """
+    Runs one metric's readings (time-ordered, no NaNs) through the
+    detector. Returns (new_state, detections) where detections are
+    (index, kind, z, baseline) tuples; state["at"] is left to the caller.
+    """
+    x = np.asarray(values, dtype=float)
+    if not len(x):
+        return state, []
+    alpha = config["alpha"]
+    decay = 1 - alpha
+
+    start_mean = state["mean"] if state["n"] else x[0]
+    mean = linear_recurrence(alpha * x, decay, start_mean)
+    prev_mean = np.concatenate([[start_mean], mean[:-1]])
+    error = x - prev_mean
+    var = linear_recurrence(decay * alpha * error ** 2, decay, state["var"])
+    prev_var = np.concatenate([[state["var"]], var[:-1]])
+
+    seen = state["n"] + np.arange(len(x))
+    warm = (seen >= config["warmup"]) & (prev_var > 0)
+    z = np.zeros(len(x))
+    z[warm] = direction * error[warm] / np.sqrt(prev_var[warm])
+
+    # S[t] = max(0, S[t-1] + u[t]) is C[t] - min(0, min C[:t+1]) for C = S0 + cumsum(u)
+    step = np.where(warm, z - config["cusum_k"], 0.0)
+    total = state["cusum"] + np.cumsum(step)
+    cusum = total - np.minimum(np.minimum.accumulate(total), 0.0)
+    prev_cusum = np.concatenate([[state["cusum"]], cusum[:-1]])
+
+    spikes = warm & (z >= config["z"])
+    shifts = (prev_cusum < config["cusum_h"]) & (cusum >= config["cusum_h"]) & ~spikes
+    detections = sorted(
+        [(int(i), "spike", float(z[i]), float(prev_mean[i])) for i in np.flatnonzero(spikes)]
+        + [(int(i), "shift", float(z[i]), float(prev_mean[i])) for i in np.flatnonzero(shifts)]
+    )
+
+    new_state = {
+        "n": int(state["n"] + len(x)),
+        "mean": float(mean[-1]),
+        "var": float(var[-1]),
+        "cusum": float(cusum[-1]),
+        "at": state["at"],
+    }
+    return new_state, detections
+
+
+def scan_readings(states, timestamps, columns, config):
+    """
+    Scans every metric over readings sorted by timestamp. Readings at or
+    before a metric's last scanned time are skipped. Returns detections
+    as (timestamp, metric, kind, value, z, baseline).
+    """
+    found = []
+    epoch = np.array([ts.timestamp() for ts in timestamps])
+    for metric, direction in METRICS.items():
+        state = states.get(metric) or new_metric_state()
+        values = np.asarray(columns[metric], dtype=float)
+        keep = ~np.isnan(values)
+        if state["at"] is not None:
+            keep &= epoch > state["at"]
+        index = np.flatnonzero(keep)
+        state, detections = scan(state, values[index], direction, config)
+        if len(index):
+            state["at"] = float(epoch[index[-1]])
+        states[metric] = state
+        for i, kind, z, baseline in detections:
+            found.append((timestamps[index[i]], metric, kind, float(values[index[i]]), z, baseline))
+    return found
+
+
+# ---------------------------------------------------
+# ALERTS
+# ---------------------------------------------------
+def describe(metric, kind, value, baseline):
+    if metric == "hrv_score":
+        if kind == "spike":
+            return f"Your HRV of {value:.0f} is far below your usual {baseline:.0f}."
+        return f"Your HRV has been running below your usual {baseline:.0f}."
+    if kind == "spike":
+        return f"Your heart rate of {value:.0f} bpm is far above your usual {baseline:.0f}."
+    return f"Your heart rate has been running above your usual {baseline:.0f} bpm."
+
+
+RECOMMENDED_ACTION = "Ease off today: rest, hydrate and check in on how you are feeling."
+
+
+def anomaly_alerts(profile, detections):
+    """One Alert per type, for the newest detection of each."""
+    from core.models import Alert
+
+    newest = {}
+    for ts, metric, kind, value, z, baseline in sorted(detections, key=lambda d: d[0]):
+        newest[ALERT_TYPES[metric]] = (ts, metric, kind, value, baseline)
+    return [
+        Alert(
+            user_profile=profile,
+            alert_type=alert_type,
+            alert_message=describe(metric, kind, value, baseline),
+            recommended_action=RECOMMENDED_ACTION,
+        )
+        for alert_type, (ts, metric, kind, value, baseline) in newest.items()
+    ]
+
+
+# ---------------------------------------------------
+# STREAMING
+# ---------------------------------------------------
+def load_states(profile):
+    """The profile's detector row, locked; call inside a transaction."""
+    from core.models import AnomalyDetectorState
+
+    AnomalyDetectorState.objects.get_or_create(user_profile=profile)
+    return AnomalyDetectorState.objects.select_for_update().get(user_profile=profile)
+
+
+def detect_anomalies(profile, biometrics):
+    """
+    Folds newly written BiometricData rows into the detector and raises
+    alerts for detections in recent readings. Returns the created alerts.
+    """
+    from core.services.alerts import raise_alerts
+
+    if not biometrics:
+        return []
+    readings = sorted(biometrics, key=lambda b: b.timestamp)
+    columns = {metric: [getattr(b, metric) if getattr(b, metric) is not None else math.nan for b in readings]
+               for metric in METRICS}
+
+    with transaction.atomic():
+        row = load_states(profile)
+        detections = scan_readings(row.state, [b.timestamp for b in readings], columns, detector_settings())
+        row.save()
+
+    # Like evaluate_biometrics: device backfills update the baseline but do not alert
+    cutoff = timezone.now() - timedelta(hours=getattr(settings, "ALERT_MAX_AGE_HOURS", 24))
+    recent = [d for d in detections if d[0] >= cutoff]
+    return raise_alerts(profile, anomaly_alerts(profile, recent)) if recent else []
+
+
+# ---------------------------------------------------
+# REPLAY
+# ---------------------------------------------------
+def replay(profile, since=None, emit=True):
+    """
+    Rebuilds the profile's detector from its history (from `since`, or
+    all of it) in one vectorized scan and returns every detection. With
+    emit, stores one Alert per type and day that does not have one yet,
+    dated on the day of the reading. Replayed alerts are history: no
+    deliveries are queued for them.
+    """
+    from core.models import Alert, BiometricData
+
+    qs = BiometricData.objects.filter(user_profile=profile)
+    if since:
+        qs = qs.filter(timestamp__gte=since)
+    rows = list(qs.order_by("timestamp", "id").values_list("timestamp", *METRICS))
+    timestamps = [r[0] for r in rows]
+    columns = {
+        metric: np.array([math.nan if r[i] is None else r[i] for r in rows], dtype=float)
+        for i, metric in enumerate(METRICS, start=1)
+    }
+
+    with transaction.atomic():
+        row = load_states(profile)
+        row.state = {}
+        detections = scan_readings(row.state, timestamps, columns, detector_settings())
+        row.save()
+
+        if emit and detections:
+            by_day = {}
+            for detection in detections:
+                by_day.setdefault(timezone.localdate(detection[0]), []).append(detection)
+            existing = set(
+                Alert.objects.filter(user_profile=profile, alert_date__in=by_day, alert_type__in=ALERT_TYPES.values())
+                .values_list("alert_date", "alert_type")
+            )
+            alerts = []
+            for day, found in by_day.items():
+                for alert in anomaly_alerts(profile, found):
+                    if (day, alert.alert_type) not in existing:
+                        alert.alert_date = day
+                        alert.timestamp = max(d[0] for d in found if ALERT_TYPES[d[1]] == alert.alert_type)
+                        alerts.append(alert)
+            dates = [(alert.alert_date, alert.timestamp) for alert in alerts]
+            created = Alert.objects.bulk_create(alerts, batch_size=1000)
+            # auto_now_add overwrote the dates on insert; put the reading dates back
+            for alert, (day, ts) in zip(created, dates):
+                alert.alert_date, alert.timestamp = day, ts
+            Alert.objects.bulk_update(created, ["alert_date", "timestamp"], batch_size=1000)
+
+    return detections
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def payload_key(kind: str, payload: dict, day=None) -> str:
+    """
+    Stable cache key for an AstrologyAPI call.
+    Payload values are normalized (floats rounded, keys sorted) so equal
+    birth data always maps to the same key.
+    """
+    normalized = {
+        k: round(float(v), 4) if isinstance(v, float) else v
+        for k, v in payload.items()
+    }
+    digest = hashlib.sha1(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    if day is not None:
+        return f"astro:{kind}:{day.isoformat()}:{digest}"
+    return f"astro:{kind}:{digest}"
+
+
+def seconds_until_midnight() -> int:
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.combine(now.date() + timedelta(days=1), time.min),
+        now.tzinfo,
+    )
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def get_cache():
+    return caches[getattr(settings, "ASTROLOGY_CACHE_ALIAS", "default")]
+
+
+def cache_get(key):
+    try:
+        return get_cache().get(key)
+    except Exception:
+        logger.warning("Astrology cache read failed for %s", key, exc_info=True)
+        return None
+
+
+def cache_set(key, value, timeout):
+    try:
+        get_cache().set(key, value, timeout)
+    except Exception:
+        logger.warning("Astrology cache write failed for %s", key, exc_info=True)
+
+
+# ---------------------------------------------------
+# NATAL CHART (pure function of birth data, kept forever)
+# ---------------------------------------------------
+def load_natal_from_db(profile, key):
+    from core.models import NatalChart
+
+    chart = NatalChart.objects.filter(user_profile=profile).only("raw_chart_data").first()
+    if not chart or not chart.raw_chart_data:
+        return None
+    try:
+        stored = json.loads(chart.raw_chart_data)
+    except ValueError:
+        return None
+    # Birth data may have been edited since the chart was stored
+    if not isinstance(stored, dict) or stored.get("cache_key") != key:
+        return None
+    return stored.get("response")
+
+
+def save_natal_to_db(profile, key, response):
+    from core.models import NatalChart
+
+    planets = response.get("planets", [])
+    houses = response.get("houses", [])
+
+    NatalChart.objects.update_or_create(
+        user_profile=profile,
+        defaults={
+            "sun_sign": next((p.get("sign") for p in planets if p.get("name") == "Sun"), "") or "",
+            "moon_sign": next((p.get("sign") for p in planets if p.get("name") == "Moon"), "") or "",
+            "rising_sign": (houses[0].get("sign") if houses else "") or "",
+            "key_aspects": json.dumps(response.get("aspects", [])),
+            "houses": json.dumps(houses),
+            "raw_chart_data": json.dumps({"cache_key": key, "response": response}),
+        },
+    )
+
+
+def cached_natal_chart(payload: dict, fetch, profile=None):
+    key = payload_key("natal", payload)
+
+    response = cache_get(key)
+    if response is not None:
+        return response
+
+    if profile is not None:
+        response = load_natal_from_db(profile, key)
+        if response is not None:
+            cache_set(key, response, None)
+            return response
+
+    response = fetch()
+    if isinstance(response, dict) and "error" not in response:
+        cache_set(key, response, None)
+        if profile is not None:
+            save_natal_to_db(profile, key, response)
+    return response
+
+
+# ---------------------------------------------------
+# TRANSITS (change at most daily, expire at local midnight)
+# ---------------------------------------------------
+def load_transits_from_db(profile, day):
+    from core.models import AstrologicalTransit
+
+    rows = AstrologicalTransit.objects.filter(user_profile=profile, transit_date=day).order_by("id")
+    return [row.as_alert() for row in rows] or None
+
+
+def save_transits_to_db(profile, day, alerts):
+    from core.models import AstrologicalTransit
+    from core.services.risk_snapshots import record_transits
+
+    AstrologicalTransit.objects.filter(user_profile=profile, transit_date=day).delete()
+    AstrologicalTransit.objects.bulk_create([
+        AstrologicalTransit.from_alert(profile, day, alert) for alert in alerts
+    ])
+    record_transits(profile, day, alerts)
+
+
+def store_transits(payload: dict, alerts, profile=None, day=None):
+    """Writes a good transit result to the cache and AstrologicalTransit."""
+    day = day or timezone.localdate()
+
+    cache_set(payload_key("transits", payload, day=day), alerts, seconds_until_midnight())
+    cache_set(payload_key("transits:last", payload), alerts, None)
+    if profile is not None and alerts:
+        save_transits_to_db(profile, day, alerts)
+
+
+def transits_known(payloads, day):
+    """
+    Whether each payload already has a good transit result for `day`.
+    store_transits caches every good result, including an empty one, so
+    this also covers profiles that have no AstrologicalTransit rows.
+    """
+    keys = [payload_key("transits", payload, day=day) for payload in payloads]
+    try:
+        found = get_cache().get_many(keys)
+    except Exception:
+        logger.warning("Astrology cache read failed for %s transit keys", len(keys), exc_info=True)
+        found = {}
+    return [key in found for key in keys]
+
+
+def cached_transits(payload: dict, fetch, profile=None, cacheable=lambda alerts: True):
+    day = timezone.localdate()
+    key = payload_key("transits", payload, day=day)
+
+    alerts = cache_get(key)
+    if alerts is not None:
+        return alerts
+
+    if profile is not None:
+        alerts = load_transits_from_db(profile, day)
+        if alerts is not None:
+            cache_set(key, alerts, seconds_until_midnight())
+            return alerts
+
+    alerts = fetch()
+    if cacheable(alerts):
+        store_transits(payload, alerts, profile=profile, day=day)
+        return alerts
+
+    # Upstream failing: degrade to the most recent good result, if any
+    last_good_key = payload_key("transits:last", payload)
+    stale = cache_get(last_good_key)
+    if stale is not None:
+        logger.info("Serving last known transits for %s", last_good_key)
+        return stale
+    return alerts
@@ -0,0 +1,97 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into one call of `batch_fn`.
+
+    Callers `submit()` an item and get a Future back. A background thread
+    drains the queue and runs `batch_fn` once on the whole batch.
+    `batch_fn` must return one result per item, in order.
+
+    The window is adaptive: a lone caller is dispatched at once. Only when
+    callers are actually overlapping (more than one item queued, or the
+    previous batch had more than one) does the worker wait up to
+    `max_wait` seconds, or until `max_batch_size` items are queued, for
+    more to arrive.
+
+    Coalescing happens within a process: with gunicorn, run threaded
+    workers (gthread) so concurrent requests in a worker share a batch.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=64, max_wait=0.005):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._last_size = 0
+
+    def submit(self, item) -> Future:
+        future = Future()
+        self._ensure_worker().put((item, future))
+        return future
+
+    def __call__(self, item):
+        return self.submit(item).result()
+
+    def _ensure_worker(self):
+        # The worker thread does not survive fork(), so gunicorn workers
+        # forked from a preloaded master each start their own.
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,),
+                    name="burnout-microbatcher", daemon=True,
+                )
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._queue
+
+    def _collect(self, q):
+        batch = [q.get()]
+        # Whatever is already queued joins without waiting
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+
+        # Only hold the window open under real concurrency
+        if len(batch) > 1 or self._last_size > 1:
+            self._wait_for_more(q, batch)
+        self._last_size = len(batch)
+        return batch
+
+    def _wait_for_more(self, q, batch):
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(q.get_nowait())
+                else:
+                    batch.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+    def _run(self, q):
+        while True:
+            batch = self._collect(q)
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
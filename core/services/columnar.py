@@ -0,0 +1,264 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+# Column layout per exported table: (model field, arrow type name)
+TABLES = {
+    "biometrics": {
+        "model": "BiometricData",
+        "time_field": "timestamp",
+        # Unique per profile when set (bio_profile_sample_uniq)
+        "sample_field": "sample_id",
+        "columns": [
+            ("id", "int64"),
+            ("user_profile_id", "int64"),
+            ("timestamp", "timestamp"),
+            ("sample_id", "string"),
+            ("heart_rate", "int32"),
+            ("hrv_score", "float64"),
+            ("sleep_hours", "float64"),
+            ("sleep_duration", "float64"),
+            ("activity_level", "int32"),
+            ("stress_level", "int32"),
+            ("sleep_quality", "string"),
+        ],
+    },
+    "predictions": {
+        "model": "AIPrediction",
+        "time_field": "prediction_date",
+        "columns": [
+            ("id", "int64"),
+            ("user_profile_id", "int64"),
+            ("prediction_date", "date32"),
+            ("timestamp", "timestamp"),
+            ("prediction_burnout_risk", "float64"),
+            ("predicted_burnout_level", "string"),
+            ("contributing_factors", "string"),
+            ("recommendations", "string"),
+            ("meditation_link", "string"),
+        ],
+    },
+}
+
+
+class ImportConflict(ValueError):
+    """An import would duplicate rows that have no key to deduplicate on."""
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Columnar export/import needs pyarrow (pip install pyarrow)."
+        ) from e
+    return pyarrow
+
+
+def arrow_schema(pa, table):
+    types = {
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "date32": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in TABLES[table]["columns"]])
+
+
+def get_model(table):
+    from django.apps import apps
+    return apps.get_model("core", TABLES[table]["model"])
+
+
+def partition_path(out_dir, table, profile_id, month):
+    return os.path.join(out_dir, table, f"user_profile_id={profile_id}", f"month={month}", "part-0.parquet")
+
+
+class PartitionWriter:
+    """
+    Writes record batches to one Parquet file per (profile, month).
+    Rows arrive sorted by (profile, time), so only one file is open at once.
+    """
+
+    def __init__(self, pa, out_dir, table, schema):
+        self.pa = pa
+        self.out_dir = out_dir
+        self.table = table
+        self.schema = schema
+        self.key = None
+        self.writer = None
+        self.files = 0
+
+    def write(self, key, columns):
+        import pyarrow.parquet as pq
+
+        if key != self.key:
+            self.close()
+            path = partition_path(self.out_dir, self.table, *key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self.key = key
+            self.files += 1
+        self.writer.write_batch(self.pa.RecordBatch.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def month_of(value):
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def export_table(out_dir, table, profile_ids=None, chunk_size=50000):
+    """
+    Streams one table out of the database into Parquet files partitioned
+    by user_profile_id and month. Memory stays bounded by chunk_size: rows
+    come from a server-side cursor and are never built into model instances.
+    Returns (rows, files).
+    """
+    pa = require_pyarrow()
+    spec = TABLES[table]
+    schema = arrow_schema(pa, table)
+    names = [name for name, _ in spec["columns"]]
+    time_index = names.index(spec["time_field"])
+
+    qs = get_model(table).objects.all()
+    if profile_ids:
+        qs = qs.filter(user_profile_id__in=profile_ids)
+    rows = (
+        qs.order_by("user_profile_id", spec["time_field"], "id")
+        .values_list(*names)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    writer = PartitionWriter(pa, out_dir, table, schema)
+    buffer = {name: [] for name in names}
+    buffered = 0
+    key = None
+    total = 0
+
+    def flush():
+        nonlocal buffer, buffered
+        if buffered:
+            writer.write(key, buffer)
+            buffer = {name: [] for name in names}
+            buffered = 0
+
+    try:
+        for row in rows:
+            row_key = (row[1], month_of(row[time_index]))
+            if row_key != key or buffered >= chunk_size:
+                flush()
+                key = row_key
+            for name, value in zip(names, row):
+                buffer[name].append(value)
+            buffered += 1
+            total += 1
+        flush()
+    finally:
+        writer.close()
+
+    return total, writer.files
+
+
+def existing_samples(model, field, keys):
+    """The (user_profile_id, sample) pairs among `keys` already stored."""
+    by_profile = {}
+    for profile_id, sample in keys:
+        by_profile.setdefault(profile_id, set()).add(sample)
+    existing = set()
+    for profile_id, samples in by_profile.items():
+        existing.update(
+            (profile_id, sample)
+            for sample in model.objects.filter(user_profile_id=profile_id, **{f"{field}__in": samples})
+            .values_list(field, flat=True)
+        )
+    return existing
+
+
+def import_table(in_dir, table, batch_size=5000, keep_ids=False):
+    """
+    Bulk-loads a partitioned Parquet export back into the database, one
+    record batch at a time. Rows whose sample id is already stored for
+    the profile are skipped, like ingest does, so an export can be
+    imported again; with keep_ids, so are rows whose id exists. Tables
+    without a sample id (predictions) can only be imported again with
+    keep_ids: ImportConflict is raised for a profile that already has
+    rows. Returns (rows inserted, profile_ids touched).
+    """
+    require_pyarrow()
+    import pyarrow.dataset as ds
+
+    spec = TABLES[table]
+    model = get_model(table)
+    sample_field = spec.get("sample_field")
+    names = [name for name, _ in spec["columns"]]
+    if not keep_ids:
+        names.remove("id")
+
+    # Partition keys are also stored as columns, so directory names are not parsed
+    dataset = ds.dataset(os.path.join(in_dir, table), format="parquet")
+    total = 0
+    profiles = set()
+    # Profiles known to have no rows before this import started
+    fresh = set()
+
+    for batch in dataset.to_batches(columns=names, batch_size=batch_size):
+        columns = batch.to_pydict()
+        if not sample_field and not keep_ids:
+            unchecked = set(columns["user_profile_id"]) - fresh
+            stored = set(
+                model.objects.filter(user_profile_id__in=unchecked)
+                .values_list("user_profile_id", flat=True).distinct()
+            )
+            if stored:
+                raise ImportConflict(
+                    f"{table}: profiles {sorted(stored)} already have rows and {table} have no "
+                    "key to skip duplicates on; import with --keep-ids."
+                )
+            fresh |= unchecked
+
+        stored_ids = set()
+        if keep_ids:
+            stored_ids = set(model.objects.filter(id__in=columns["id"]).values_list("id", flat=True))
+
+        seen = set()
+        if sample_field:
+            keys = {
+                (profile_id, sample)
+                for profile_id, sample in zip(columns["user_profile_id"], columns[sample_field]) if sample
+            }
+            seen = existing_samples(model, sample_field, keys)
+
+        objects = []
+        for i in range(batch.num_rows):
+            values = {name: columns[name][i] for name in names}
+            if keep_ids and values["id"] in stored_ids:
+                continue
+            if sample_field and values[sample_field]:
+                key = (values["user_profile_id"], values[sample_field])
+                if key in seen:
+                    continue
+                seen.add(key)
+            ts = values.get("timestamp")
+            if isinstance(ts, datetime) and ts.tzinfo is None:
+                values["timestamp"] = ts.replace(tzinfo=dt_timezone.utc)
+            objects.append(model(**values))
+            profiles.add(values["user_profile_id"])
+
+        with transaction.atomic():
+            # bulk_create sends no signals; derived tables are rebuilt by the caller
+            model.objects.bulk_create(objects, batch_size=batch_size, ignore_conflicts=keep_ids)
+        if keep_ids:
+            # Conflicts are skipped silently; count what actually landed
+            total += model.objects.filter(id__in=[o.id for o in objects]).count()
+        else:
+            total += len(objects)
+
+    return total, profiles
@@ -0,0 +1,391 @@
+"""
+Offline ephemeris: natal charts and transits computed locally with NumPy.
+
+    natal_chart(payload)           # same shape as AstrologyAPI natal_chart_interpretation
+    transits(payload, day)         # same shape as AstrologyAPI transits_natal
+    transit_calendar(payload, start, days)  # per-day transits over a date range
+    planet_longitudes(jd)          # (n, len(PLANETS)) tropical longitudes in degrees
+
+Payloads are the AstrologyAPI request bodies built in core/api
+(day, month, year, hour, min, lat, lon, tzone). Every function works on
+arrays of Julian days, so many dates or profiles cost one vectorized pass.
+
+Accuracy: planets use the JPL Keplerian elements with linear rates
+(Standish, valid 1800-2050, typically well under 0.1 degree for the
+inner planets and a few hundredths for the outer ones, Pluto excepted);
+the Moon uses the main terms of Meeus' lunar theory (about 0.05 degree).
+That is far finer than sign, house and aspect boundaries need. Houses are
+equal houses from the Ascendant.
+"""
+import numpy as np
+
+ENGINE_VERSION = "local-1"
+
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+PLANETS = [
+    "Sun", "Moon", "Mercury", "Venus", "Mars",
+    "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto",
+]
+
+J2000 = 2451545.0
+DEG = np.pi / 180
+
+# a, e, I, L, long. perihelion, long. ascending node (J2000 ecliptic), and
+# their rates per Julian century
+ELEMENTS = {
+    "Mercury": ([0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+                [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081]),
+    "Venus": ([0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+              [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418]),
+    "Earth": ([1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+              [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0]),
+    "Mars": ([1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+             [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343]),
+    "Jupiter": ([5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+                [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106]),
+    "Saturn": ([9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+               [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794]),
+    "Uranus": ([19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+               [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589]),
+    "Neptune": ([30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+                [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664]),
+    "Pluto": ([39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684],
+              [-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482]),
+}
+HELIO = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+_BASE = np.array([ELEMENTS[name][0] for name in HELIO])
+_RATE = np.array([ELEMENTS[name][1] for name in HELIO])
+
+# General precession in longitude, degrees per century (J2000 -> equinox of date)
+PRECESSION = 1.396971
+
+# Main periodic terms of the Moon's longitude (Meeus, Astronomical
+# Algorithms ch. 47): multiples of D, M, M', F and the coefficient in 1e-6 deg
+MOON_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314),
+    (0, 0, 2, 0, 213618), (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332),
+    (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066), (2, 0, 1, 0, 53322),
+    (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528),
+    (0, 0, 1, -2, 10980), (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034),
+    (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888), (2, 1, 0, 0, -6766),
+    (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665),
+    (0, 1, -2, 0, -2689), (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390),
+    (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236), (0, 1, 2, 0, -2120),
+    (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048),
+], dtype=float)
+
+ASPECTS = [("Conjunction", 0), ("Sextile", 60), ("Square", 90), ("Trine", 120), ("Opposition", 180)]
+NATAL_ORB = 8.0
+TRANSIT_ORB = 2.0
+# The Moon moves too fast for day-level transit alerts
+TRANSIT_PLANETS = [p for p in PLANETS if p != "Moon"]
+TRANSIT_WINDOW_DAYS = 365
+HARD_PLANETS = {"Mars", "Saturn", "Uranus", "Neptune", "Pluto"}
+
+MOON_PHASES = [
+    ("New Moon", "Set intentions and start small."),
+    ("Waxing Crescent", "Build momentum on what you started."),
+    ("First Quarter", "Push through obstacles and decide."),
+    ("Waxing Gibbous", "Refine and adjust."),
+    ("Full Moon", "Notice what has come to light; release tension."),
+    ("Waning Gibbous", "Share what you learned and slow down."),
+    ("Last Quarter", "Let go of what is not working."),
+    ("Waning Crescent", "Rest and recover before the next cycle."),
+]
+
+
+# ---------------------------------------------------
+# TIME
+# ---------------------------------------------------
+def julian_day(year, month, day, hour=0, minute=0, tzone=0):
+    """Julian day (UT) of local civil time(s); arguments broadcast as arrays."""
+    year, month = np.asarray(year, dtype=float), np.asarray(month, dtype=float)
+    early = month <= 2
+    y = np.where(early, year - 1, year)
+    m = np.where(early, month + 12, month)
+    a = np.floor(y / 100)
+    b = 2 - a + np.floor(a / 4)
+    ut_hours = np.asarray(hour, dtype=float) + np.asarray(minute, dtype=float) / 60 - np.asarray(tzone, dtype=float)
+    return np.floor(365.25 * (y + 4716)) + np.floor(30.6001 * (m + 1)) + day + b - 1524.5 + ut_hours / 24
+
+
+def payload_julian_day(payload):
+    return julian_day(
+        payload["year"], payload["month"], payload["day"],
+        payload.get("hour", 12), payload.get("min", 0), payload.get("tzone") or 0,
+    )
+
+
+# ---------------------------------------------------
+# POSITIONS
+# ---------------------------------------------------
+def heliocentric(jd):
+    """(n, len(HELIO), 3) ecliptic J2000 positions in au."""
+    t = ((np.atleast_1d(jd) - J2000) / 36525)[:, None, None]
+    a, e, inc, mean_long, peri, node = np.moveaxis(_BASE + _RATE * t, -1, 0)
+    inc, peri, node = inc * DEG, peri * DEG, node * DEG
+    mean_anomaly = np.mod(mean_long * DEG - peri + np.pi, 2 * np.pi) - np.pi
+    omega = peri - node
+
+    ecc = mean_anomaly + e * np.sin(mean_anomaly)
+    for _ in range(6):
+        ecc -= (ecc - e * np.sin(ecc) - mean_anomaly) / (1 - e * np.cos(ecc))
+
+    xp = a * (np.cos(ecc) - e)
+    yp = a * np.sqrt(1 - e * e) * np.sin(ecc)
+    cw, sw, cn, sn, ci, si = np.cos(omega), np.sin(omega), np.cos(node), np.sin(node), np.cos(inc), np.sin(inc)
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    z = (sw * si) * xp + (cw * si) * yp
+    return np.stack([x, y, z], axis=-1)
+
+
+def moon_longitude(jd):
+    """Geocentric longitude of the Moon, mean equinox of date, degrees."""
+    t = (np.atleast_1d(jd) - J2000) / 36525
+    mean_long = 218.3164477 + 481267.88123421 * t
+    args = np.stack([
+        297.8501921 + 445267.1114034 * t,   # D
+        357.5291092 + 35999.0502909 * t,    # M
+        134.9633964 + 477198.8675055 * t,   # M'
+        93.2720950 + 483202.0175233 * t,    # F
+    ], axis=-1) * DEG
+    # Terms involving the Sun's anomaly shrink with Earth's eccentricity
+    ecc = 1 - 0.002516 * t - 0.0000074 * t * t
+    multiples, coeffs = MOON_TERMS[:, :4], MOON_TERMS[:, 4]
+    scale = ecc[:, None] ** np.abs(multiples[:, 1])
+    total = (coeffs * scale * np.sin(args @ multiples.T)).sum(axis=1)
+    return np.mod(mean_long + total / 1e6, 360)
+
+
+def planet_longitudes(jd):
+    """(n, len(PLANETS)) geocentric tropical longitudes in degrees."""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    helio = heliocentric(jd)
+    earth = helio[:, HELIO.index("Earth")]
+    geo = helio - earth[:, None, :]
+
+    longitudes = np.degrees(np.arctan2(geo[..., 1], geo[..., 0]))
+    sun = np.degrees(np.arctan2(-earth[:, 1], -earth[:, 0]))
+
+    out = np.empty((len(jd), len(PLANETS)))
+    out[:, 0] = sun
+    for i, name in enumerate(PLANETS[2:], start=2):
+        out[:, i] = longitudes[:, HELIO.index(name)]
+    out += PRECESSION * ((jd - J2000) / 36525)[:, None]
+    out[:, 1] = moon_longitude(jd)
+    return np.mod(out, 360)
+
+
+def angles(jd, lat, lon):
+    """Ascendant and Midheaven longitudes (degrees) for places and times."""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    t = (jd - J2000) / 36525
+    gmst = 280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * t * t - t ** 3 / 38710000
+    ramc = np.mod(gmst + np.asarray(lon, dtype=float), 360) * DEG
+    eps = (23.439291 - 0.0130042 * t) * DEG
+    phi = np.asarray(lat, dtype=float) * DEG
+
+    asc = np.degrees(np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps))))
+    mc = np.degrees(np.arctan2(np.sin(ramc), np.cos(ramc) * np.cos(eps)))
+    return np.mod(asc, 360), np.mod(mc, 360)
+
+
+def sign_of(longitude):
+    return SIGNS[int(longitude // 30) % 12]
+
+
+def house_of(longitude, ascendant):
+    """Equal-house number (1-12) of longitudes given an Ascendant."""
+    return (np.mod(np.asarray(longitude) - np.asarray(ascendant)[..., None], 360) // 30).astype(int) + 1
+
+
+def separation(a, b):
+    """Smallest angle between longitudes, 0-180 degrees."""
+    return np.abs(np.mod(a - b + 180, 360) - 180)
+
+
+# ---------------------------------------------------
+# CHARTS
+# ---------------------------------------------------
+def moon_phase(sun, moon):
+    index = int(np.mod(moon - sun + 22.5, 360) // 45)
+    phase, meaning = MOON_PHASES[index]
+    return {"phase": phase, "meaning": meaning}
+
+
+_ASPECT_ANGLES = np.array([angle for _, angle in ASPECTS], dtype=float)
+_PAIRS = np.triu_indices(len(PLANETS), k=1)
+
+
+def chart_aspects(longitudes, orb=NATAL_ORB):
+    sep = separation(longitudes[_PAIRS[0]], longitudes[_PAIRS[1]])
+    off = np.abs(sep[:, None] - _ASPECT_ANGLES)
+    # Orbs are narrower than the gaps between aspects, so at most one matches
+    pair_index, aspect_index = np.nonzero(off <= orb)
+    return [
+        {
+            "planet_1": PLANETS[_PAIRS[0][k]], "planet_2": PLANETS[_PAIRS[1][k]],
+            "aspect": ASPECTS[a][0], "orb": round(float(off[k, a]), 2),
+        }
+        for k, a in zip(pair_index.tolist(), aspect_index.tolist())
+    ]
+
+
+def natal_charts(payloads):
+    """One chart per payload, computed in a single vectorized pass."""
+    jd = np.array([float(payload_julian_day(p)) for p in payloads])
+    lat = np.array([p.get("lat") or 0.0 for p in payloads])
+    lon = np.array([p.get("lon") or 0.0 for p in payloads])
+
+    # Positions half a day either side give the daily motion (negative: retrograde)
+    around = planet_longitudes(np.concatenate([jd, jd - 0.5, jd + 0.5])).reshape(3, len(jd), len(PLANETS))
+    longitudes = around[0]
+    speeds = (around[2] - around[1] + 180) % 360 - 180
+    asc, mc = angles(jd, lat, lon)
+    houses = house_of(longitudes, asc)
+
+    charts = []
+    for k in range(len(payloads)):
+        planets = []
+        for i, name in enumerate(PLANETS):
+            full = float(longitudes[k, i])
+            planets.append({
+                "name": name,
+                "full_degree": round(full, 4),
+                "degree": round(full % 30, 2),
+                "sign": sign_of(full),
+                "house": int(houses[k, i]),
+                "speed": round(float(speeds[k, i]), 4),
+                "is_retro": bool(speeds[k, i] < 0),
+            })
+        cusps = np.mod(asc[k] + 30 * np.arange(12), 360)
+        charts.append({
+            "planets": planets,
+            "houses": [
+                {"house": i + 1, "sign": sign_of(c), "degree": round(float(c), 4)}
+                for i, c in enumerate(cusps)
+            ],
+            "ascendant": round(float(asc[k]), 4),
+            "midheaven": round(float(mc[k]), 4),
+            "aspects": chart_aspects(longitudes[k]),
+            "moon_phase": moon_phase(longitudes[k, 0], longitudes[k, 1]),
+            "engine": ENGINE_VERSION,
+        })
+    return charts
+
+
+def natal_chart(payload):
+    return natal_charts([payload])[0]
+
+
+# ---------------------------------------------------
+# TRANSITS
+# ---------------------------------------------------
+def transit_nature(transit_planet, aspect):
+    if aspect == "Square":
+        return "Stressful"
+    if aspect == "Opposition":
+        return "Challenging"
+    if aspect == "Conjunction":
+        return "Challenging" if transit_planet in HARD_PLANETS else "Mixed growth"
+    return "Harmonious"
+
+
+def active_span(in_orb, center, start_day):
+    """First and last day of the run of True around index `center`."""
+    before = np.flatnonzero(~in_orb[:center])
+    after = np.flatnonzero(~in_orb[center:])
+    first = before[-1] + 1 if len(before) else 0
+    last = center + after[0] - 1 if len(after) else len(in_orb) - 1
+    return start_day + np.timedelta64(int(first), "D"), start_day + np.timedelta64(int(last), "D")
+
+
+def transits_for(payloads, day, orb=TRANSIT_ORB, window_days=TRANSIT_WINDOW_DAYS):
+    """
+    Aspects from the day's planets to each natal chart, with the dates each
+    stays within orb (searched up to window_days either side). The moving
+    planets are computed once for all payloads.
+    """
+    natal_jd = np.array([float(payload_julian_day(p)) for p in payloads])
+    natal = planet_longitudes(natal_jd)
+    asc, _ = angles(
+        natal_jd,
+        np.array([p.get("lat") or 0.0 for p in payloads]),
+        np.array([p.get("lon") or 0.0 for p in payloads]),
+    )
+
+    start_day = np.datetime64(day) - np.timedelta64(window_days, "D")
+    offsets = np.arange(-window_days, window_days + 1)
+    noon = julian_day(day.year, day.month, day.day, 12) + offsets
+    moving = planet_longitudes(noon)[:, [PLANETS.index(p) for p in TRANSIT_PLANETS]]
+    # (payloads, transit planets)
+    houses = house_of(moving[window_days], asc)
+
+    results = []
+    for k in range(len(payloads)):
+        # (days, transit planets, natal planets)
+        sep = separation(moving[:, :, None], natal[k][None, None, :])
+        found = []
+        for name, angle in ASPECTS:
+            in_orb = np.abs(sep - angle) <= orb
+            for ti, ni in zip(*np.nonzero(in_orb[window_days])):
+                transit_planet, natal_planet = TRANSIT_PLANETS[ti], PLANETS[ni]
+                first, last = active_span(in_orb[:, ti, ni], window_days, start_day)
+                nature = transit_nature(transit_planet, name)
+                found.append({
+                    "transit_planet": transit_planet,
+                    "natal_planet": natal_planet,
+                    "aspect_type": name,
+                    "natal_house": int(houses[k, ti]),
+                    "nature": nature,
+                    "orb": round(float(abs(sep[window_days, ti, ni] - angle)), 2),
+                    "description": f"Transiting {transit_planet} {name.lower()} natal {natal_planet} ({nature.lower()}).",
+                    "start_date": str(first),
+                    "end_date": str(last),
+                })
+        found.sort(key=lambda t: t["orb"])
+        results.append({"transits": found})
+    return results
+
+
+def transits(payload, day, **kwargs):
+    return transits_for([payload], day, **kwargs)[0]
+
+
+def transit_calendar(payload, start, days, planets=PLANETS, orb=TRANSIT_ORB):
+    """
+    Day-by-day transits to one natal chart for `days` days from `start`,
+    computed in one pass over every day. Each day lists its aspects
+    within orb, tightest first. The Moon is included by default: at
+    daily resolution it is what changes most from one day to the next.
+    """
+    natal_jd = payload_julian_day(payload)
+    natal = planet_longitudes(natal_jd)[0]
+    asc, _ = angles(natal_jd, payload.get("lat") or 0.0, payload.get("lon") or 0.0)
+
+    noon = julian_day(start.year, start.month, start.day, 12) + np.arange(days)
+    moving = planet_longitudes(noon)[:, [PLANETS.index(p) for p in planets]]
+    houses = house_of(moving, asc[0])
+    # (aspects, days, transit planets, natal planets)
+    off = np.abs(separation(moving[:, :, None], natal[None, None, :])[None] - _ASPECT_ANGLES[:, None, None, None])
+
+    calendar = [{"date": str(np.datetime64(start) + np.timedelta64(d, "D")), "transits": []} for d in range(days)]
+    for a, d, ti, ni in zip(*(axis.tolist() for axis in np.nonzero(off <= orb))):
+        transit_planet, aspect = planets[ti], ASPECTS[a][0]
+        calendar[d]["transits"].append({
+            "transit_planet": transit_planet,
+            "natal_planet": PLANETS[ni],
+            "aspect_type": aspect,
+            "natal_house": int(houses[d, ti]),
+            "nature": transit_nature(transit_planet, aspect),
+            "orb": round(float(off[a, d, ti, ni]), 2),
+        })
+    for day in calendar:
+        day["transits"].sort(key=lambda t: t["orb"])
+    return calendar
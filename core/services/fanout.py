@@ -0,0 +1,70 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool for outbound calls; rebuilt after fork."""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "FANOUT_MAX_WORKERS", 8),
+                thread_name_prefix="fanout",
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run_and_close(fn, args, kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        # Pool threads outlive the request, so close any DB connection
+        # the call opened rather than leaking one per thread
+        connections.close_all()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Runs fn in the shared pool and returns a Future. fn sees the caller's
+    context variables, so its timing spans land in the caller's request.
+    """
+    context = contextvars.copy_context()
+    return get_executor().submit(context.run, _run_and_close, fn, args, kwargs)
+
+
+def gather(futures: dict, timeout: float, defaults=None) -> dict:
+    """
+    Waits for named futures against one shared deadline.
+    Calls that fail or miss the deadline get their entry from `defaults`
+    (None if absent), so callers can render with partial data.
+    """
+    defaults = defaults or {}
+    deadline = time.monotonic() + timeout
+    results = {}
+
+    for name, future in futures.items():
+        remaining = max(deadline - time.monotonic(), 0)
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeout:
+            logger.warning("%s missed the %.1fs deadline", name, timeout)
+            results[name] = defaults.get(name)
+        except Exception:
+            logger.exception("%s failed", name)
+            results[name] = defaults.get(name)
+
+    return results
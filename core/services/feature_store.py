@@ -0,0 +1,276 @@
+"""
+Per-profile rolling biometric features, updated as readings arrive.
+
+    features = feature_vector(profile)      # {name: value} in FEATURE_NAMES order
+    matrix = feature_matrix(profiles)       # (n, len(FEATURE_NAMES)), NaN for gaps
+
+Each profile has one BiometricFeatureState row holding a fixed-size
+float64 blob (about 3 KB): a 30-slot ring of per-day count / sum / sum of
+squares for every metric, the time-decayed stress EWMA and the latest
+value of each metric. A new reading touches one ring slot and a few
+scalars, so updates cost the same however long the history is, and
+reading features never scans BiometricData.
+
+From that state come 7- and 30-day means, the latest HRV as a z-score
+against its 30-day baseline, 7-day sleep debt (hours short of
+FEATURE_SLEEP_TARGET_HOURS, summed per night) and the stress EWMA
+(half-life FEATURE_STRESS_HALFLIFE_HOURS).
+
+Readings older than the ring (device backfills) do not change the
+windows, and readings older than the newest one do not move the EWMA or
+the latest values; rebuild_features() recomputes a profile from its raw
+rows when that matters.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.services.rollups import METRICS
+
+WINDOW_DAYS = 30
+WINDOWS = (7, 30)
+
+# Bump when the blob layout changes; old blobs are then rebuilt from rows
+LAYOUT_VERSION = 1
+
+FEATURE_NAMES = (
+    *(f"{metric}_{window}d" for metric in METRICS for window in WINDOWS),
+    "hrv_zscore",
+    "sleep_debt_7d",
+    "stress_ewma",
+)
+
+_HRV = METRICS.index("hrv_score")
+_SLEEP = METRICS.index("sleep_hours")
+_STRESS = METRICS.index("stress_level")
+
+
+def sleep_target():
+    return getattr(settings, "FEATURE_SLEEP_TARGET_HOURS", 8.0)
+
+
+def stress_halflife():
+    return getattr(settings, "FEATURE_STRESS_HALFLIFE_HOURS", 24.0)
+
+
+class FeatureState:
+    """The decoded state blob of one profile."""
+
+    # ring days, ring stats (day, metric, count/sum/sumsq), 3 scalars, latest values
+    SIZE = 1 + WINDOW_DAYS + WINDOW_DAYS * len(METRICS) * 3 + 3 + len(METRICS)
+
+    def __init__(self):
+        self.days = np.zeros(WINDOW_DAYS)
+        self.stats = np.zeros((WINDOW_DAYS, len(METRICS), 3))
+        self.stress_ewma = math.nan
+        self.stress_ewma_at = 0.0
+        self.last_at = 0.0
+        self.last = np.full(len(METRICS), np.nan)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """None for an empty blob or one from another layout version."""
+        data = np.frombuffer(bytes(blob), dtype="<f8") if blob else None
+        if data is None or len(data) != cls.SIZE or data[0] != LAYOUT_VERSION:
+            return None
+        state = cls()
+        offset = 1
+        state.days = data[offset:offset + WINDOW_DAYS].copy()
+        offset += WINDOW_DAYS
+        state.stats = data[offset:offset + state.stats.size].reshape(state.stats.shape).copy()
+        offset += state.stats.size
+        state.stress_ewma, state.stress_ewma_at, state.last_at = data[offset:offset + 3]
+        state.last = data[offset + 3:].copy()
+        return state
+
+    def to_bytes(self):
+        return np.concatenate([
+            [LAYOUT_VERSION], self.days, self.stats.ravel(),
+            [self.stress_ewma, self.stress_ewma_at, self.last_at], self.last,
+        ]).astype("<f8").tobytes()
+
+    def add(self, timestamps, values):
+        """
+        Folds readings into the state. timestamps are aware datetimes;
+        values is an (n, len(METRICS)) array with NaN for missing metrics.
+        """
+        if not len(timestamps):
+            return
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        days = np.array([timezone.localdate(ts).toordinal() for ts in timestamps], dtype=float)
+        slots = days.astype(int) % WINDOW_DAYS
+
+        # Claim slots for newer days; rows for days the ring has moved past are dropped
+        for day in np.unique(days):
+            slot = int(day) % WINDOW_DAYS
+            if day > self.days[slot]:
+                self.days[slot] = day
+                self.stats[slot] = 0
+        keep = self.days[slots] == days
+
+        present = ~np.isnan(values[keep])
+        filled = np.where(present, values[keep], 0.0)
+        np.add.at(self.stats[:, :, 0], slots[keep], present)
+        np.add.at(self.stats[:, :, 1], slots[keep], filled)
+        np.add.at(self.stats[:, :, 2], slots[keep], filled * filled)
+
+        halflife = stress_halflife() * 3600
+        for ts, row in sorted(zip((t.timestamp() for t in timestamps), values), key=lambda pair: pair[0]):
+            stress = row[_STRESS]
+            if not np.isnan(stress) and ts >= self.stress_ewma_at:
+                if np.isnan(self.stress_ewma):
+                    self.stress_ewma = stress
+                else:
+                    alpha = 1 - 0.5 ** ((ts - self.stress_ewma_at) / halflife)
+                    self.stress_ewma += alpha * (stress - self.stress_ewma)
+                self.stress_ewma_at = ts
+            if ts >= self.last_at:
+                self.last = np.where(np.isnan(row), self.last, row)
+                self.last_at = ts
+
+    def window(self, today, days):
+        """(count, sum, sumsq) per metric over the `days` days ending today."""
+        age = today - self.days
+        return self.stats[(self.days > 0) & (age >= 0) & (age < days)].sum(axis=0)
+
+    def features(self, today=None):
+        today = (today or timezone.localdate()).toordinal()
+        out = {}
+        for window in WINDOWS:
+            count, total, _ = self.window(today, window).T
+            means = np.divide(total, count, out=np.full(len(METRICS), np.nan), where=count > 0)
+            for metric, mean in zip(METRICS, means):
+                out[f"{metric}_{window}d"] = mean
+
+        count, total, squares = self.window(today, 30)[_HRV]
+        zscore = math.nan
+        if count >= 2 and not np.isnan(self.last[_HRV]):
+            mean = total / count
+            std = math.sqrt(max(squares / count - mean * mean, 0.0))
+            if std > 0:
+                zscore = (self.last[_HRV] - mean) / std
+        out["hrv_zscore"] = zscore
+
+        age = today - self.days
+        nights = self.stats[(self.days > 0) & (age >= 0) & (age < 7), _SLEEP]
+        nights = nights[nights[:, 0] > 0]
+        out["sleep_debt_7d"] = float(np.maximum(sleep_target() - nights[:, 1] / nights[:, 0], 0).sum())
+
+        out["stress_ewma"] = self.stress_ewma
+        return out
+
+
+def reading_values(biometrics):
+    return np.array([
+        [math.nan if getattr(b, metric) is None else getattr(b, metric) for metric in METRICS]
+        for b in biometrics
+    ], dtype=float)
+
+
+def update_features(profile, biometrics):
+    """Folds newly written BiometricData rows into the profile's state."""
+    from core.models import BiometricFeatureState
+
+    if not biometrics:
+        return
+    with transaction.atomic():
+        BiometricFeatureState.objects.get_or_create(user_profile=profile)
+        row = BiometricFeatureState.objects.select_for_update().get(user_profile=profile)
+        state = FeatureState.from_bytes(row.state)
+        if state is None:
+            # New or old-layout state: start from history, which includes these rows
+            state = load_state(profile)
+        else:
+            state.add([b.timestamp for b in biometrics], reading_values(biometrics))
+        save_state(row, state)
+
+
+def load_state(profile, chunk_size=5000):
+    """State computed from the raw rows inside the window."""
+    from core.models import BiometricData
+
+    state = FeatureState()
+    since = timezone.now() - timedelta(days=WINDOW_DAYS + 1)
+    rows = (
+        BiometricData.objects.filter(user_profile=profile, timestamp__gte=since)
+        .order_by("timestamp")
+        .values_list("timestamp", *METRICS)
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            add_rows(state, chunk)
+            chunk = []
+    if chunk:
+        add_rows(state, chunk)
+    return state
+
+
+def add_rows(state, rows):
+    state.add(
+        [r[0] for r in rows],
+        np.array([[math.nan if v is None else v for v in r[1:]] for r in rows], dtype=float),
+    )
+
+
+def save_state(row, state):
+    row.state = state.to_bytes()
+    row.last_timestamp = datetime.fromtimestamp(state.last_at, dt_timezone.utc) if state.last_at else None
+    row.save()
+
+
+def rebuild_features(profile):
+    """Recomputes a profile's state from its raw rows (backfill or repair)."""
+    from core.models import BiometricFeatureState
+
+    state = load_state(profile)
+    with transaction.atomic():
+        row, _ = BiometricFeatureState.objects.select_for_update().get_or_create(user_profile=profile)
+        save_state(row, state)
+    return state
+
+
+# ---------------------------------------------------
+# READING
+# ---------------------------------------------------
+def _clean(value):
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+def stored_features(blob, today=None):
+    state = FeatureState.from_bytes(blob) or FeatureState()
+    return state.features(today)
+
+
+def feature_vector(profile, today=None):
+    """{name: value or None} in FEATURE_NAMES order; one indexed row read."""
+    from core.models import BiometricFeatureState
+
+    blob = (
+        BiometricFeatureState.objects.filter(user_profile=profile)
+        .values_list("state", flat=True).first()
+    )
+    features = stored_features(blob, today)
+    return {name: _clean(features[name]) for name in FEATURE_NAMES}
+
+
+def feature_matrix(profiles, today=None):
+    """(len(profiles), len(FEATURE_NAMES)) float array, NaN where a feature is undefined."""
+    from core.models import BiometricFeatureState
+
+    ids = [getattr(p, "id", p) for p in profiles]
+    blobs = dict(
+        BiometricFeatureState.objects.filter(user_profile_id__in=ids)
+        .values_list("user_profile_id", "state")
+    )
+    matrix = np.full((len(ids), len(FEATURE_NAMES)), np.nan)
+    for i, profile_id in enumerate(ids):
+        features = stored_features(blobs.get(profile_id), today)
+        matrix[i] = [features[name] for name in FEATURE_NAMES]
+    return matrix
@@ -0,0 +1,122 @@
+"""
+Multi-day burnout forecast from a transit calendar.
+
+    forecast = burnout_forecast(profile, start, days=90)
+
+Every day is scored with the profile's latest biometrics held constant
+and that day's dominant transit (planet and natal house) swapped in. The
+calendar comes from the local ephemeris in one vectorized pass and all
+days go through the burnout model as one batch, so a 90-day forecast is
+one ephemeris call and one forward pass. The calendar is always computed
+locally, whatever ASTROLOGY_BACKEND says: AstrologyAPI only answers for
+one day per request.
+"""
+from datetime import timedelta
+
+from core.ai_training.train_burnout_model import sleep_quality_from_hours
+from core.api.transits import build_transit_payload
+from core.burnout_model import get_engine, predict_burnout_batch_versioned
+from core.services import ephemeris
+from core.services.instrumentation import timed
+
+# The middle of the training ranges; the training pipeline fills missing
+# measurements with the same values
+BASELINE_DEFAULTS = {
+    "heart_rate": 80,
+    "hrv_score": 45.0,
+    "sleep_hours": 7.0,
+    "activity_level": 5,
+    "stress_level": 5,
+}
+
+# What the training pipeline uses for days without a stored transit
+NO_TRANSIT = ("Mars", "1st")
+
+
+def house_label(number):
+    """6 -> "6th", the natal_house spelling the model was trained on."""
+    suffix = "th" if 11 <= number % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def baseline_features(biometric, qualities):
+    """
+    Model features from the latest reading, with defaults for gaps. A
+    stored sleep_quality outside the model's vocabulary (`qualities`) is
+    derived from sleep hours instead, as in training.
+    """
+    features = {
+        name: default if biometric is None or getattr(biometric, name) is None else getattr(biometric, name)
+        for name, default in BASELINE_DEFAULTS.items()
+    }
+    quality = biometric.sleep_quality if biometric is not None else None
+    if quality not in qualities:
+        quality = str(sleep_quality_from_hours(features["sleep_hours"]))
+    features["sleep_quality"] = quality
+    return features
+
+
+def dominant_transit(day, planets, houses):
+    """
+    (transit, planet, house) for the tightest transit of a calendar day
+    whose planet the model knows. Houses outside the model's vocabulary
+    fall back like they do in training.
+    """
+    for transit in day["transits"]:
+        if transit["transit_planet"] in planets:
+            house = house_label(transit["natal_house"])
+            return transit, transit["transit_planet"], house if house in houses else NO_TRANSIT[1]
+    return None, *NO_TRANSIT
+
+
+def latest_biometric(profile):
+    from core.models import BiometricData
+    from core.services.risk_snapshots import latest_snapshot
+
+    snapshot = latest_snapshot(profile)
+    if snapshot is not None and snapshot.latest_biometric is not None:
+        return snapshot.latest_biometric
+    return BiometricData.objects.filter(user_profile=profile).order_by("-timestamp").first()
+
+
+@timed("forecast")
+def burnout_forecast(profile, start, days):
+    """Daily risk curve for `days` days from `start`."""
+    engine = get_engine()
+    planets = {str(c) for c in engine.planet_encoder.classes_}
+    houses = {str(c) for c in engine.house_encoder.classes_}
+    qualities = {str(c) for c in engine.sleep_encoder.classes_}
+
+    if profile.birth_date and profile.birth_time:
+        payload = build_transit_payload(
+            profile.birth_date, profile.birth_time,
+            profile.birth_latitude, profile.birth_longitude, profile.birth_timezone,
+        )
+        calendar = ephemeris.transit_calendar(payload, start, days)
+    else:
+        calendar = [{"date": (start + timedelta(days=d)).isoformat(), "transits": []} for d in range(days)]
+
+    baseline = baseline_features(latest_biometric(profile), qualities)
+    picks = [dominant_transit(day, planets, houses) for day in calendar]
+    rows = [{**baseline, "transit_planet": planet, "natal_house": house} for _, planet, house in picks]
+
+    # The whole horizon in one forward pass
+    results, model_version = predict_burnout_batch_versioned(rows)
+
+    points = []
+    for day, (transit, planet, house), (category, score) in zip(calendar, picks, results):
+        points.append({
+            "date": day["date"],
+            "transit_planet": planet,
+            "natal_house": house,
+            "transit": transit,
+            "burnout_category": category,
+            "burnout_score": round(score * 100, 2),
+        })
+    return {
+        "start": start.isoformat(),
+        "days": days,
+        "model_version": model_version,
+        "baseline": baseline,
+        "points": points,
+    }
@@ -0,0 +1,241 @@
+import json
+import math
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# field -> (dtype, min, max); values outside the range are rejected
+NUMERIC_FIELDS = {
+    "heart_rate": (int, 20, 250),
+    "hrv_score": (float, 0, 500),
+    "sleep_hours": (float, 0, 24),
+    "sleep_duration": (float, 0, 24),
+    "activity_level": (int, 0, 100),
+    "stress_level": (int, 0, 100),
+}
+TEXT_FIELDS = {"sleep_quality": 50, "sample_id": 100}
+
+
+def iter_rows(request):
+    """
+    Yields (row_number, parsed_row_or_exception) from a JSON or NDJSON body.
+    NDJSON is read line by line from the request stream, so large uploads
+    are never held in memory as one string.
+    """
+    content_type = request.content_type or ""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        number = 0
+        for line in request:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+            number += 1
+        return
+
+    body = json.loads(request.body or b"[]")
+    rows = body.get("rows", []) if isinstance(body, dict) else body
+    if not isinstance(rows, list):
+        raise ValueError("Expected a list of rows or {\"rows\": [...]}.")
+    yield from enumerate(rows)
+
+
+def coerce_column(values, kind, low, high):
+    """
+    Converts one column to floats in a single NumPy pass. Returns
+    (array, bad_mask); missing values become NaN and are allowed.
+    """
+    cleaned = [None if v in (None, "") else v for v in values]
+    try:
+        arr = np.array(cleaned, dtype=float)
+        bad = np.zeros(len(arr), dtype=bool)
+    except (TypeError, ValueError):
+        # Slow path only when some value is not numeric, to find which
+        arr = np.empty(len(cleaned))
+        bad = np.zeros(len(cleaned), dtype=bool)
+        for i, v in enumerate(cleaned):
+            try:
+                arr[i] = float("nan") if v is None else float(v)
+            except (TypeError, ValueError):
+                arr[i] = float("nan")
+                bad[i] = True
+
+    present = ~np.isnan(arr)
+    bad |= present & ((arr < low) | (arr > high))
+    if kind is int:
+        arr = np.where(present, np.round(arr), arr)
+    return arr, bad
+
+
+def validate_chunk(numbered_rows):
+    """
+    Validates and coerces a chunk. Returns (clean_rows, errors) where each
+    clean row is a dict of model field values plus its row number.
+    """
+    errors = []
+    candidates = []
+    for number, row in numbered_rows:
+        if isinstance(row, Exception):
+            errors.append({"row": number, "error": f"Invalid JSON: {row}"})
+        elif not isinstance(row, dict):
+            errors.append({"row": number, "error": "Row must be an object."})
+        else:
+            candidates.append((number, row))
+
+    if not candidates:
+        return [], errors
+
+    numbers = [n for n, _ in candidates]
+    bad = np.zeros(len(candidates), dtype=bool)
+    reasons = [[] for _ in candidates]
+
+    columns = {}
+    for field, (kind, low, high) in NUMERIC_FIELDS.items():
+        arr, field_bad = coerce_column([row.get(field) for _, row in candidates], kind, low, high)
+        columns[field] = arr
+        for i in np.flatnonzero(field_bad):
+            reasons[i].append(f"{field} must be a number in [{low}, {high}]")
+        bad |= field_bad
+
+    timestamps = []
+    now = timezone.now()
+    for i, (_, row) in enumerate(candidates):
+        raw = row.get("timestamp")
+        if raw in (None, ""):
+            timestamps.append(now)
+            continue
+        ts = parse_datetime(str(raw))
+        if ts is None:
+            reasons[i].append("timestamp must be ISO 8601")
+            bad[i] = True
+            timestamps.append(None)
+            continue
+        if timezone.is_naive(ts):
+            ts = timezone.make_aware(ts, timezone.get_default_timezone())
+        timestamps.append(ts)
+
+    clean = []
+    for i, (_, row) in enumerate(candidates):
+        for field, max_length in TEXT_FIELDS.items():
+            value = row.get(field)
+            if value is not None and len(str(value)) > max_length:
+                reasons[i].append(f"{field} longer than {max_length} characters")
+                bad[i] = True
+
+        if bad[i]:
+            errors.append({"row": numbers[i], "error": "; ".join(reasons[i])})
+            continue
+
+        values = {"timestamp": timestamps[i]}
+        for field, (kind, _, _) in NUMERIC_FIELDS.items():
+            v = columns[field][i]
+            values[field] = None if math.isnan(v) else kind(v)
+        for field in TEXT_FIELDS:
+            v = row.get(field)
+            values[field] = None if v in (None, "") else str(v)
+        clean.append((numbers[i], values))
+
+    return clean, errors
+
+
+def insert_chunk(profile, clean):
+    """
+    Inserts validated rows, skipping sample_ids already stored for the
+    profile. Returns (created_objects, duplicate_count).
+    """
+    from core.models import BiometricData
+
+    sample_ids = {v["sample_id"] for _, v in clean if v["sample_id"]}
+    existing = set()
+    if sample_ids:
+        existing = set(
+            BiometricData.objects
+            .filter(user_profile=profile, sample_id__in=sample_ids)
+            .values_list("sample_id", flat=True)
+        )
+
+    objects = []
+    seen = set()
+    duplicates = 0
+    for _, values in clean:
+        sample_id = values["sample_id"]
+        if sample_id and (sample_id in existing or sample_id in seen):
+            duplicates += 1
+            continue
+        if sample_id:
+            seen.add(sample_id)
+        objects.append(BiometricData(user_profile=profile, **values))
+
+    batch_size = getattr(settings, "BIOMETRIC_INGEST_BATCH_SIZE", 1000)
+    try:
+        with transaction.atomic():
+            created = BiometricData.objects.bulk_create(objects, batch_size=batch_size)
+    except IntegrityError:
+        # A concurrent replay stored some of the same sample_ids first.
+        # Fall back to row-by-row so only rows this call inserted are
+        # returned (and later folded into snapshots/rollups).
+        created = []
+        for obj in objects:
+            try:
+                with transaction.atomic():
+                    # bulk_create, not save(): no post_save, after_insert handles it
+                    BiometricData.objects.bulk_create([obj])
+                created.append(obj)
+            except IntegrityError:
+                obj.pk = None
+                duplicates += 1
+    return created, duplicates
+
+
+def after_insert(profile, created):
+    """Derived state that post_save signals would maintain for single rows."""
+    from core.services.alerts import evaluate_biometrics
+    from core.services.anomalies import detect_anomalies
+    from core.services.feature_store import update_features
+    from core.services.risk_snapshots import record_biometrics
+    from core.services.rollups import update_rollups
+
+    if created:
+        record_biometrics(profile, created)
+        update_rollups(profile, created)
+        update_features(profile, created)
+        evaluate_biometrics(profile, created)
+        detect_anomalies(profile, created)
+
+
+def ingest_biometrics(profile, numbered_rows, chunk_size=None, max_errors=1000):
+    """
+    Validates and stores an iterable of (row_number, row) in chunks.
+    Returns a summary with per-row errors.
+    """
+    chunk_size = chunk_size or getattr(settings, "BIOMETRIC_INGEST_CHUNK_SIZE", 5000)
+    summary = {"received": 0, "inserted": 0, "duplicates": 0, "rejected": 0, "errors": []}
+
+    def flush(chunk):
+        clean, errors = validate_chunk(chunk)
+        created, duplicates = insert_chunk(profile, clean) if clean else ([], 0)
+        after_insert(profile, created)
+
+        summary["inserted"] += len(created)
+        summary["duplicates"] += duplicates
+        summary["rejected"] += len(errors)
+        room = max_errors - len(summary["errors"])
+        summary["errors"].extend(errors[:room])
+
+    chunk = []
+    for item in numbered_rows:
+        summary["received"] += 1
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    return summary
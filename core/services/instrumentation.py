@@ -0,0 +1,180 @@
+"""
+Per-request timing spans and process-wide Prometheus-style metrics.
+
+    with span("astrology_api"):
+        ...
+
+    @timed("inference")
+    def predict(...): ...
+
+Spans are recorded into the trace of the request being served (a
+ContextVar, set by core.middleware.InstrumentationMiddleware); outside a
+request they cost one ContextVar lookup and record nothing. Work handed
+to core.services.fanout runs in a copy of the caller's context, so time
+spent in pool threads is attributed to the request that started it.
+
+Metrics are kept per process. Under gunicorn each worker exposes its own
+numbers on /metrics.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("request_trace", default=None)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestTrace:
+    """Summed duration and call count per span name for one request."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (total + seconds, count + 1)
+
+    def server_timing(self, total_seconds):
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+            for name, (seconds, count) in sorted(self.spans.items())
+        ]
+        parts.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self):
+        return {
+            name: {"ms": round(seconds * 1000, 2), "count": count}
+            for name, (seconds, count) in sorted(self.spans.items())
+        }
+
+
+def start_trace():
+    trace = RequestTrace()
+    return trace, _current.set(trace)
+
+
+def end_trace(token):
+    _current.reset(token)
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """Installed on every DB connection (see CoreConfig.ready)."""
+    with span("db"):
+        return execute(sql, params, many, context)
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+# ---------------------------------------------------
+# METRICS
+# ---------------------------------------------------
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: (list(c), s, n) for key, (c, s, n) in self._series.items()}
+
+        for key, (counts, total, count) in sorted(snapshot.items()):
+            labels = ",".join(f'{name}="{escape(value)}"' for name, value in zip(self.labelnames, key))
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return "\n".join(lines)
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "unruffled_request_duration_seconds",
+    "Wall time per request.",
+    ("view", "method", "status"),
+)
+SPAN_SECONDS = Histogram(
+    "unruffled_request_span_seconds",
+    "Time per request spent in each span (db, astrology_api, inference, template, ...).",
+    ("view", "span"),
+)
+REQUEST_QUERIES = Histogram(
+    "unruffled_request_db_queries",
+    "Database queries per request.",
+    ("view",),
+    buckets=QUERY_BUCKETS,
+)
+
+METRICS = [REQUEST_SECONDS, SPAN_SECONDS, REQUEST_QUERIES]
+
+
+def observe_request(view, method, status, total_seconds, trace):
+    REQUEST_SECONDS.observe(total_seconds, view=view, method=method, status=status)
+    for name, (seconds, _) in trace.spans.items():
+        SPAN_SECONDS.observe(seconds, view=view, span=name)
+    REQUEST_QUERIES.observe(trace.spans.get("db", (0.0, 0))[1], view=view)
+
+
+def render_metrics():
+    return "\n".join(metric.render() for metric in METRICS) + "\n"
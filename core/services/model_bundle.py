@@ -0,0 +1,141 @@
+"""
+Versioned model bundles.
+
+A bundle is one directory holding every artifact a model needs plus a
+manifest.json with per-file SHA-256 hashes, a content hash over all of
+them and the feature schema:
+
+    bundles/
+        CURRENT                     <- name of the live version
+        20261018T120000Z-1a2b3c4d/
+            manifest.json
+            burnout_model.keras
+            burnout_model.npz
+            burnout_*.pkl
+
+Bundles are written to a temporary directory and renamed into place, and
+CURRENT is replaced atomically, so a reader never sees a half-written
+version. Workers compare CURRENT to the version they hold and reload
+when it changes (ModelRegistry.reload_if_changed, polled by the
+registry's watcher thread).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+
+class BundleError(Exception):
+    pass
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(files):
+    """One hash over {name: sha256}, independent of file order."""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f"{name}:{files[name]}\n".encode())
+    return digest.hexdigest()
+
+
+def write_atomic(path, text):
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish(src_dir, bundles_dir, schema, filenames, keep=5):
+    """
+    Copies `filenames` from src_dir into a new bundle, verifies the copy,
+    then points CURRENT at it. Returns the new version string.
+    """
+    os.makedirs(bundles_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=bundles_dir, prefix=".staging-")
+    try:
+        files = {}
+        for name in filenames:
+            src = os.path.join(src_dir, name)
+            if not os.path.exists(src):
+                raise BundleError(f"Missing artifact {src}")
+            shutil.copy2(src, os.path.join(staging, name))
+            files[name] = file_sha256(os.path.join(staging, name))
+
+        digest = content_hash(files)
+        version = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + digest[:8]
+        manifest = {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "content_hash": digest,
+            "files": files,
+            "schema": schema,
+        }
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        target = os.path.join(bundles_dir, version)
+        if os.path.exists(target):
+            raise BundleError(f"Bundle {version} already exists")
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    write_atomic(os.path.join(bundles_dir, CURRENT), version + "\n")
+    prune(bundles_dir, keep=keep)
+    return version
+
+
+def prune(bundles_dir, keep=5):
+    """Removes all but the newest `keep` bundles, never the current one."""
+    current = current_version(bundles_dir)
+    versions = sorted(
+        name for name in os.listdir(bundles_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(bundles_dir, name))
+    )
+    for name in versions[:-keep] if keep else []:
+        if name != current:
+            shutil.rmtree(os.path.join(bundles_dir, name), ignore_errors=True)
+
+
+def current_version(bundles_dir):
+    """The live version named by CURRENT, or None if nothing is published."""
+    try:
+        with open(os.path.join(bundles_dir, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(bundle_dir, verify=True):
+    """Reads a bundle's manifest, checking every file against its hash."""
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Unreadable manifest in {bundle_dir}: {e}") from e
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            path = os.path.join(bundle_dir, name)
+            if not os.path.exists(path) or file_sha256(path) != expected:
+                raise BundleError(f"{name} in {bundle_dir} does not match its manifest hash")
+        if content_hash(manifest["files"]) != manifest["content_hash"]:
+            raise BundleError(f"Content hash mismatch in {bundle_dir}")
+
+    return manifest
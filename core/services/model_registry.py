@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None if it cannot be read."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Loads named models on first use and keeps one instance per process.
+
+    Loaders are registered up front but only run when a model is first
+    requested, so importing the app (manage.py migrate, collectstatic)
+    never pays the load cost. Calling preload() in the gunicorn master
+    before workers fork lets them share the loaded arrays copy-on-write.
+
+    A model registered with `current_version` (a cheap callable naming the
+    version that should be live) is hot-reloaded: a background thread in
+    each process polls it, loads a new version off the request path and
+    swaps it in with a single dict assignment. Callers that already hold
+    the old instance finish with it; the next get() returns the new one.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._versions = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._watch_interval = {}
+        self._failed_versions = {}
+        self._watcher = None
+        self._watcher_pid = None
+
+    def register(self, name, loader, current_version=None, poll_interval=0):
+        self._loaders[name] = loader
+        if current_version is not None:
+            self._versions[name] = current_version
+            self._watch_interval[name] = poll_interval
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            if self._watch_interval.get(name):
+                self._ensure_watcher()
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+            if name not in self._loaders:
+                raise KeyError(f"No model registered as {name!r}")
+
+            model, self._stats[name] = self._load(name)
+            self._models[name] = model
+            return model
+
+    def _load(self, name):
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        model = self._loaders[name]()
+
+        return model, {
+            "version": getattr(model, "version", None),
+            "load_seconds": round(time.perf_counter() - started, 4),
+            "loaded_at": time.time(),
+            "loaded_in_pid": os.getpid(),
+            "rss_before": rss_before,
+            "rss_after": current_rss_bytes(),
+        }
+
+    def reload_if_changed(self, name):
+        """
+        Loads and swaps in `name` if its live version moved on. A failed
+        load (corrupt bundle, bad hash) is logged and the old model kept.
+        Returns True if a new model was swapped in.
+        """
+        model = self._models.get(name)
+        wanted = self._versions[name]()
+        if model is None or wanted is None or wanted == getattr(model, "version", None):
+            return False
+        if self._failed_versions.get(name) == wanted:
+            return False
+
+        try:
+            # Loaded outside the lock so get() keeps serving the old model
+            new_model, stats = self._load(name)
+        except Exception:
+            logger.exception("Reloading model %s (version %s) failed; keeping %s",
+                             name, wanted, getattr(model, "version", None))
+            # Not retried every poll; publishing a fixed version clears it
+            self._failed_versions[name] = wanted
+            return False
+
+        with self._lock:
+            self._models[name] = new_model
+            self._stats[name] = stats
+        logger.info("Swapped model %s: %s -> %s", name,
+                    getattr(model, "version", None), getattr(new_model, "version", None))
+        return True
+
+    def _ensure_watcher(self):
+        # Like the micro-batcher thread, the watcher does not survive fork()
+        if self._watcher_pid == os.getpid() and self._watcher.is_alive():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid() and self._watcher.is_alive():
+                return
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+            self._watcher_pid = os.getpid()
+
+    def _watch(self):
+        interval = min(i for i in self._watch_interval.values() if i)
+        while True:
+            time.sleep(interval)
+            for name, every in self._watch_interval.items():
+                if not every:
+                    continue
+                try:
+                    self.reload_if_changed(name)
+                except Exception:
+                    logger.exception("Model watcher failed for %s", name)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def preload(self, names=None):
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "rss": current_rss_bytes(),
+            "registered": sorted(self._loaders),
+            "models": {
+                name: dict(self._stats[name], shared_from_parent=self._stats[name]["loaded_in_pid"] != os.getpid())
+                for name in self._models
+            },
+        }
+
+
+registry = ModelRegistry()
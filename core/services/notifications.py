@@ -0,0 +1,150 @@
+"""
+Notification channels for alert delivery (Email, SMS, App).
+
+Backends are configured per channel in settings.ALERT_BACKENDS:
+
+    ALERT_BACKENDS = {
+        "Email": {"BACKEND": "core.services.notifications.EmailBackend"},
+        "SMS": {"BACKEND": "core.services.notifications.LogBackend", "OPTIONS": {"latency": 0.2}},
+    }
+
+EmailBackend goes through Django's mail framework, so EMAIL_BACKEND
+decides where mail really goes (the console by default). LogBackend is
+the local stand-in for providers this project has no account with yet:
+it logs each message to core.notifications after a simulated round trip
+and can fail a share of sends to exercise retries.
+
+Backends are only ever called from the alert workers
+(core/services/alerts.py), never from a request.
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("core.notifications")
+
+DEFAULT_BACKENDS = {
+    "Email": {"BACKEND": "core.services.notifications.EmailBackend"},
+    "SMS": {"BACKEND": "core.services.notifications.LogBackend"},
+    "App": {"BACKEND": "core.services.notifications.LogBackend"},
+}
+
+_backends = {}
+_limiters = {}
+_lock = threading.Lock()
+
+
+def render_message(delivery):
+    alert = delivery.alert
+    subject = f"Unruffled: {alert.alert_type}"
+    body = alert.alert_message
+    if alert.recommended_action:
+        body += f"\n\nRecommended: {alert.recommended_action}"
+    return subject, body
+
+
+class NotificationBackend:
+    """
+    send_batch(deliveries) returns one entry per delivery: None when it
+    was sent, or the exception that stopped it.
+    """
+
+    def __init__(self, channel, **options):
+        self.channel = channel
+
+    def send_batch(self, deliveries):
+        raise NotImplementedError
+
+
+class EmailBackend(NotificationBackend):
+    """One SMTP (or EMAIL_BACKEND) connection per batch."""
+
+    def send_batch(self, deliveries):
+        messages = []
+        for delivery in deliveries:
+            subject, body = render_message(delivery)
+            messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [delivery.recipient]))
+        try:
+            with get_connection() as connection:
+                connection.send_messages(messages)
+        except Exception as e:
+            return [e] * len(deliveries)
+        return [None] * len(deliveries)
+
+
+class LogBackend(NotificationBackend):
+    """Stand-in provider: logs messages after `latency` seconds per batch."""
+
+    def __init__(self, channel, latency=0.0, failure_rate=0.0, **options):
+        super().__init__(channel)
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    def send_batch(self, deliveries):
+        time.sleep(self.latency)
+        results = []
+        for delivery in deliveries:
+            if self.failure_rate and random.random() < self.failure_rate:
+                results.append(ConnectionError(f"{self.channel} stand-in failure"))
+                continue
+            subject, _ = render_message(delivery)
+            logger.info("%s to %s: %s", self.channel, delivery.recipient, subject)
+            results.append(None)
+        return results
+
+
+def get_backend(channel):
+    with _lock:
+        backend = _backends.get(channel)
+        if backend is None:
+            config = getattr(settings, "ALERT_BACKENDS", DEFAULT_BACKENDS).get(channel)
+            if config is None:
+                raise KeyError(f"No alert backend configured for {channel!r}")
+            backend = _backends[channel] = import_string(config["BACKEND"])(channel, **config.get("OPTIONS", {}))
+        return backend
+
+
+# ---------------------------------------------------
+# RATE LIMITING
+# ---------------------------------------------------
+class TokenBucket:
+    """
+    Allows `rate` sends per second with bursts of up to `burst`, shared by
+    every worker thread in the process.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(rate, 1))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        """Blocks until n sends are allowed."""
+        while n > 0:
+            take = min(n, self.burst)
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= take:
+                    self.tokens -= take
+                    n -= take
+                    continue
+                wait = (take - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_limiter(channel):
+    """None if the channel is not rate limited."""
+    with _lock:
+        if channel not in _limiters:
+            rate = getattr(settings, "ALERT_RATE_LIMITS", {}).get(channel)
+            _limiters[channel] = TokenBucket(rate) if rate else None
+        return _limiters[channel]
@@ -0,0 +1,144 @@
+"""
+Per-profile page and fragment caching with explicit invalidation.
+
+Every profile has a version token per data topic (biometrics,
+predictions, transits, preferences). Writes bump the token for their
+topic; cached pages and template fragments remember the tokens they were
+built from and are simply not used once one of them moves on, so there
+is no key scanning or delete-by-pattern.
+
+    response = serve_page(request, "reports", profile_id, build)
+
+A repeat request for an unchanged page costs one get_many() on the page
+cache: the topic tokens and the stored page come back together. The
+tokens also give the page its ETag and Last-Modified, so a browser
+revalidating an unchanged page gets a 304 without a body.
+
+Tokens are bumped on transaction commit by the post_save receivers in
+core/signals.py and by the risk_snapshots.record_* functions, which every
+bulk write path (ingest, batch API, transit saves) already goes through.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+TOPICS = ("biometrics", "predictions", "transits", "preferences")
+
+# Topics each cached page is built from
+PAGE_TOPICS = {
+    "dashboard": ("biometrics", "predictions", "transits", "preferences"),
+    "reports": ("predictions", "preferences"),
+    "report_predictions": ("predictions",),
+    "report_summary": ("predictions",),
+    "report_series": ("predictions",),
+    "forecast": ("biometrics",),
+}
+
+
+def cache_alias():
+    return getattr(settings, "PAGE_CACHE_ALIAS", "default")
+
+
+def get_cache():
+    return caches[cache_alias()]
+
+
+def page_timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 86400)
+
+
+def version_key(profile_id, topic):
+    return f"profile:{profile_id}:{topic}:version"
+
+
+def new_version():
+    return {"token": uuid.uuid4().hex[:12], "modified": int(time.time())}
+
+
+def invalidate(profile_id, *topics):
+    """Moves the given topics (default: all) of a profile to a new version."""
+    get_cache().set_many(
+        {version_key(profile_id, topic): new_version() for topic in topics or TOPICS},
+        timeout=None,
+    )
+
+
+def invalidate_on_commit(profile_id, *topics):
+    transaction.on_commit(lambda: invalidate(profile_id, *topics))
+
+
+def resolve_versions(profile_id, topics, found):
+    """Fills in tokens missing from a get_many() result, storing new ones."""
+    versions = {topic: found.get(version_key(profile_id, topic)) for topic in topics}
+    missing = {version_key(profile_id, t): new_version() for t, v in versions.items() if v is None}
+    if missing:
+        get_cache().set_many(missing, timeout=None)
+        versions.update({t: missing[version_key(profile_id, t)] for t, v in versions.items() if v is None})
+    return versions
+
+
+def get_versions(profile_id, topics=TOPICS):
+    keys = [version_key(profile_id, topic) for topic in topics]
+    return resolve_versions(profile_id, topics, get_cache().get_many(keys))
+
+
+def tokens(versions):
+    """Template-friendly {topic: token} mapping, for {% cache %} vary-on arguments."""
+    return {topic: version["token"] for topic, version in versions.items()}
+
+
+def serve_page(request, page, profile_id, build, vary="", per_client=False):
+    """
+    Returns the cached response for page if none of its topics changed,
+    otherwise calls build(versions) -> (response, cacheable) and stores
+    the result. vary is folded into the key for inputs that are not
+    topics (e.g. the day). per_client keys the page by the CSRF cookie,
+    for pages that embed a CSRF token; such pages are only cached once
+    the client has that cookie.
+    """
+    cache = get_cache()
+    topics = PAGE_TOPICS[page]
+
+    client = ""
+    if per_client:
+        cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+        client = hashlib.sha1(cookie.encode()).hexdigest()[:12] if cookie else None
+
+    # vary may be a query string; keep keys short for memcached-style backends
+    entry_key = f"page:{page}:{profile_id}:{hashlib.sha1(vary.encode()).hexdigest()[:16]}:{client}"
+    keys = [version_key(profile_id, topic) for topic in topics]
+    found = cache.get_many(keys + [entry_key])
+    versions = resolve_versions(profile_id, topics, found)
+
+    signature = ":".join([page, vary, client or ""] + [versions[t]["token"] for t in topics])
+    etag = '"%s"' % hashlib.sha1(signature.encode()).hexdigest()[:20]
+    last_modified = max(v["modified"] for v in versions.values())
+
+    entry = found.get(entry_key)
+    if entry is not None and entry["etag"] == etag:
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(entry["body"], content_type=entry["content_type"])
+    else:
+        response, cacheable = build(versions)
+        if response.status_code != 200:
+            return response
+        if cacheable and client is not None:
+            cache.set(entry_key, {
+                "etag": etag,
+                "body": response.content,
+                "content_type": response["Content-Type"],
+            }, timeout=page_timeout())
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # Always revalidate; unchanged pages come back as 304s
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
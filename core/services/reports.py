@@ -0,0 +1,185 @@
+"""
+Prediction history for the reports page and its JSON API.
+
+Nothing here loads a profile's whole history: lists are keyset-paginated
+on (prediction_date, timestamp, id), which the
+prediction_profile_date_idx index serves directly, and statistics are
+computed by the database. Chart series come from the per-day prediction
+counts and sums already kept on DailyRiskSnapshot, so they cost
+O(buckets) rather than O(predictions).
+"""
+import base64
+from datetime import date, datetime
+
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Max, Min, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+PAGE_FIELDS = (
+    "id",
+    "prediction_date",
+    "timestamp",
+    "prediction_burnout_risk",
+    "predicted_burnout_level",
+    "contributing_factors",
+    "recommendations",
+    "meditation_link",
+)
+
+PERCENTILES = (50, 90, 99)
+
+BUCKETS = {
+    "day": None,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+class ReportQueryError(ValueError):
+    """Bad cursor or parameters; the API answers these with a 400."""
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL percentile_cont(fraction) WITHIN GROUP (ORDER BY expr)."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def predictions_in_range(profile, start=None, end=None):
+    from core.models import AIPrediction
+
+    qs = AIPrediction.objects.filter(user_profile=profile)
+    if start:
+        qs = qs.filter(prediction_date__gte=start)
+    if end:
+        qs = qs.filter(prediction_date__lte=end)
+    return qs
+
+
+# ---------------------------------------------------
+# KEYSET PAGINATION
+# ---------------------------------------------------
+def encode_cursor(row):
+    raw = f"{row['prediction_date'].isoformat()}|{row['timestamp'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, ts, pk = raw.split("|")
+        return date.fromisoformat(day), datetime.fromisoformat(ts), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ReportQueryError("Invalid cursor.")
+
+
+def prediction_page(profile, start=None, end=None, cursor=None, limit=50):
+    """
+    One page of predictions, newest first. Returns
+    {"results": [...], "next_cursor": str | None}; pass next_cursor back
+    to continue after the last row.
+    """
+    qs = predictions_in_range(profile, start, end)
+    if cursor:
+        day, ts, pk = decode_cursor(cursor)
+        qs = qs.filter(
+            Q(prediction_date__lt=day)
+            | Q(prediction_date=day, timestamp__lt=ts)
+            | Q(prediction_date=day, timestamp=ts, id__lt=pk)
+        )
+
+    rows = [
+        dict(zip(PAGE_FIELDS, values))
+        for values in qs.order_by("-prediction_date", "-timestamp", "-id").values_list(*PAGE_FIELDS)[:limit + 1]
+    ]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": rows,
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+    }
+
+
+# ---------------------------------------------------
+# AGGREGATES
+# ---------------------------------------------------
+def percentiles(qs, field):
+    if connection.vendor == "postgresql":
+        return qs.aggregate(**{
+            f"p{p}": PercentileCont(field, p / 100) for p in PERCENTILES
+        })
+
+    # No ordered-set aggregates: nearest-rank, one indexed offset query each
+    n = qs.count()
+    ordered = qs.order_by(field).values_list(field, flat=True)
+    return {
+        f"p{p}": ordered[min(n - 1, (p * n + 99) // 100 - 1)] if n else None
+        for p in PERCENTILES
+    }
+
+
+def prediction_summary(profile, start=None, end=None):
+    """Count, mean, min, max and percentiles of risk (0-100) over a date range."""
+    qs = predictions_in_range(profile, start, end)
+    stats = qs.aggregate(
+        count=Count("id"),
+        avg=Avg("prediction_burnout_risk"),
+        min=Min("prediction_burnout_risk"),
+        max=Max("prediction_burnout_risk"),
+        first_date=Min("prediction_date"),
+        last_date=Max("prediction_date"),
+    )
+    if stats["count"]:
+        stats.update(percentiles(qs, "prediction_burnout_risk"))
+
+    summary = {"count": stats["count"], "first_date": stats["first_date"], "last_date": stats["last_date"]}
+    for name in ("avg", "min", "max") + tuple(f"p{p}" for p in PERCENTILES):
+        value = stats.get(name)
+        summary[name] = round(value * 100, 2) if value is not None else None
+    return summary
+
+
+def risk_series(profile, start=None, end=None, bucket="day"):
+    """
+    Mean risk (0-100) and prediction count per day, week or month, oldest
+    first. Also returns the day of the newest earlier prediction so charts
+    can page backwards through history.
+    """
+    from core.models import DailyRiskSnapshot
+
+    if bucket not in BUCKETS:
+        raise ReportQueryError(f"bucket must be one of {', '.join(BUCKETS)}.")
+
+    qs = DailyRiskSnapshot.objects.filter(user_profile=profile, day_prediction_count__gt=0)
+    if start:
+        qs = qs.filter(day__gte=start)
+    if end:
+        qs = qs.filter(day__lte=end)
+
+    trunc = BUCKETS[bucket]
+    key = trunc("day") if trunc else F("day")
+    rows = (
+        qs.annotate(bucket=key).values("bucket")
+        .annotate(n=Sum("day_prediction_count"), total=Sum("day_prediction_sum"))
+        .order_by("bucket")
+        .values_list("bucket", "n", "total")
+    )
+    points = [
+        {"bucket": day.isoformat(), "count": n, "avg": round(total / n * 100, 2)}
+        for day, n, total in rows
+    ]
+
+    earlier = None
+    if start:
+        earlier = (
+            DailyRiskSnapshot.objects
+            .filter(user_profile=profile, day_prediction_count__gt=0, day__lt=start)
+            .order_by("-day").values_list("day", flat=True).first()
+        )
+
+    return {"bucket": bucket, "points": points, "earlier": earlier.isoformat() if earlier else None}
@@ -0,0 +1,259 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.services.page_cache import invalidate_on_commit
+from core.services.transit_risk import compute_transit_pressure, transit_pressures
+
+ROLLING_WINDOWS = (7, 30)
+
+
+def combined_risk(ai_score, latest_bio, transit_pressure):
+    """
+    The dashboard burnout gauge. Returns (components, combined_score).
+    """
+    components = {
+        "ai_score": ai_score or 0,
+        "hrv_component": (100 - (latest_bio.hrv_score or 50)) * 0.10 if latest_bio else 0,
+        "sleep_component": ((7 - (latest_bio.sleep_hours or 7)) * 10) * 0.10 if latest_bio else 0,
+        "stress_component": (latest_bio.stress_level or 5) * 0.15 if latest_bio else 0,
+        "transit_pressure": transit_pressure or 0,
+    }
+
+    combined_score = (
+        components["ai_score"] * 0.65 +
+        components["hrv_component"] +
+        components["sleep_component"] +
+        components["stress_component"] +
+        components["transit_pressure"] * 0.20
+    )
+
+    return components, round(min(max(combined_score, 0), 100), 1)
+
+
+def apply_combined(snapshot):
+    latest_ai = snapshot.latest_prediction
+    components, combined = combined_risk(
+        latest_ai.prediction_burnout_risk if latest_ai else 0,
+        snapshot.latest_biometric,
+        snapshot.transit_pressure,
+    )
+    for name, value in components.items():
+        setattr(snapshot, name, value)
+    snapshot.combined_score = combined
+
+
+def latest_snapshot(profile):
+    """The profile's most recent snapshot with its latest rows, in one query."""
+    from core.models import DailyRiskSnapshot
+
+    return (
+        DailyRiskSnapshot.objects
+        .filter(user_profile=profile)
+        .select_related("latest_biometric", "latest_prediction")
+        .order_by("-day")
+        .first()
+    )
+
+
+def locked_snapshot(profile, day):
+    """
+    Today's row for update, started from the previous day's carried-over
+    state (latest rows, running totals) if it does not exist yet.
+    Must be called inside a transaction.
+    """
+    from core.models import DailyRiskSnapshot
+
+    snapshot = (
+        DailyRiskSnapshot.objects.select_for_update()
+        .filter(user_profile=profile, day=day).first()
+    )
+    if snapshot:
+        return snapshot
+
+    previous = (
+        DailyRiskSnapshot.objects
+        .filter(user_profile=profile, day__lt=day)
+        .order_by("-day").first()
+    )
+    snapshot, created = DailyRiskSnapshot.objects.get_or_create(
+        user_profile=profile,
+        day=day,
+        defaults={
+            "latest_biometric_id": previous.latest_biometric_id if previous else None,
+            "latest_prediction_id": previous.latest_prediction_id if previous else None,
+            "transit_pressure": previous.transit_pressure if previous else 0,
+            "total_prediction_count": previous.total_prediction_count if previous else 0,
+            "total_prediction_sum": previous.total_prediction_sum if previous else 0,
+        },
+    )
+    if created:
+        # The windows still cover earlier days' predictions
+        refresh_rolling(profile, [day])
+    return DailyRiskSnapshot.objects.select_for_update().get(pk=snapshot.pk)
+
+
+def refresh_rolling(profile, days):
+    """Recomputes rolling averages on the given days' rows (<= 30 rows each)."""
+    from core.models import DailyRiskSnapshot
+
+    for snapshot in DailyRiskSnapshot.objects.filter(user_profile=profile, day__in=days):
+        for window in ROLLING_WINDOWS:
+            agg = DailyRiskSnapshot.objects.filter(
+                user_profile=profile,
+                day__gt=snapshot.day - timedelta(days=window),
+                day__lte=snapshot.day,
+            ).aggregate(s=Sum("day_prediction_sum"), n=Sum("day_prediction_count"))
+            value = agg["s"] / agg["n"] if agg["n"] else None
+            setattr(snapshot, f"rolling_{window}d_avg", value)
+        snapshot.save(update_fields=[f"rolling_{w}d_avg" for w in ROLLING_WINDOWS])
+
+
+def record_predictions(profile, predictions):
+    """
+    Folds newly written AIPrediction rows into the daily snapshots.
+    Used by the post_save signal and after bulk_create (which sends none).
+    """
+    from core.models import DailyRiskSnapshot
+
+    by_day = defaultdict(list)
+    for prediction in predictions:
+        by_day[prediction.prediction_date].append(prediction)
+
+    with transaction.atomic():
+        for day, rows in sorted(by_day.items()):
+            snapshot = locked_snapshot(profile, day)
+            count = len(rows)
+            total = sum(p.prediction_burnout_risk for p in rows)
+
+            snapshot.day_prediction_count += count
+            snapshot.day_prediction_sum += total
+            snapshot.total_prediction_count += count
+            snapshot.total_prediction_sum += total
+
+            newest = rows[-1]
+            current = snapshot.latest_prediction
+            if current is None or current.prediction_date <= newest.prediction_date:
+                snapshot.latest_prediction = newest
+
+            apply_combined(snapshot)
+            snapshot.save()
+
+            # A late row for a past day shifts every later running total
+            later = DailyRiskSnapshot.objects.filter(user_profile=profile, day__gt=day)
+            later.update(
+                total_prediction_count=F("total_prediction_count") + count,
+                total_prediction_sum=F("total_prediction_sum") + total,
+            )
+
+        affected = set()
+        for day in by_day:
+            affected.update(day + timedelta(days=i) for i in range(max(ROLLING_WINDOWS)))
+        refresh_rolling(profile, affected)
+        invalidate_on_commit(profile.id, "predictions")
+
+
+def record_biometrics(profile, biometrics):
+    with transaction.atomic():
+        newest = max(biometrics, key=lambda b: b.timestamp)
+        day = timezone.localdate(newest.timestamp)
+        snapshot = locked_snapshot(profile, day)
+
+        current = snapshot.latest_biometric
+        if current is None or current.timestamp <= newest.timestamp:
+            snapshot.latest_biometric = newest
+            apply_combined(snapshot)
+            snapshot.save()
+        invalidate_on_commit(profile.id, "biometrics")
+
+
+def record_transits(profile, day, alerts):
+    with transaction.atomic():
+        snapshot = locked_snapshot(profile, day)
+        snapshot.transit_pressure = compute_transit_pressure(alerts)
+        apply_combined(snapshot)
+        snapshot.save()
+        invalidate_on_commit(profile.id, "transits")
+
+
+def rebuild_snapshots(profile):
+    """
+    Recomputes a profile's snapshots from its full history in one pass.
+    For backfilling; normal writes go through the record_* functions.
+    """
+    from core.models import AIPrediction, AstrologicalTransit, BiometricData, DailyRiskSnapshot
+
+    day_counts = defaultdict(int)
+    day_sums = defaultdict(float)
+    latest_prediction = {}
+    for pk, day, risk in (
+        AIPrediction.objects.filter(user_profile=profile)
+        .order_by("prediction_date", "timestamp", "id")
+        .values_list("id", "prediction_date", "prediction_burnout_risk")
+    ):
+        day_counts[day] += 1
+        day_sums[day] += risk
+        latest_prediction[day] = pk
+
+    latest_biometric = {}
+    for pk, ts in (
+        BiometricData.objects.filter(user_profile=profile)
+        .order_by("timestamp", "id").values_list("id", "timestamp")
+    ):
+        latest_biometric[timezone.localdate(ts)] = pk
+
+    transits = defaultdict(list)
+    for row in AstrologicalTransit.objects.filter(user_profile=profile):
+        transits[row.transit_date].append(row.as_alert())
+    pressures = dict(zip(transits, transit_pressures(list(transits.values())).tolist()))
+
+    predictions = AIPrediction.objects.in_bulk(latest_prediction.values())
+    biometrics = BiometricData.objects.in_bulk(latest_biometric.values())
+
+    days = sorted(set(day_counts) | set(latest_biometric) | set(transits))
+    snapshots = []
+    carry = {"bio": None, "ai": None, "pressure": 0, "count": 0, "sum": 0.0}
+    prefix_count, prefix_sum = [], []
+
+    for day in days:
+        if day in latest_biometric:
+            carry["bio"] = biometrics[latest_biometric[day]]
+        if day in latest_prediction:
+            carry["ai"] = predictions[latest_prediction[day]]
+        if day in transits:
+            carry["pressure"] = pressures[day]
+        carry["count"] += day_counts[day]
+        carry["sum"] += day_sums[day]
+
+        snapshot = DailyRiskSnapshot(
+            user_profile=profile,
+            day=day,
+            latest_biometric=carry["bio"],
+            latest_prediction=carry["ai"],
+            transit_pressure=carry["pressure"],
+            day_prediction_count=day_counts[day],
+            day_prediction_sum=day_sums[day],
+            total_prediction_count=carry["count"],
+            total_prediction_sum=carry["sum"],
+        )
+        # Windowed sums from the prefix totals: (start, day] == upto(day) - upto(start)
+        prefix_count.append(carry["count"])
+        prefix_sum.append(carry["sum"])
+        for window in ROLLING_WINDOWS:
+            before = bisect_right(days, day - timedelta(days=window)) - 1
+            n = carry["count"] - (prefix_count[before] if before >= 0 else 0)
+            total = carry["sum"] - (prefix_sum[before] if before >= 0 else 0)
+            setattr(snapshot, f"rolling_{window}d_avg", total / n if n else None)
+        apply_combined(snapshot)
+        snapshots.append(snapshot)
+
+    with transaction.atomic():
+        DailyRiskSnapshot.objects.filter(user_profile=profile).delete()
+        DailyRiskSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+        invalidate_on_commit(profile.id)
+
+    return len(snapshots)
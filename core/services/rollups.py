@@ -0,0 +1,236 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+METRICS = ("heart_rate", "hrv_score", "sleep_hours", "stress_level")
+
+# Coarsest last; the query API walks this list from finest to coarsest
+GRANULARITIES = (
+    ("hour", timedelta(hours=1)),
+    ("day", timedelta(days=1)),
+    ("week", timedelta(weeks=1)),
+)
+
+
+def bucket_start(ts, granularity):
+    local = timezone.localtime(ts)
+    if granularity == "hour":
+        start = local.replace(minute=0, second=0, microsecond=0)
+    elif granularity == "day":
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif granularity == "week":
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=local.weekday())
+    else:
+        raise ValueError(f"Unknown granularity: {granularity!r}")
+    return start
+
+
+class BucketStats:
+    """Running min/max/sum/count/last per metric for one bucket."""
+
+    def __init__(self):
+        self.count = 0
+        self.last_timestamp = None
+        self.metrics = {m: {"count": 0, "sum": 0.0, "min": None, "max": None, "last": None} for m in METRICS}
+
+    def add(self, timestamp, values):
+        self.count += 1
+        is_last = self.last_timestamp is None or timestamp >= self.last_timestamp
+        if is_last:
+            self.last_timestamp = timestamp
+        for metric in METRICS:
+            value = values.get(metric)
+            if value is None:
+                continue
+            stats = self.metrics[metric]
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["min"] = value if stats["min"] is None else min(stats["min"], value)
+            stats["max"] = value if stats["max"] is None else max(stats["max"], value)
+            if is_last:
+                stats["last"] = value
+
+
+def accumulate(rows):
+    """
+    Groups (timestamp, {metric: value}) pairs into per-bucket stats for
+    every granularity. Returns {(granularity, bucket_start): BucketStats}.
+    """
+    buckets = {}
+    for timestamp, values in rows:
+        for granularity, _ in GRANULARITIES:
+            key = (granularity, bucket_start(timestamp, granularity))
+            stats = buckets.get(key)
+            if stats is None:
+                stats = buckets[key] = BucketStats()
+            stats.add(timestamp, values)
+    return buckets
+
+
+def merge_into(rollup, stats):
+    """Folds new BucketStats into a stored BiometricRollup row."""
+    is_last = rollup.last_timestamp is None or stats.last_timestamp >= rollup.last_timestamp
+    rollup.count += stats.count
+    if is_last:
+        rollup.last_timestamp = stats.last_timestamp
+
+    for metric, new in stats.metrics.items():
+        if not new["count"]:
+            continue
+        setattr(rollup, f"{metric}_count", getattr(rollup, f"{metric}_count") + new["count"])
+        setattr(rollup, f"{metric}_sum", getattr(rollup, f"{metric}_sum") + new["sum"])
+        current_min = getattr(rollup, f"{metric}_min")
+        current_max = getattr(rollup, f"{metric}_max")
+        setattr(rollup, f"{metric}_min", new["min"] if current_min is None else min(current_min, new["min"]))
+        setattr(rollup, f"{metric}_max", new["max"] if current_max is None else max(current_max, new["max"]))
+        if is_last and new["last"] is not None:
+            setattr(rollup, f"{metric}_last", new["last"])
+
+
+def update_rollups(profile, biometrics):
+    """Incrementally folds newly written BiometricData rows into the rollups."""
+    from core.models import BiometricRollup
+
+    buckets = accumulate(
+        (b.timestamp, {m: getattr(b, m) for m in METRICS}) for b in biometrics
+    )
+
+    with transaction.atomic():
+        for (granularity, start), stats in sorted(buckets.items(), key=lambda kv: kv[0]):
+            BiometricRollup.objects.get_or_create(
+                user_profile=profile, granularity=granularity, bucket_start=start,
+            )
+            rollup = BiometricRollup.objects.select_for_update().get(
+                user_profile=profile, granularity=granularity, bucket_start=start,
+            )
+            merge_into(rollup, stats)
+            rollup.save()
+
+
+def rebuild_rollups(profile, chunk_size=5000):
+    """
+    Recomputes a profile's rollups from raw rows in one streaming pass.
+    For backfilling; raw rows already compacted away are not recoverable,
+    so rollups older than the raw retention window are left untouched.
+    """
+    from core.models import BiometricData, BiometricRollup
+
+    first = BiometricData.objects.filter(user_profile=profile).order_by("timestamp").values_list("timestamp", flat=True).first()
+    if first is None:
+        return 0
+
+    rows = (
+        BiometricData.objects.filter(user_profile=profile)
+        .order_by("timestamp")
+        .values_list("timestamp", *METRICS)
+        .iterator(chunk_size=chunk_size)
+    )
+    buckets = accumulate((r[0], dict(zip(METRICS, r[1:]))) for r in rows)
+
+    # The bucket holding the first surviving row may also hold compacted
+    # rows. A stored one that counts more rows than survive is kept as is;
+    # everything after it is fully covered by raw data and replaced.
+    boundaries = {granularity: bucket_start(first, granularity) for granularity, _ in GRANULARITIES}
+    kept = {
+        (r.granularity, r.bucket_start)
+        for r in BiometricRollup.objects.filter(
+            user_profile=profile, granularity__in=boundaries, bucket_start__in=set(boundaries.values()),
+        ).only("granularity", "bucket_start", "count")
+        if r.bucket_start == boundaries[r.granularity] and r.count > buckets[(r.granularity, r.bucket_start)].count
+    }
+
+    objects = []
+    for (granularity, start), stats in buckets.items():
+        if (granularity, start) in kept:
+            continue
+        rollup = BiometricRollup(user_profile=profile, granularity=granularity, bucket_start=start)
+        merge_into(rollup, stats)
+        objects.append(rollup)
+
+    with transaction.atomic():
+        for granularity, start in boundaries.items():
+            stale = BiometricRollup.objects.filter(user_profile=profile, granularity=granularity)
+            if (granularity, start) in kept:
+                stale = stale.filter(bucket_start__gt=start)
+            else:
+                stale = stale.filter(bucket_start__gte=start)
+            stale.delete()
+        BiometricRollup.objects.bulk_create(objects, batch_size=1000)
+
+    return len(objects)
+
+
+def compact(before=None, hourly_before=None, batch_size=10000):
+    """
+    Retention: deletes raw BiometricData older than `before` and hourly
+    rollups older than `hourly_before`. Daily and weekly rollups are kept.
+    Returns (raw_deleted, hourly_deleted).
+    """
+    from core.models import BiometricData, BiometricRollup
+
+    now = timezone.now()
+    before = before or now - timedelta(days=settings.BIOMETRIC_RAW_RETENTION_DAYS)
+    hourly_before = hourly_before or now - timedelta(days=settings.BIOMETRIC_HOURLY_RETENTION_DAYS)
+
+    # Delete in id batches so one run never holds millions of rows in memory
+    raw_deleted = 0
+    old_rows = BiometricData.objects.filter(timestamp__lt=before).order_by("id")
+    while True:
+        ids = list(old_rows.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        BiometricData.objects.filter(id__in=ids).delete()
+        raw_deleted += len(ids)
+
+    hourly_deleted, _ = BiometricRollup.objects.filter(granularity="hour", bucket_start__lt=hourly_before).delete()
+    return raw_deleted, hourly_deleted
+
+
+def choose_granularity(start, end, max_points):
+    """Finest stored granularity whose bucket count over the range fits max_points."""
+    span = end - start
+    hourly_cutoff = timezone.now() - timedelta(days=settings.BIOMETRIC_HOURLY_RETENTION_DAYS)
+    for granularity, width in GRANULARITIES:
+        if granularity == "hour" and start < hourly_cutoff:
+            continue
+        if span / width <= max_points:
+            return granularity
+    return GRANULARITIES[-1][0]
+
+
+def biometric_series(profile, start, end, max_points=500):
+    """
+    Aggregated history for charts. Costs O(buckets) regardless of how many
+    raw samples the range holds.
+    """
+    from core.models import BiometricRollup
+
+    granularity = choose_granularity(start, end, max_points)
+    rollups = (
+        BiometricRollup.objects
+        .filter(
+            user_profile=profile,
+            granularity=granularity,
+            bucket_start__gte=bucket_start(start, granularity),
+            bucket_start__lt=end,
+        )
+        .order_by("bucket_start")
+    )
+
+    points = []
+    for r in rollups:
+        point = {"bucket_start": r.bucket_start.isoformat(), "count": r.count}
+        for metric in METRICS:
+            n = getattr(r, f"{metric}_count")
+            point[metric] = {
+                "mean": getattr(r, f"{metric}_sum") / n if n else None,
+                "min": getattr(r, f"{metric}_min"),
+                "max": getattr(r, f"{metric}_max"),
+                "last": getattr(r, f"{metric}_last"),
+                "count": n,
+            }
+        points.append(point)
+
+    return {"granularity": granularity, "points": points}
@@ -1,23 +1,126 @@
-def score_transit(transit: dict) -> float:
-    nature = (transit.get("impact_area") or "").lower()
-    risk = (transit.get("risk_level") or "").lower()
+"""
+Transit risk: the one place transits are classified and scored.
 
-    base = 10
-    if risk == "high":
-        base = 30
-    elif risk == "moderate":
-        base = 20
+    risk_level("Stressful")              # "High"
+    compute_transit_pressure(alerts)     # 0-100, for the dashboard gauge
+    transit_pressures([alerts, ...])     # many profiles or days at once
 
-    if "burnout" in nature or "stress" in nature:
-        base += 10
+A transit's risk level comes from keywords in its nature. Its score is a
+base weight for the level plus a bonus when the impact area mentions
+burnout or stress, and a day's pressure is the mean score of its
+transits. Keywords and weights can be overridden in settings
+(TRANSIT_RISK_KEYWORDS, TRANSIT_RISK_WEIGHTS) and are compiled into one
+regex per group. The batch functions classify each distinct text once,
+since a night's transits share a handful of natures.
+"""
+import re
+from functools import lru_cache
 
-    return base
+import numpy as np
+from django.conf import settings
 
+LEVELS = ("High", "Moderate", "Low")
 
-def compute_transit_pressure(transits: list) -> float:
+# Checked in order; the first group with a match wins, anything else is Low
+DEFAULT_KEYWORDS = {
+    "High": ("stress", "challenge", "restriction", "crisis"),
+    "Moderate": ("mixed", "lesson", "growth"),
+    # Impact areas that earn the bonus weight
+    "bonus": ("burnout", "stress"),
+}
+
+DEFAULT_WEIGHTS = {
+    "High": 30,
+    "Moderate": 20,
+    "Low": 10,
+    "bonus": 10,
+}
+
+
+def keywords():
+    return {**DEFAULT_KEYWORDS, **getattr(settings, "TRANSIT_RISK_KEYWORDS", {})}
+
+
+def weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, "TRANSIT_RISK_WEIGHTS", {})}
+
+
+@lru_cache(maxsize=8)
+def _compile(words):
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE) if words else None
+
+
+def patterns():
+    config = keywords()
+    return {group: _compile(tuple(config[group])) for group in ("High", "Moderate", "bonus")}
+
+
+def _level(text, compiled):
+    if not text:
+        return "Low"
+    for level in ("High", "Moderate"):
+        pattern = compiled[level]
+        if pattern is not None and pattern.search(text):
+            return level
+    return "Low"
+
+
+def _bonus(text, compiled):
+    return bool(text) and compiled["bonus"] is not None and compiled["bonus"].search(text) is not None
+
+
+def risk_level(nature):
+    """High, Moderate or Low for a transit's nature."""
+    return _level(nature, patterns())
+
+
+def score_transit(transit):
+    weight = weights()
+    risk = (transit.get("risk_level") or "").capitalize()
+    score = weight[risk] if risk in LEVELS else weight["Low"]
+    if _bonus(transit.get("impact_area"), patterns()):
+        score += weight["bonus"]
+    return score
+
+
+def compute_transit_pressure(transits):
+    """Mean transit score, 0-100; 0 without transits."""
     if not transits:
         return 0.0
-    scores = [score_transit(t) for t in transits]
-    avg = sum(scores) / len(scores)
-    return min(avg, 100.0)
+    return float(min(sum(score_transit(t) for t in transits) / len(transits), 100.0))
+
+
+# ---------------------------------------------------
+# BATCH
+# ---------------------------------------------------
+def risk_levels(natures):
+    """risk_level() over a sequence, classifying each distinct nature once."""
+    compiled = patterns()
+    unique, inverse = np.unique(np.asarray([n or "" for n in natures], dtype=object), return_inverse=True)
+    return np.array([_level(n, compiled) for n in unique], dtype=object)[inverse]
+
+
+def score_transits(transits):
+    """score_transit() over a sequence of transits, as a float array."""
+    if not len(transits):
+        return np.zeros(0)
+    weight = weights()
+    compiled = patterns()
+
+    risks = np.array([(t.get("risk_level") or "").capitalize() for t in transits], dtype=object)
+    scores = np.full(len(transits), float(weight["Low"]))
+    for level in LEVELS:
+        scores[risks == level] = weight[level]
+
+    areas, inverse = np.unique(np.array([t.get("impact_area") or "" for t in transits], dtype=object),
+                               return_inverse=True)
+    bonus = np.array([_bonus(a, compiled) for a in areas], dtype=bool)[inverse]
+    return scores + bonus * weight["bonus"]
+
 
+def transit_pressures(groups):
+    """compute_transit_pressure() for each list of transits, in one pass."""
+    sizes = np.array([len(g) for g in groups], dtype=int)
+    scores = score_transits([t for g in groups for t in g])
+    totals = np.bincount(np.repeat(np.arange(len(groups)), sizes), weights=scores, minlength=len(groups))
+    return np.minimum(np.divide(totals, sizes, out=np.zeros(len(groups)), where=sizes > 0), 100.0)
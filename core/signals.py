@@ -0,0 +1,76 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import AIPrediction, BiometricData, UserPreference
+from .services.alerts import evaluate_biometrics, evaluate_predictions
+from .services.anomalies import detect_anomalies
+from .services.feature_store import update_features
+from .services.page_cache import invalidate_on_commit
+from .services.risk_snapshots import record_biometrics, record_predictions
+from .services.rollups import update_rollups
+
+
+# ---------------------------------------------------
+# DAILY RISK SNAPSHOTS
+# bulk_create sends no post_save; callers using it call record_* directly
+# ---------------------------------------------------
+@receiver(post_save, sender=AIPrediction)
+def update_snapshot_for_prediction(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_predictions(instance.user_profile, [instance])
+
+
+@receiver(post_save, sender=BiometricData)
+def update_snapshot_for_biometric(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_biometrics(instance.user_profile, [instance])
+
+
+# ---------------------------------------------------
+# BIOMETRIC ROLLUPS
+# ---------------------------------------------------
+@receiver(post_save, sender=BiometricData)
+def update_rollups_for_biometric(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_rollups(instance.user_profile, [instance])
+
+
+# ---------------------------------------------------
+# ROLLING FEATURES
+# ---------------------------------------------------
+@receiver(post_save, sender=BiometricData)
+def update_features_for_biometric(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_features(instance.user_profile, [instance])
+
+
+# ---------------------------------------------------
+# ALERTS
+# Only queues deliveries; the alert workers send them
+# ---------------------------------------------------
+@receiver(post_save, sender=AIPrediction)
+def evaluate_alerts_for_prediction(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        evaluate_predictions(instance.user_profile, [instance])
+
+
+@receiver(post_save, sender=BiometricData)
+def evaluate_alerts_for_biometric(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        evaluate_biometrics(instance.user_profile, [instance])
+
+
+@receiver(post_save, sender=BiometricData)
+def detect_anomalies_for_biometric(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        detect_anomalies(instance.user_profile, [instance])
+
+
+# ---------------------------------------------------
+# PAGE CACHE
+# Biometric, prediction and transit writes invalidate through record_*
+# ---------------------------------------------------
+@receiver(post_save, sender=UserPreference)
+def invalidate_pages_for_preference(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_on_commit(instance.user_profile_id, "preferences")
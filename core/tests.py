@@ -0,0 +1,638 @@
+from concurrent.futures import Future
+from datetime import date, datetime, time, timedelta
+import random
+import struct
+from time import sleep
+import tempfile
+import unittest
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (
+    AIPrediction, Alert, AlertDelivery, AnomalyDetectorState, BiometricData, BiometricFeatureState, BiometricRollup,
+    UserProfile,
+)
+from core.api import client as api_client
+from core.api.client import AstrologyAPIError, AstrologyClient, CircuitBreaker, CircuitOpenError
+from core.api.stub import StubAstrologyAPI
+from core.api.transits import build_transit_payload, convert_nature_to_risk, get_transit_alerts
+from core.services import alerts, anomalies, astro_cache, columnar, feature_store, rollups, transit_risk
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+
+
+def inline_submit(fn, *args, **kwargs):
+    """fanout.submit without the pool, so the call's queries are counted here."""
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+@override_settings(
+    CACHES={
+        "default": {**LOCMEM, "LOCATION": "tests-default"},
+        "astrology": {**LOCMEM, "LOCATION": "tests-astrology"},
+        "pages": {**LOCMEM, "LOCATION": "tests-pages"},
+    },
+    ASTROLOGY_BACKEND="local",
+    BURNOUT_BACKEND="numpy",
+    BURNOUT_BATCHING_ENABLED=False,
+)
+class QueryCountTests(TestCase):
+    """
+    Pins the number of queries behind the main pages and APIs, so an N+1
+    or a lost cache shows up as a failing count rather than a slow page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = UserProfile.objects.create(
+            id=1,
+            full_name="Demo",
+            birth_date=date(1990, 5, 17),
+            birth_time=time(8, 30),
+            birth_latitude=40.71,
+            birth_longitude=-74.01,
+            birth_timezone=-5.0,
+        )
+        now = timezone.now()
+        for i in range(24):
+            BiometricData.objects.create(
+                user_profile=cls.profile,
+                timestamp=now - timedelta(hours=i),
+                heart_rate=70 + i % 5,
+                hrv_score=50.0 - i % 7,
+                sleep_hours=7.0,
+                activity_level=5,
+                stress_level=4,
+            )
+        for i in range(30):
+            AIPrediction.objects.create(
+                user_profile=cls.profile,
+                prediction_date=date.today() - timedelta(days=i),
+                prediction_burnout_risk=(i % 10) / 10,
+                predicted_burnout_level="medium",
+            )
+
+    def setUp(self):
+        for alias in ("default", "astrology", "pages"):
+            caches[alias].clear()
+        for target in ("core.api.transits.submit", "core.api.astrology.submit"):
+            patcher = mock.patch(target, inline_submit)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, name, *args, query=None):
+        response = self.client.get(reverse(name, args=args) + (f"?{query}" if query else ""))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_dashboard(self):
+        # Profile, transit lookup and store, snapshot refresh, features, render
+        with self.assertNumQueries(12):
+            response = self.get("dashboard")
+        self.assertContains(response, "HRV (7 days):")
+        # Transits and the card fragments come from the caches
+        with self.assertNumQueries(3):
+            self.get("dashboard")
+
+    def test_reports(self):
+        with self.assertNumQueries(3):
+            self.get("reports")
+        with self.assertNumQueries(0):
+            self.get("reports")
+
+    def test_natal_chart(self):
+        # Chart and transit lookups, each stored, and the snapshot refresh
+        with self.assertNumQueries(17):
+            self.get("natal_chart", "Demo")
+        # Chart and transits now come from the astrology cache
+        with self.assertNumQueries(1):
+            self.get("natal_chart", "Demo")
+
+    def test_burnout_api(self):
+        query = (
+            "heart_rate=80&hrv_score=45&sleep_hours=7&activity_level=5&stress_level=5"
+            "&transit_planet=Mars&natal_house=1st&sleep_quality=Good"
+        )
+        # Profile, the prediction insert and the snapshot refresh its signal triggers
+        with self.assertNumQueries(13):
+            self.get("predict_burnout", query=query)
+
+    def test_report_predictions_api(self):
+        with self.assertNumQueries(2):
+            self.get("report_predictions", query="limit=10")
+        with self.assertNumQueries(0):
+            self.get("report_predictions", query="limit=10")
+
+    def test_report_summary_api(self):
+        with self.assertNumQueries(6):
+            self.get("report_summary")
+
+    def test_report_series_api(self):
+        with self.assertNumQueries(2):
+            self.get("report_series", query="bucket=week")
+
+
+class RebuildRollupsTests(TestCase):
+    def setUp(self):
+        self.profile = UserProfile.objects.create(full_name="Rollups")
+        # Six hourly readings in the middle of one day; signals roll them up
+        noon = timezone.make_aware(datetime(2026, 3, 4, 9))
+        for hour in range(6):
+            BiometricData.objects.create(
+                user_profile=self.profile, timestamp=noon + timedelta(hours=hour), heart_rate=60 + hour,
+            )
+        self.cutoff = noon + timedelta(hours=3)
+
+    def rollup(self, granularity, ts):
+        return BiometricRollup.objects.get(
+            user_profile=self.profile, granularity=granularity,
+            bucket_start=rollups.bucket_start(ts, granularity),
+        )
+
+    def test_rebuild_keeps_boundary_bucket_after_compaction(self):
+        rollups.compact(before=self.cutoff, hourly_before=self.cutoff - timedelta(days=1))
+        rollups.rebuild_rollups(self.profile)
+
+        day = self.rollup("day", self.cutoff)
+        self.assertEqual(day.count, 6)
+        self.assertEqual(day.heart_rate_sum, sum(range(60, 66)))
+        self.assertEqual(self.rollup("week", self.cutoff).count, 6)
+        # Hours after the first surviving row are rebuilt from it
+        self.assertEqual(self.rollup("hour", self.cutoff).count, 1)
+
+    def test_rebuild_replaces_buckets_covered_by_raw_rows(self):
+        BiometricRollup.objects.filter(user_profile=self.profile).update(count=1, heart_rate_sum=0)
+        rollups.rebuild_rollups(self.profile)
+        day = self.rollup("day", self.cutoff)
+        self.assertEqual(day.count, 6)
+        self.assertEqual(day.heart_rate_sum, sum(range(60, 66)))
+        self.assertEqual(self.rollup("hour", self.cutoff).count, 1)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class ImportTableTests(TestCase):
+    def test_reimport_skips_stored_samples(self):
+        profile = UserProfile.objects.create(full_name="Importer")
+        start = timezone.now() - timedelta(days=2)
+        for i in range(5):
+            BiometricData.objects.create(
+                user_profile=profile, timestamp=start + timedelta(hours=i), sample_id=f"s{i}", heart_rate=70,
+            )
+
+        with tempfile.TemporaryDirectory() as out:
+            columnar.export_table(out, "biometrics", profile_ids=[profile.id])
+            BiometricData.objects.filter(sample_id__in=["s3", "s4"]).delete()
+            rows, profiles = columnar.import_table(out, "biometrics")
+
+        self.assertEqual((rows, profiles), (2, {profile.id}))
+        self.assertEqual(BiometricData.objects.filter(user_profile=profile).count(), 5)
+
+    def test_predictions_need_keep_ids_to_import_again(self):
+        profile = UserProfile.objects.create(full_name="Importer")
+        for i in range(4):
+            AIPrediction.objects.create(
+                user_profile=profile, prediction_date=date(2026, 3, 1 + i),
+                prediction_burnout_risk=0.5, predicted_burnout_level="medium",
+            )
+
+        with tempfile.TemporaryDirectory() as out:
+            columnar.export_table(out, "predictions", profile_ids=[profile.id])
+            with self.assertRaises(columnar.ImportConflict):
+                columnar.import_table(out, "predictions")
+
+            AIPrediction.objects.filter(prediction_date=date(2026, 3, 4)).delete()
+            rows, _ = columnar.import_table(out, "predictions", keep_ids=True)
+            self.assertEqual(rows, 1)
+            self.assertEqual(columnar.import_table(out, "predictions", keep_ids=True)[0], 0)
+
+            AIPrediction.objects.filter(user_profile=profile).delete()
+            rows, _ = columnar.import_table(out, "predictions")
+
+        self.assertEqual(rows, 4)
+        self.assertEqual(AIPrediction.objects.filter(user_profile=profile).count(), 4)
+
+
+@override_settings(
+    CACHES={"default": LOCMEM, "astrology": LOCMEM, "pages": {**LOCMEM, "LOCATION": "tests-forecast"}},
+    BURNOUT_BACKEND="numpy",
+    BURNOUT_BATCHING_ENABLED=False,
+)
+class ForecastTests(TestCase):
+    def setUp(self):
+        caches["pages"].clear()
+        self.profile = UserProfile.objects.create(
+            id=1, full_name="Demo", birth_date=date(1990, 5, 17), birth_time=time(8, 30),
+            birth_latitude=40.71, birth_longitude=-74.01, birth_timezone=-5.0,
+        )
+
+    def test_unknown_sleep_quality_falls_back_to_hours(self):
+        BiometricData.objects.create(
+            user_profile=self.profile, timestamp=timezone.now(), sleep_hours=5.5, sleep_quality="Average",
+        )
+        response = self.client.get(reverse("burnout_forecast"), {"days": 3})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["baseline"]["sleep_quality"], "Fair")
+        self.assertEqual(len(body["points"]), 3)
+
+    def test_known_sleep_quality_is_kept(self):
+        BiometricData.objects.create(
+            user_profile=self.profile, timestamp=timezone.now(), sleep_hours=5.5, sleep_quality="Excellent",
+        )
+        response = self.client.get(reverse("burnout_forecast"), {"days": 3})
+        self.assertEqual(response.json()["baseline"]["sleep_quality"], "Excellent")
+
+
+def substring_risk(nature):
+    """The keyword check transit_risk replaced, kept as the reference."""
+    if not nature:
+        return "Low"
+    n = nature.lower()
+    if any(word in n for word in ["stress", "challenge", "restriction", "crisis"]):
+        return "High"
+    if any(word in n for word in ["mixed", "lesson", "growth"]):
+        return "Moderate"
+    return "Low"
+
+
+def per_transit_score(transit):
+    nature = (transit.get("impact_area") or "").lower()
+    risk = (transit.get("risk_level") or "").lower()
+    base = 10
+    if risk == "high":
+        base = 30
+    elif risk == "moderate":
+        base = 20
+    if "burnout" in nature or "stress" in nature:
+        base += 10
+    return base
+
+
+def per_transit_pressure(transits):
+    if not transits:
+        return 0.0
+    return min(sum(per_transit_score(t) for t in transits) / len(transits), 100.0)
+
+
+class TransitRiskParityTests(SimpleTestCase):
+    NATURES = [
+        None, "", "Stressful", "Challenging", "CRISIS point", "Restriction", "Mixed", "A lesson",
+        "Growth", "Harmonious", "General", "Burnout risk", "stress and growth", "Supportive",
+    ]
+
+    def random_transits(self, rng, n):
+        levels = ["High", "Moderate", "Low", "high", "", None, "unknown"]
+        return [
+            {"impact_area": rng.choice(self.NATURES), "risk_level": rng.choice(levels)}
+            for _ in range(n)
+        ]
+
+    def test_risk_level_matches_substring_check(self):
+        for nature in self.NATURES:
+            self.assertEqual(transit_risk.risk_level(nature), substring_risk(nature), nature)
+            self.assertEqual(convert_nature_to_risk(nature), substring_risk(nature), nature)
+        self.assertEqual(list(transit_risk.risk_levels(self.NATURES)), [substring_risk(n) for n in self.NATURES])
+
+    def test_scores_match_per_transit_scoring(self):
+        rng = random.Random(7)
+        transits = self.random_transits(rng, 500)
+        self.assertEqual(list(transit_risk.score_transits(transits)), [per_transit_score(t) for t in transits])
+        for t in transits[:50]:
+            self.assertEqual(transit_risk.score_transit(t), per_transit_score(t))
+
+    def test_pressures_match_per_transit_pressure(self):
+        rng = random.Random(11)
+        groups = [self.random_transits(rng, rng.randint(0, 12)) for _ in range(300)]
+        expected = [per_transit_pressure(g) for g in groups]
+        for got, want in zip(transit_risk.transit_pressures(groups), expected):
+            self.assertAlmostEqual(got, want)
+        for group, want in zip(groups[:50], expected):
+            self.assertAlmostEqual(transit_risk.compute_transit_pressure(group), want)
+
+
+class AstrologyClientTests(SimpleTestCase):
+    """The AstrologyAPI client against the local stub server."""
+
+    PAYLOAD = {"day": 17, "month": 5, "year": 1990, "hour": 8, "min": 30, "lat": 40.71, "lon": -74.01, "tzone": -5}
+
+    def setUp(self):
+        self.stub = StubAstrologyAPI(latency=0).start()
+        self.addCleanup(self.stub.stop)
+
+    def make_client(self, **kwargs):
+        options = {"connect_timeout": 1, "read_timeout": 1, "max_retries": 2, "backoff": 0}
+        return AstrologyClient(base_url=self.stub.url, auth=("user", "key"), **{**options, **kwargs})
+
+    def test_retries_a_5xx_then_succeeds(self):
+        client = self.make_client()
+        self.stub.fail_next(1)
+        data = client.post("transits_natal", self.PAYLOAD)
+        self.assertIn("transits", data)
+        self.assertEqual(self.stub.calls["transits_natal"], 2)
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_read_timeout_is_retried_then_fails(self):
+        self.stub.latency = 0.3
+        client = self.make_client(read_timeout=0.05, max_retries=1)
+        with self.assertRaises(AstrologyAPIError), self.assertLogs("core.api.client", "WARNING"):
+            client.post("transits_natal", self.PAYLOAD)
+        self.assertEqual(self.stub.calls["transits_natal"], 2)
+        self.assertEqual(client.breaker.failures, 1)
+
+    def test_breaker_closes_after_cool_down(self):
+        client = self.make_client(max_retries=0, breaker=CircuitBreaker(threshold=1, reset_after=0.1))
+        self.stub.fail_next(1)
+        with self.assertRaises(AstrologyAPIError), self.assertLogs("core.api.client", "WARNING"):
+            client.post("transits_natal", self.PAYLOAD)
+        self.assertEqual(client.breaker.state, "open")
+
+        # Open: rejected without a call upstream
+        with self.assertRaises(CircuitOpenError):
+            client.post("transits_natal", self.PAYLOAD)
+        self.assertEqual(self.stub.calls["transits_natal"], 1)
+
+        sleep(0.15)
+        self.assertEqual(client.breaker.state, "half-open")
+        self.assertIn("transits", client.post("transits_natal", self.PAYLOAD))
+        self.assertEqual(client.breaker.state, "closed")
+
+    def test_open_breaker_serves_last_good_transits(self):
+        overrides = override_settings(
+            CACHES={"default": LOCMEM, "astrology": {**LOCMEM, "LOCATION": "tests-client"}},
+            ASTROLOGY_BACKEND="api",
+            ASTROLOGY_API_BASE_URL=self.stub.url,
+            ASTROLOGY_API_USER_ID="user",
+            ASTROLOGY_API_KEY="key",
+            ASTROLOGY_API_MAX_RETRIES=0,
+            ASTROLOGY_API_BACKOFF=0,
+            ASTROLOGY_API_BREAKER_THRESHOLD=2,
+            ASTROLOGY_API_BREAKER_RESET=60,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        caches["astrology"].clear()
+        # get_client() builds the shared client from settings on first use
+        api_client._client = None
+        self.addCleanup(setattr, api_client, "_client", None)
+
+        birth = (date(1990, 5, 17), time(8, 30), 40.71, -74.01, -5)
+        good = get_transit_alerts(*birth)
+        self.assertTrue(good)
+        day_key = astro_cache.payload_key("transits", build_transit_payload(*birth), day=timezone.localdate())
+
+        self.stub.fail_next(2)
+        for _ in range(2):
+            caches["astrology"].delete(day_key)
+            with self.assertLogs("core.api.client", "WARNING"):
+                self.assertEqual(get_transit_alerts(*birth), good)
+        self.assertEqual(api_client.get_client().breaker.state, "open")
+
+        caches["astrology"].delete(day_key)
+        self.assertEqual(get_transit_alerts(*birth), good)
+        # The third lookup never reached the stub
+        self.assertEqual(self.stub.calls["transits_natal"], 3)
+
+
+class FailingBackend:
+    def __init__(self):
+        self.sent = []
+
+    def send_batch(self, deliveries):
+        self.sent.extend(deliveries)
+        return [ConnectionError("provider down")] * len(deliveries)
+
+
+@override_settings(ALERT_MAX_ATTEMPTS=2, ALERT_RETRY_BASE_SECONDS=30, ALERT_CLAIM_TIMEOUT=300)
+class AlertTests(TestCase):
+    def setUp(self):
+        self.profile = UserProfile.objects.create(full_name="Alerts", email="alerts@example.com")
+
+    def stressed_reading(self):
+        # post_save evaluates the reading and raises the warning
+        return BiometricData.objects.create(
+            user_profile=self.profile, timestamp=timezone.now(),
+            heart_rate=72, hrv_score=50.0, sleep_hours=7.0, activity_level=5, stress_level=9,
+        )
+
+    def test_threshold_crossing_raises_alert_and_queues_delivery(self):
+        self.stressed_reading()
+        alert = Alert.objects.get(user_profile=self.profile)
+        self.assertEqual(alert.alert_type, alerts.BIOMETRIC_WARNING)
+        self.assertIn("stress level 9", alert.alert_message)
+        delivery = alert.deliveries.get()
+        self.assertEqual((delivery.channel, delivery.recipient), ("Email", "alerts@example.com"))
+        self.assertEqual(delivery.status, AlertDelivery.PENDING)
+
+    def test_one_alert_per_type_and_day(self):
+        self.stressed_reading()
+        self.stressed_reading()
+        self.assertEqual(Alert.objects.filter(user_profile=self.profile).count(), 1)
+        self.assertEqual(AlertDelivery.objects.count(), 1)
+
+        again = Alert(user_profile=self.profile, alert_type=alerts.BIOMETRIC_WARNING, alert_message="again")
+        other = Alert(user_profile=self.profile, alert_type=alerts.HIGH_RISK, alert_message="risk")
+        self.assertEqual(alerts.raise_alerts(self.profile, [again, other]), [other])
+
+    def test_claim_batch_takes_due_rows_once(self):
+        self.stressed_reading()
+        self.stressed_reading()
+        now = timezone.now()
+        later = Alert.objects.create(user_profile=self.profile, alert_type="Later", alert_message="later")
+        AlertDelivery.objects.create(alert=later, channel="App", recipient="1", next_attempt_at=now + timedelta(hours=1))
+
+        claimed = alerts.claim_batch(10, now=now)
+        self.assertEqual([d.alert.alert_type for d in claimed], [alerts.BIOMETRIC_WARNING])
+        self.assertEqual((claimed[0].status, claimed[0].attempts), (AlertDelivery.SENDING, 1))
+        self.assertEqual(alerts.claim_batch(10, now=now), [])
+
+        # A claim never finished (crashed worker) is due again after the timeout
+        reclaimed = alerts.claim_batch(10, now=now + timedelta(seconds=301))
+        self.assertEqual([d.id for d in reclaimed], [claimed[0].id])
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        self.stressed_reading()
+        backend = FailingBackend()
+        with mock.patch.object(alerts, "get_backend", return_value=backend), \
+                mock.patch.object(alerts, "get_limiter", return_value=None):
+            start = timezone.now()
+            self.assertEqual(alerts.send_claimed(alerts.claim_batch(10, now=start)), (0, 1))
+            delivery = AlertDelivery.objects.get()
+            self.assertEqual(delivery.status, AlertDelivery.PENDING)
+            self.assertIn("provider down", delivery.last_error)
+            self.assertIsNone(delivery.claimed_at)
+            # First retry: 30s base, jittered by 0.5-1.5
+            delay = (delivery.next_attempt_at - start).total_seconds()
+            self.assertTrue(15 <= delay <= 46, delay)
+            self.assertEqual(alerts.claim_batch(10, now=start), [])
+
+            retry = alerts.claim_batch(10, now=delivery.next_attempt_at)
+            with self.assertLogs("core.services.alerts", "WARNING"):
+                self.assertEqual(alerts.send_claimed(retry), (0, 1))
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), (AlertDelivery.FAILED, 2))
+        self.assertEqual(len(backend.sent), 2)
+
+
+class FeatureStoreTests(TestCase):
+    """Incrementally maintained features against values recomputed from the rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = UserProfile.objects.create(full_name="Features")
+        rng = random.Random(11)
+        now = timezone.now()
+        # ~38 days of readings every 7 hours, written out of order, some metrics missing
+        readings = [
+            BiometricData(
+                user_profile=cls.profile,
+                timestamp=now - timedelta(hours=7 * k),
+                heart_rate=rng.randint(55, 95),
+                hrv_score=None if k % 9 == 4 else round(rng.uniform(20, 80), 1),
+                sleep_hours=None if k % 5 == 2 else round(rng.uniform(4, 9), 1),
+                activity_level=5,
+                stress_level=rng.randint(1, 10),
+            )
+            for k in range(130)
+        ]
+        rng.shuffle(readings)
+        for reading in readings:
+            reading.save()  # post_save updates the feature state
+
+    def expected(self):
+        today = timezone.localdate()
+        rows = [
+            (r, (today - timezone.localdate(r.timestamp)).days)
+            for r in BiometricData.objects.filter(user_profile=self.profile).order_by("timestamp")
+        ]
+        expected = {}
+        for window in feature_store.WINDOWS:
+            for metric in rollups.METRICS:
+                values = [getattr(r, metric) for r, age in rows if age < window and getattr(r, metric) is not None]
+                expected[f"{metric}_{window}d"] = sum(values) / len(values)
+
+        hrv = [r.hrv_score for r, age in rows if age < 30 and r.hrv_score is not None]
+        mean = sum(hrv) / len(hrv)
+        std = (sum((v - mean) ** 2 for v in hrv) / len(hrv)) ** 0.5
+        latest = [r.hrv_score for r, _ in rows if r.hrv_score is not None][-1]
+        expected["hrv_zscore"] = (latest - mean) / std
+
+        nights = {}
+        for r, age in rows:
+            if age < 7 and r.sleep_hours is not None:
+                nights.setdefault(age, []).append(r.sleep_hours)
+        target = feature_store.sleep_target()
+        expected["sleep_debt_7d"] = sum(max(target - sum(n) / len(n), 0) for n in nights.values())
+        return expected
+
+    def assertFeaturesMatchRows(self):
+        features = feature_store.feature_vector(self.profile)
+        for name, value in self.expected().items():
+            self.assertAlmostEqual(features[name], value, places=3, msg=name)
+
+    def test_features_match_rows(self):
+        self.assertFeaturesMatchRows()
+        self.assertIsNotNone(feature_store.feature_vector(self.profile)["stress_ewma"])
+
+    def test_stale_layout_is_rebuilt_from_rows(self):
+        row = BiometricFeatureState.objects.get(user_profile=self.profile)
+        # Same size, other layout version
+        row.state = struct.pack("<d", feature_store.LAYOUT_VERSION + 1) + bytes(row.state)[8:]
+        row.save()
+        # A blob from another layout is not decoded...
+        self.assertIsNone(feature_store.feature_vector(self.profile)["heart_rate_30d"])
+
+        # ...and the next reading rebuilds the state from the raw rows
+        BiometricData.objects.create(
+            user_profile=self.profile, timestamp=timezone.now(),
+            heart_rate=70, hrv_score=45.0, sleep_hours=7.5, activity_level=5, stress_level=3,
+        )
+        self.assertFeaturesMatchRows()
+
+
+class AnomalyTests(TestCase):
+    def setUp(self):
+        self.profile = UserProfile.objects.create(full_name="Anomalies")
+
+    def write_readings(self, end, count=120):
+        """Hourly readings up to `end` with a heart-rate spike, an HRV drop and a drift."""
+        rng = random.Random(5)
+        readings = []
+        for i in range(count):
+            heart_rate = rng.randint(66, 74) + (12 if i >= 100 else 0)
+            hrv_score = round(rng.uniform(45, 55), 1)
+            if i == 60:
+                heart_rate = 140
+            if i == 90:
+                hrv_score = 5.0
+            readings.append(BiometricData(
+                user_profile=self.profile, timestamp=end - timedelta(hours=count - 1 - i),
+                heart_rate=heart_rate, hrv_score=None if i % 11 == 3 else hrv_score,
+                sleep_hours=7.0, activity_level=5, stress_level=4,
+            ))
+        # bulk_create sends no post_save, so the detector sees only what is passed to it
+        return BiometricData.objects.bulk_create(readings)
+
+    def test_streaming_batches_match_replay(self):
+        readings = self.write_readings(timezone.now())
+        streamed = []
+        scan_readings = anomalies.scan_readings
+
+        def recording(*args):
+            found = scan_readings(*args)
+            streamed.extend(found)
+            return found
+
+        with mock.patch.object(anomalies, "scan_readings", side_effect=recording):
+            for start, stop in ((0, 7), (7, 50), (50, 51), (51, 120)):
+                anomalies.detect_anomalies(self.profile, readings[start:stop])
+        stream_state = AnomalyDetectorState.objects.get(user_profile=self.profile).state
+
+        replayed = anomalies.replay(self.profile, emit=False)
+        replay_state = AnomalyDetectorState.objects.get(user_profile=self.profile).state
+
+        self.assertEqual([d[:4] for d in streamed], [d[:4] for d in replayed])
+        self.assertLessEqual(
+            {("heart_rate", "spike"), ("hrv_score", "spike"), ("heart_rate", "shift")},
+            {(d[1], d[2]) for d in replayed},
+        )
+        for a, b in zip(streamed, replayed):
+            self.assertAlmostEqual(a[4], b[4], places=6)
+            self.assertAlmostEqual(a[5], b[5], places=6)
+        for metric in anomalies.METRICS:
+            self.assertEqual(stream_state[metric]["n"], replay_state[metric]["n"])
+            self.assertEqual(stream_state[metric]["at"], replay_state[metric]["at"])
+            for key in ("mean", "var", "cusum"):
+                self.assertAlmostEqual(stream_state[metric][key], replay_state[metric][key], places=6, msg=key)
+
+    def test_replay_dates_alerts_on_the_reading_day(self):
+        self.write_readings(timezone.now() - timedelta(days=3))
+        detections = anomalies.replay(self.profile, emit=True)
+        days = {(timezone.localdate(d[0]), anomalies.ALERT_TYPES[d[1]]) for d in detections}
+        self.assertGreater(len({day for day, _ in days}), 1)
+
+        stored = Alert.objects.filter(user_profile=self.profile)
+        self.assertEqual({(a.alert_date, a.alert_type) for a in stored}, days)
+        self.assertTrue(all(a.alert_date < timezone.localdate() for a in stored))
+        # History only: nothing is queued for delivery, and a second replay adds nothing
+        self.assertFalse(AlertDelivery.objects.exists())
+        anomalies.replay(self.profile, emit=True)
+        self.assertEqual(stored.count(), len(days))
+
+    @override_settings(ANOMALY_DETECTION={"z": 5.0})
+    def test_settings_override_defaults_per_key(self):
+        self.assertEqual(anomalies.detector_settings(), {**anomalies.DEFAULT_SETTINGS, "z": 5.0})
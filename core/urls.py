@@ -3,23 +3,43 @@ from .views import (
     registration_view,
     dashboard_view,
     add_biometric_view,
+    biometric_ingest_api,
+    biometric_series_api,
+    biometric_features_api,
     burnout_api,
+    burnout_batch_api,
+    burnout_forecast_api,
     burnout_report_view,
+    report_predictions_api,
+    report_summary_api,
+    report_series_api,
     natal_chart_view,
     settings_view,
     login_view,
     logout_view,
+    model_status_view,
+    metrics_view,
 )
 
 urlpatterns = [
     path("register/", registration_view, name="register"),
     path("dashboard/", dashboard_view, name="dashboard"),
     path("add-biometric/", add_biometric_view, name="add_biometric"),
+    path("biometrics/ingest/", biometric_ingest_api, name="biometric_ingest"),
+    path("biometrics/series/", biometric_series_api, name="biometric_series"),
+    path("biometrics/features/", biometric_features_api, name="biometric_features"),
     path("predict_burnout/", burnout_api, name="predict_burnout"),
+    path("predict_burnout/batch/", burnout_batch_api, name="predict_burnout_batch"),
+    path("predict_burnout/forecast/", burnout_forecast_api, name="burnout_forecast"),
     path("reports/", burnout_report_view, name="reports"),
+    path("reports/api/predictions/", report_predictions_api, name="report_predictions"),
+    path("reports/api/summary/", report_summary_api, name="report_summary"),
+    path("reports/api/series/", report_series_api, name="report_series"),
     path("natal/<str:full_name>/", natal_chart_view, name="natal_chart"),
     path("settings/", settings_view, name="settings"),
     path("login/", login_view, name="login"),
     path("logout/", logout_view, name="logout"),
+    path("metrics/models/", model_status_view, name="model_status"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
 
@@ -1,9 +1,15 @@
 
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth import logout
-from datetime import date
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import date, timedelta
+import json
 
 from .models import (
     UserProfile, 
@@ -14,9 +20,24 @@ from .models import (
     UserFeedback
 )
 
-from .burnout_model import predict_burnout
-from .api.astrology import get_natal_interpretation
-from core.api.transits import get_transit_alerts
+from .burnout_model import get_engine, predict_burnout_batch_versioned, predict_burnout_versioned
+from .api.astrology import submit_natal_interpretation
+from core.api.transits import is_cacheable as transits_cacheable, submit_transit_alerts
+from core.services.alerts import evaluate_predictions
+from core.services.fanout import gather
+from core.services.feature_store import feature_vector
+from core.services.forecast import burnout_forecast
+from core.services.ingest import ingest_biometrics, iter_rows
+from core.services.rollups import biometric_series
+from core.services.risk_snapshots import combined_risk, latest_snapshot, record_predictions
+from core.services.transit_risk import compute_transit_pressure
+from core.services.model_registry import registry
+from core.services.page_cache import cache_alias, page_timeout, serve_page, tokens
+from core.services.reports import ReportQueryError, prediction_page, prediction_summary, risk_series
+from core.services.instrumentation import render_metrics, timed
+
+# Template rendering shows up as its own span in Server-Timing and /metrics
+render = timed("template")(render)
 
 # ---------------------------------------------------
 # LOGIN VIEW
@@ -35,94 +56,185 @@ def logout_view(request):
 # ---------------------------------------------------
 # HELPERS
 # ---------------------------------------------------
-def get_active_profile():
-    """Always returns the first user profile (demo mode)."""
-    profile = UserProfile.objects.get(id=1)
-    return profile
-
+def active_profile_id():
+    """The profile every page acts for (demo mode); settings.ACTIVE_PROFILE_ID."""
+    return getattr(settings, "ACTIVE_PROFILE_ID", 1)
 
 
-def compute_transit_pressure(transits):
-    if not transits:
-        return 0
-
-    high_risk_count = 0
-    for t in transits:
-        if isinstance(t, dict) and t.get("severity", "").lower() in ("high", "major"):
-            high_risk_count += 1
-
-    return min(high_risk_count * 10, 100)
+def get_active_profile():
+    """Always returns the configured demo profile (the first one by default)."""
+    profile = UserProfile.objects.get(id=active_profile_id())
+    return profile
 
 
 # ---------------------------------------------------
 # DASHBOARD
 # ---------------------------------------------------
 def dashboard_view(request):
-    profile = get_active_profile()
+    # Transits change daily, so the page is keyed by day as well. The page
+    # embeds a CSRF token and is therefore cached per client.
+    return serve_page(
+        request, "dashboard", active_profile_id(),
+        lambda versions: build_dashboard(request, versions),
+        vary=timezone.localdate().isoformat(), per_client=True,
+    )
 
-    latest_bio = BiometricData.objects.order_by("-timestamp").first()
-    latest_ai = AIPrediction.objects.order_by("-prediction_date").first()
-    ai_score = latest_ai.prediction_burnout_risk if latest_ai else 0
 
-    # Get transit alerts if birth data exists
-    transits = []
+def build_dashboard(request, versions):
+    profile = get_active_profile()
+
+    # Start the transit lookup first so it overlaps with the DB queries
+    futures = {}
     if profile and profile.birth_date and profile.birth_time:
-        transits = get_transit_alerts(
+        futures["transits"] = submit_transit_alerts(
             birth_date=profile.birth_date,
             birth_time=profile.birth_time,
             lat=profile.birth_latitude,
             lon=profile.birth_longitude,
             timezone=profile.birth_timezone,
+            profile=profile,
         )
 
-    transit_pressure = compute_transit_pressure(transits)
+    # One indexed row holds the latest readings and the precomputed gauge
+    snapshot = latest_snapshot(profile)
 
-    combined_score = (
-        ai_score * 0.65 +
-        ((100 - (latest_bio.hrv_score or 50)) * 0.10 if latest_bio else 0) +
-        (((7 - (latest_bio.sleep_hours or 7)) * 10) * 0.10 if latest_bio else 0) +
-        ((latest_bio.stress_level or 5) * 0.15 if latest_bio else 0) +
-        transit_pressure * 0.20
+    # Get transit alerts if birth data exists
+    transits = gather(
+        futures, timeout=settings.ASTROLOGY_PAGE_DEADLINE, defaults={"transits": []},
+    ).get("transits", [])
+
+    # A page rendered with missing or failed transits must not stick for the day
+    future = futures.get("transits")
+    cacheable = future is None or (
+        future.done() and future.exception() is None and transits_cacheable(transits)
     )
 
-    combined_score = round(min(max(combined_score, 0), 100), 1)
+    if snapshot:
+        latest_bio = snapshot.latest_biometric
+        latest_ai = snapshot.latest_prediction
+        combined_score = snapshot.combined_score
+    else:
+        latest_bio = latest_ai = None
+        _, combined_score = combined_risk(0, None, compute_transit_pressure(transits))
 
     remaining_risk = 100 - combined_score
     return render(request, "core/dashboard.html", {
+        "profile": profile,
         "combined_risk": combined_score,
         "remaining_risk": remaining_risk,
         "transit_alerts": transits,
         "latest_biometric": latest_bio,
         "latest_prediction": latest_ai,
-    })
+        # Rolling windows from the feature store; one indexed row read
+        "features": feature_vector(profile),
+        "versions": tokens(versions),
+        "fragment_timeout": page_timeout(),
+        "fragment_cache": cache_alias(),
+    }), cacheable
 
 
 # ---------------------------------------------------
 # REPORTS
 # ---------------------------------------------------
+REPORT_PAGE_SIZE = 50
+REPORT_MAX_PAGE_SIZE = 500
+
+
 def burnout_report_view(request):
-    profile = get_active_profile()
-    predictions = AIPrediction.objects.filter(user_profile=profile).order_by("-prediction_date")
+    return serve_page(
+        request, "reports", active_profile_id(),
+        lambda versions: (build_report(request), True),
+    )
 
-    dates = [p.prediction_date.strftime("%Y-%m-%d") for p in predictions]
-    scores = [round(p.prediction_burnout_risk * 100, 2) for p in predictions]
 
-    if predictions:
-        avg_score = round(sum(scores) / len(scores), 2)
-        latest = predictions[0]
+def build_report(request):
+    profile = get_active_profile()
+    # The first page only; the chart and further pages load from the API
+    predictions = prediction_page(profile, limit=REPORT_PAGE_SIZE)
+
+    # Count, average and latest come from the materialized snapshot
+    snapshot = latest_snapshot(profile)
+    if snapshot and snapshot.total_prediction_count:
+        prediction_count = snapshot.total_prediction_count
+        avg_score = round(snapshot.average_risk * 100, 2)
+        latest = snapshot.latest_prediction
     else:
+        prediction_count = 0
         avg_score = 0
         latest = None
 
     return render(request, "core/reports.html", {
-        "predictions": predictions,
-        "dates": dates,
-        "scores": scores,
+        "predictions": predictions["results"],
+        "next_cursor": predictions["next_cursor"],
+        "prediction_count": prediction_count,
         "avg_score": avg_score,
         "latest": latest,
     })
 
 
+def report_range(request):
+    """?start=&end= as ISO dates, both optional and inclusive."""
+    bounds = []
+    for name in ("start", "end"):
+        raw = request.GET.get(name)
+        try:
+            value = parse_date(raw) if raw else None
+        except ValueError:
+            value = None
+        if raw and value is None:
+            raise ReportQueryError(f"{name} must be an ISO date (YYYY-MM-DD).")
+        bounds.append(value)
+    start, end = bounds
+    if start and end and start > end:
+        raise ReportQueryError("start must not be after end.")
+    return start, end
+
+
+def report_limit(request):
+    try:
+        limit = int(request.GET.get("limit", REPORT_PAGE_SIZE))
+    except ValueError:
+        raise ReportQueryError("limit must be an integer.")
+    return max(1, min(limit, REPORT_MAX_PAGE_SIZE))
+
+
+def report_api(request, page, build):
+    """
+    Serves a reports API response through the page cache, keyed by its
+    query string, so repeat chart loads are 304s until predictions change.
+    """
+    def respond(versions):
+        profile = get_active_profile()
+        try:
+            start, end = report_range(request)
+            return JsonResponse(build(profile, start, end)), True
+        except ReportQueryError as e:
+            return JsonResponse({"error": str(e)}, status=400), False
+
+    return serve_page(request, page, active_profile_id(), respond, vary=request.GET.urlencode())
+
+
+def report_predictions_api(request):
+    """?start=&end=&limit=&cursor= -> one page of predictions, newest first."""
+    return report_api(request, "report_predictions", lambda profile, start, end: prediction_page(
+        profile, start, end,
+        cursor=request.GET.get("cursor"),
+        limit=report_limit(request),
+    ))
+
+
+def report_summary_api(request):
+    """?start=&end= -> count, mean, min, max and percentiles of risk."""
+    return report_api(request, "report_summary", prediction_summary)
+
+
+def report_series_api(request):
+    """?start=&end=&bucket=day|week|month -> mean risk per bucket."""
+    return report_api(request, "report_series", lambda profile, start, end: risk_series(
+        profile, start, end, bucket=request.GET.get("bucket", "day"),
+    ))
+
+
 # ---------------------------------------------------
 # NATAL CHART
 # ---------------------------------------------------
@@ -131,16 +243,38 @@ def natal_chart_view(request, full_name):
     if not profile:
         return render(request, "core/natal_chart.html", {"error": "Profile not found."})
 
-    api_response = get_natal_interpretation(
-        birth_date=profile.birth_date,
-        birth_time=profile.birth_time,
-        latitude=profile.birth_latitude,
-        longitude=profile.birth_longitude,
-        timezone=profile.birth_timezone,
-    )
+    # Chart and transits are fetched concurrently against one deadline;
+    # whichever misses it is left out and the page renders with the rest
+    birth_data = {
+        "birth_date": profile.birth_date,
+        "birth_time": profile.birth_time,
+    }
+    results = gather({
+        "chart": submit_natal_interpretation(
+            **birth_data,
+            latitude=profile.birth_latitude,
+            longitude=profile.birth_longitude,
+            timezone=profile.birth_timezone,
+            profile=profile,
+        ),
+        "transits": submit_transit_alerts(
+            **birth_data,
+            lat=profile.birth_latitude,
+            lon=profile.birth_longitude,
+            timezone=profile.birth_timezone,
+            profile=profile,
+        ),
+    }, timeout=settings.ASTROLOGY_PAGE_DEADLINE, defaults={"transits": []})
+
+    api_response = results["chart"]
+    transits = results["transits"]
 
     if not api_response or "planets" not in api_response:
-        return render(request, "core/natal_chart.html", {"profile": profile, "error": "No chart data available."})
+        return render(request, "core/natal_chart.html", {
+            "profile": profile,
+            "transits": transits,
+            "error": "No chart data available.",
+        })
 
     planets = api_response.get("planets", [])
     houses = api_response.get("houses", [])
@@ -164,15 +298,6 @@ def natal_chart_view(request, full_name):
         "hemisphere": api_response.get("hemisphere", {}),
     }
 
-    # Also show transits on this page
-    transits = get_transit_alerts(
-        birth_date=profile.birth_date,
-        birth_time=profile.birth_time,
-        lat=profile.birth_latitude,
-        lon=profile.birth_longitude,
-        timezone=profile.birth_timezone,
-    )
-
     # Simple AI-generated guidance
     daily_guidance = None
     if sun_sign and moon_sign:
@@ -283,13 +408,77 @@ def add_biometric_view(request):
     return redirect("dashboard")
 
 
+# ---------------------------------------------------
+# BULK BIOMETRIC INGESTION (wearable sync)
+# ---------------------------------------------------
+@csrf_exempt
+@require_POST
+def biometric_ingest_api(request):
+    """
+    Accepts many readings in one call, as JSON ({"rows": [...]} or a list)
+    or NDJSON (Content-Type: application/x-ndjson, one object per line).
+    Rows carrying an already stored sample_id are skipped, so replays are safe.
+    """
+    profile_id = request.GET.get("profile")
+    if profile_id:
+        profile = UserProfile.objects.filter(id=profile_id).first()
+        if not profile:
+            return JsonResponse({"error": "Profile not found."}, status=404)
+    else:
+        profile = get_active_profile()
+
+    try:
+        summary = ingest_biometrics(profile, iter_rows(request))
+    except ValueError as e:
+        return JsonResponse({"error": f"Invalid body: {e}"}, status=400)
+
+    status = 200 if not summary["rejected"] else 207
+    return JsonResponse(summary, status=status)
+
+
+# ---------------------------------------------------
+# BIOMETRIC HISTORY (rollup-backed chart data)
+# ---------------------------------------------------
+def biometric_series_api(request):
+    """
+    ?start=&end= (ISO 8601, default last 30 days) &points= (max buckets).
+    Served from hour/day/week rollups, never from raw rows.
+    """
+    profile = get_active_profile()
+
+    end = parse_datetime(request.GET.get("end", "")) or timezone.now()
+    start = parse_datetime(request.GET.get("start", "")) or end - timedelta(days=30)
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    if timezone.is_naive(end):
+        end = timezone.make_aware(end)
+    if start >= end:
+        return JsonResponse({"error": "start must be before end."}, status=400)
+
+    try:
+        max_points = max(1, min(int(request.GET.get("points", 500)), 5000))
+    except ValueError:
+        return JsonResponse({"error": "points must be an integer."}, status=400)
+
+    return JsonResponse(biometric_series(profile, start, end, max_points=max_points))
+
+
+# ---------------------------------------------------
+# BIOMETRIC FEATURES (rolling baselines from the feature store)
+# ---------------------------------------------------
+def biometric_features_api(request):
+    """7/30-day means, HRV z-score, sleep debt and stress EWMA; no history scan."""
+    profile = get_active_profile()
+    return JsonResponse({"profile": profile.id, "features": feature_vector(profile)})
+
+
 # ---------------------------------------------------
 # AI BURNOUT API
 # ---------------------------------------------------
 def burnout_api(request):
     profile = get_active_profile()
 
-    category, score = predict_burnout(
+    category, score, model_version = predict_burnout_versioned(
         heart_rate=int(request.GET.get("heart_rate")),
         hrv_score=float(request.GET.get("hrv_score")),
         sleep_hours=float(request.GET.get("sleep_hours")),
@@ -313,5 +502,123 @@ def burnout_api(request):
     return JsonResponse({
         "burnout_category": category,
         "burnout_score": round(score * 100, 2),
+        "model_version": model_version,
+    })
+
+
+
+# ---------------------------------------------------
+# AI BURNOUT BATCH API
+# ---------------------------------------------------
+def coerce_burnout_row(row):
+    """Applies the same type coercion as burnout_api to one JSON row."""
+    return {
+        "heart_rate": int(row["heart_rate"]),
+        "hrv_score": float(row["hrv_score"]),
+        "sleep_hours": float(row["sleep_hours"]),
+        "activity_level": int(row["activity_level"]),
+        "stress_level": int(row["stress_level"]),
+        "transit_planet": row["transit_planet"],
+        "natal_house": row["natal_house"],
+        "sleep_quality": row["sleep_quality"],
+    }
+
+
+@csrf_exempt
+@require_POST
+def burnout_batch_api(request):
+    """
+    Scores many rows in one forward pass.
+    Body: {"rows": [{heart_rate, hrv_score, ..., sleep_quality}, ...]}
+    """
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+
+    rows = body.get("rows") if isinstance(body, dict) else body
+    if not isinstance(rows, list) or not rows:
+        return JsonResponse({"error": "Expected a non-empty 'rows' list."}, status=400)
+
+    if len(rows) > settings.BURNOUT_BATCH_MAX_ROWS:
+        return JsonResponse(
+            {"error": f"At most {settings.BURNOUT_BATCH_MAX_ROWS} rows per request."},
+            status=400,
+        )
+
+    try:
+        rows = [coerce_burnout_row(row) for row in rows]
+        results, model_version = predict_burnout_batch_versioned(rows)
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({"error": f"Invalid row: {e}"}, status=400)
+
+    profile = get_active_profile()
+    today = date.today()
+
+    created = AIPrediction.objects.bulk_create([
+        AIPrediction(
+            user_profile=profile,
+            prediction_date=today,
+            prediction_burnout_risk=score,
+            predicted_burnout_level=category,
+            contributing_factors="Generated by AI burnout analysis.",
+            recommendations="Rest, hydrate, and meditate.",
+            meditation_link="https://calm.com/meditation",
+        )
+        for category, score in results
+    ], batch_size=1000)
+    record_predictions(profile, created)
+    evaluate_predictions(profile, created)
+
+    return JsonResponse({
+        "count": len(results),
+        "model_version": model_version,
+        "results": [
+            {"burnout_category": category, "burnout_score": round(score * 100, 2)}
+            for category, score in results
+        ],
     })
 
+
+# ---------------------------------------------------
+# BURNOUT FORECAST
+# ---------------------------------------------------
+FORECAST_DAYS = 30
+FORECAST_MAX_DAYS = 365
+
+
+def burnout_forecast_api(request):
+    """
+    ?days= -> daily burnout risk for the next N days (default 30), each
+    scored with the latest biometrics and that day's dominant transit.
+    """
+    try:
+        days = int(request.GET.get("days", FORECAST_DAYS))
+    except ValueError:
+        return JsonResponse({"error": "days must be an integer."}, status=400)
+    days = max(1, min(days, FORECAST_MAX_DAYS))
+
+    today = timezone.localdate()
+
+    def build(versions):
+        return JsonResponse(burnout_forecast(get_active_profile(), today, days)), True
+
+    # The curve moves with the day and the model as well as with new biometrics
+    return serve_page(
+        request, "forecast", active_profile_id(), build,
+        vary=f"{today.isoformat()}:{get_engine().version}:{days}",
+    )
+
+
+# ---------------------------------------------------
+# MODEL STATUS (startup + memory metrics)
+# ---------------------------------------------------
+def model_status_view(request):
+    return JsonResponse(registry.stats())
+
+
+# ---------------------------------------------------
+# PROMETHEUS METRICS (per worker process)
+# ---------------------------------------------------
+def metrics_view(request):
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4")